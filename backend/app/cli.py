@@ -0,0 +1,251 @@
+"""
+Command-line tools for running translations outside the API server.
+
+Usage (from backend/):
+    python -m app.cli translate <dir> [--output results.jsonl]
+
+Documents stream through a two-stage pipeline: text extraction on the PDF
+process pool, then classification and translation as async tasks. Each
+result is appended to a JSONL file and recorded in a checkpoint file, so an
+interrupted run picks up where it left off. Failed documents are not
+checkpointed and are retried on the next run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.services.pdf_processor import PDFProcessor
+from app.services.ai_translator import AITranslator
+from app.services.translation_cache import create_translation_cache
+
+
+def find_documents(directory: str, recursive: bool) -> List[str]:
+    """
+    List the PDF files in a directory, sorted by path.
+
+    Args:
+        directory: Directory to search
+        recursive: Whether to include subdirectories
+
+    Returns:
+        Paths of the PDF files
+    """
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        paths.extend(
+            os.path.join(root, name) for name in files
+            if os.path.splitext(name)[1].lower() in settings.ALLOWED_EXTENSIONS
+        )
+        if not recursive:
+            break
+    return sorted(paths)
+
+
+def checkpoint_key(path: str) -> str:
+    """Identify a file version so changed files are translated again."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}\t{stat.st_size}\t{stat.st_mtime_ns}"
+
+
+def load_checkpoint(checkpoint_path: str) -> Set[str]:
+    """Read the keys of documents finished in earlier runs."""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+class PipelineStats:
+    """Throughput counters for a CLI run."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.tokens = 0
+        self.started = time.perf_counter()
+
+    def record(self, result: Dict) -> None:
+        if result["error"]:
+            self.failed += 1
+            return
+        self.completed += 1
+        self.tokens += (result["usage"] or {}).get("total_tokens") or 0
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        done = self.completed + self.failed
+        return (
+            f"{done}/{self.total} documents ({self.failed} failed) in {elapsed:.1f}s - "
+            f"{done / elapsed:.2f} docs/sec, {self.tokens / elapsed:.1f} tokens/sec"
+        )
+
+
+async def translate_directory(
+    paths: List[str],
+    output_path: str,
+    checkpoint_path: str,
+    extract_concurrency: int,
+    translate_concurrency: int
+) -> PipelineStats:
+    """
+    Translate documents through the extraction and translation stages.
+
+    Args:
+        paths: PDF files to translate
+        output_path: JSONL file results are appended to
+        checkpoint_path: File recording finished documents
+        extract_concurrency: Documents extracted at once
+        translate_concurrency: Documents translated at once
+
+    Returns:
+        Throughput statistics for the run
+    """
+    pdf_processor = PDFProcessor()
+    ai_translator = AITranslator(cache=create_translation_cache())
+    stats = PipelineStats(len(paths))
+
+    pending_paths: asyncio.Queue = asyncio.Queue()
+    for path in paths:
+        pending_paths.put_nowait(path)
+    # Bounded so extraction can't run far ahead of translation
+    extracted: asyncio.Queue = asyncio.Queue(maxsize=translate_concurrency * 2)
+
+    output = open(output_path, "a", encoding="utf-8")
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    def write_result(result: Dict) -> None:
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        if not result["error"]:
+            checkpoint.write(checkpoint_key(result["path"]) + "\n")
+            checkpoint.flush()
+        stats.record(result)
+        status = f"failed: {result['error']}" if result["error"] else result["document_type"]
+        print(f"[{stats.completed + stats.failed}/{stats.total}] {result['path']} - {status}", file=sys.stderr)
+
+    def new_result(path: str, started: float) -> Dict:
+        return {
+            "path": path,
+            "document_type": None,
+            "translation": None,
+            "sections": None,
+            "usage": None,
+            "token_estimate": None,
+            "cached": False,
+            "error": None,
+            "started": started,
+        }
+
+    async def extract_worker() -> None:
+        while not pending_paths.empty():
+            path = pending_paths.get_nowait()
+            result = new_result(path, time.perf_counter())
+            try:
+                text = await pdf_processor.extract_text_from_pdf_async(path)
+                if not text.strip():
+                    raise ValueError("No text could be extracted from the PDF")
+                result["document_type"] = pdf_processor.identify_document_type(text)
+                await extracted.put((result, text))
+            except Exception as e:
+                result["error"] = str(e)
+                write_result(_finish(result))
+
+    async def translate_worker() -> None:
+        while True:
+            item = await extracted.get()
+            if item is None:
+                return
+            result, text = item
+            translation = await ai_translator.translate_document(text, result["document_type"], priority="bulk")
+            if translation["success"]:
+                result.update(
+                    translation=translation["translation"],
+                    sections=translation["sections"],
+                    usage=translation["usage"],
+                    token_estimate=translation.get("token_estimate"),
+                    cached=translation.get("cached", False),
+                )
+            else:
+                result["error"] = translation.get("error", "Translation failed")
+            write_result(_finish(result))
+
+    try:
+        translators = [asyncio.create_task(translate_worker()) for _ in range(translate_concurrency)]
+        await asyncio.gather(*(extract_worker() for _ in range(extract_concurrency)))
+        for _ in translators:
+            await extracted.put(None)
+        await asyncio.gather(*translators)
+    finally:
+        output.close()
+        checkpoint.close()
+        pdf_processor.shutdown()
+        await ai_translator.close()
+
+    return stats
+
+
+def _finish(result: Dict) -> Dict:
+    """Replace the start time with the elapsed time and a completion timestamp."""
+    result["elapsed_seconds"] = round(time.perf_counter() - result.pop("started"), 3)
+    result["completed_at"] = datetime.utcnow().isoformat()
+    return result
+
+
+def run_translate(args: argparse.Namespace) -> int:
+    """Handle the translate command."""
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    finished = load_checkpoint(checkpoint_path)
+    documents = find_documents(args.directory, args.recursive)
+    paths = [path for path in documents if checkpoint_key(path) not in finished]
+
+    print(f"{len(paths)} documents to translate ({len(documents) - len(paths)} already finished)", file=sys.stderr)
+    if not paths:
+        return 0
+
+    stats = asyncio.run(translate_directory(
+        paths,
+        args.output,
+        checkpoint_path,
+        args.extract_concurrency,
+        args.translate_concurrency
+    ))
+    print(stats.summary(), file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Medical Record Translator tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    translate = commands.add_parser("translate", help="Translate every PDF in a directory to a JSONL file")
+    translate.add_argument("directory", help="Directory containing PDF files")
+    translate.add_argument("-o", "--output", default="translations.jsonl", help="JSONL output file (appended to)")
+    translate.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    translate.add_argument("-r", "--recursive", action="store_true", help="Include subdirectories")
+    translate.add_argument(
+        "--extract-concurrency", type=int, default=settings.PDF_EXTRACTION_WORKERS,
+        help="Documents extracted at once"
+    )
+    translate.add_argument(
+        "--translate-concurrency", type=int, default=settings.OPENAI_MAX_CONCURRENT_REQUESTS,
+        help="Documents translated at once"
+    )
+    translate.set_defaults(handler=run_translate)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
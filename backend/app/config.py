@@ -11,12 +11,76 @@ class Settings:
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "")
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))  # seconds
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # e.g. a local fake server for testing
+    # Ask for token usage at the end of streamed responses (stream_options.include_usage);
+    # turn off for OpenAI-compatible servers that reject it. Usage is then estimated.
+    OPENAI_STREAM_USAGE = os.getenv("OPENAI_STREAM_USAGE", "true").lower() == "true"
+    
+    # OpenAI connection pool (shared across all translations in a worker)
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "32"))
+    # Cap on concurrent in-flight LLM requests per worker
+    OPENAI_MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", "32"))
+    
+    # Token budgeting: "auto" uses tiktoken when installed, else a local heuristic
+    TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "auto")
+    MODEL_CONTEXT_TOKENS = int(os.getenv("MODEL_CONTEXT_TOKENS", "128000"))
+    MAX_COMPLETION_TOKENS = int(os.getenv("MAX_COMPLETION_TOKENS", "4096"))
+    MIN_COMPLETION_TOKENS = int(os.getenv("MIN_COMPLETION_TOKENS", "1024"))  # documents whose prompt leaves less room are rejected
+    MAX_DOCUMENT_TOKENS = int(os.getenv("MAX_DOCUMENT_TOKENS", "400000"))  # larger documents are rejected
+    
+    # Documents over this many tokens are translated in chunks of this size
+    TRANSLATION_CHUNK_TOKENS = int(os.getenv("TRANSLATION_CHUNK_TOKENS", "6000"))
+    TRANSLATION_CHUNK_CONCURRENCY = int(os.getenv("TRANSLATION_CHUNK_CONCURRENCY", "4"))  # per document
+    
+    # "markdown" parses section headers out of the text; "json" asks for output
+    # constrained to a JSON schema (needs a model with structured outputs)
+    TRANSLATION_OUTPUT_FORMAT = os.getenv("TRANSLATION_OUTPUT_FORMAT", "markdown")
     
     # File Upload Configuration
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes read per chunk when saving uploads
+    
+    # Where uploads are kept for processing: "auto" (memory up to the threshold,
+    # disk above it), "memory" (always) or "disk" (always). Only applies to the
+    # in-memory job queue; with the Redis queue uploads are always saved to
+    # UPLOAD_DIR, so document content never goes into Redis (or its RDB/AOF files)
+    PDF_IN_MEMORY_MODE = os.getenv("PDF_IN_MEMORY_MODE", "auto")
+    PDF_IN_MEMORY_THRESHOLD = int(os.getenv("PDF_IN_MEMORY_THRESHOLD", str(2 * 1024 * 1024)))  # 2MB
     ALLOWED_EXTENSIONS = {".pdf"}
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/uploads")
     
+    # Extra OCR fixups applied when cleaning extracted text: a JSON object
+    # mapping regex patterns to replacements, e.g. {"\\bl(?=\\d)": "1"}
+    OCR_FIXUPS = os.getenv("OCR_FIXUPS", "")
+    
+    # Document type classification reads only the first pages (0 for all)
+    CLASSIFICATION_MAX_PAGES = int(os.getenv("CLASSIFICATION_MAX_PAGES", "5"))
+    # The type is settled from the pages extracted so far once one type leads
+    # every other by more than this keyword weight, so translation can start
+    # before extraction finishes
+    EARLY_CLASSIFICATION_MARGIN = float(os.getenv("EARLY_CLASSIFICATION_MARGIN", "2.0"))
+    # Long documents start translating chunks while later pages are still extracted
+    EARLY_CHUNK_TRANSLATION = os.getenv("EARLY_CHUNK_TRANSLATION", "true").lower() == "true"
+    
+    # Batch uploads
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "200"))
+    # Largest batch request body; larger ones are refused before they are received
+    # (single uploads are limited to MAX_FILE_SIZE the same way)
+    BATCH_MAX_REQUEST_SIZE = int(os.getenv("BATCH_MAX_REQUEST_SIZE", str(200 * 1024 * 1024)))  # 200MB
+    
+    # Deferred translations (priority=deferred) go through the OpenAI Batch API
+    DEFERRED_POLL_INTERVAL = float(os.getenv("DEFERRED_POLL_INTERVAL", "60"))  # seconds between submit/poll rounds
+    DEFERRED_MAX_BATCH_REQUESTS = int(os.getenv("DEFERRED_MAX_BATCH_REQUESTS", "1000"))  # submit early at this size
+    DEFERRED_COMPLETION_WINDOW = os.getenv("DEFERRED_COMPLETION_WINDOW", "24h")
+    
+    # PDF extraction process pool
+    PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PDF_EXTRACTION_QUEUE_DEPTH = int(os.getenv("PDF_EXTRACTION_QUEUE_DEPTH", "16"))  # tasks waiting for a worker
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+    PDF_MAX_TASKS_PER_DOCUMENT = int(os.getenv("PDF_MAX_TASKS_PER_DOCUMENT", "2"))
+    
     # Security
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
     
@@ -24,10 +88,59 @@ class Settings:
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
     JOB_EXPIRY = 3600  # 1 hour
     
+    # Job Store: "memory" (single worker), "redis" (shared) or "fakeredis" (testing)
+    JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "memory")
+    JOB_STORE_MAX_JOBS = int(os.getenv("JOB_STORE_MAX_JOBS", "1000"))  # memory backend only
+    
+    # Job Queue: uploads are queued and run by workers. "memory" queues in the
+    # web process (workers must run there), "redis" shares a Redis stream
+    # with separate `python -m app.worker` processes, "fakeredis" is for testing
+    JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")
+    JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100"))  # uploads get 429 beyond this many waiting jobs
+    JOB_QUEUE_RETRY_AFTER = int(os.getenv("JOB_QUEUE_RETRY_AFTER", "10"))  # seconds, sent with 429/503 responses
+    JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))  # seconds before a crashed worker's job is retried
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_WORKERS_IN_WEB = os.getenv("JOB_WORKERS_IN_WEB", "true").lower() == "true"  # run a worker pool in each web process
+    JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "8"))  # jobs per worker process
+    JOB_WORKER_EXTRACTION_CONCURRENCY = int(os.getenv("JOB_WORKER_EXTRACTION_CONCURRENCY", "4"))  # 0 = no limit
+    JOB_WORKER_TRANSLATION_CONCURRENCY = int(os.getenv("JOB_WORKER_TRANSLATION_CONCURRENCY", "8"))  # 0 = no limit
+    WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))  # serve /metrics from `python -m app.worker`; 0 = off
+    
+    # Tracing: jobs uploaded with trace=true (or every job) record timed spans,
+    # shown by /status/{job_id}?trace=1. Finished traces are also sent to an
+    # OpenTelemetry collector when an OTLP/HTTP traces endpoint is set, e.g.
+    # http://localhost:4318/v1/traces
+    TRACE_ALL_JOBS = os.getenv("TRACE_ALL_JOBS", "false").lower() == "true"
+    OTEL_EXPORTER_OTLP_TRACES_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", "")
+    OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "medical-record-translator")
+    
+    # Streaming (Server-Sent Events)
+    STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "0.1"))  # seconds between event log checks
+    STREAM_KEEPALIVE_INTERVAL = float(os.getenv("STREAM_KEEPALIVE_INTERVAL", "15"))  # seconds
+    
+    # Translation Cache: comma-separated tiers checked in order ("memory", "disk", "redis"),
+    # empty to disable. The disk tier stores translations (patient data) on local disk.
+    TRANSLATION_CACHE_TIERS = os.getenv("TRANSLATION_CACHE_TIERS", "memory")
+    TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", "86400"))  # 24 hours
+    TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "512"))
+    TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32MB
+    TRANSLATION_CACHE_DIR = os.getenv("TRANSLATION_CACHE_DIR", "/tmp/translation-cache")
+    TRANSLATION_CACHE_DISK_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))  # 512MB
+    
     # Google Cloud Storage (optional for production)
     GCS_BUCKET = os.getenv("GCS_BUCKET", "")
     
-    # Rate Limiting
-    RATE_LIMIT_PER_MINUTE = 10
+    # Rate Limiting: every LLM request goes through one scheduler per process
+    # that keeps within these limits (0 disables a limit) and retries
+    # rate-limited, timed-out and server-error responses with exponential
+    # backoff. The limits apply to each web and worker process, and every
+    # chunk of a long document is a request: set them to the account's
+    # limits divided by the number of processes, or leave them off and rely
+    # on the backoff when the API answers 429
+    RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "0"))  # LLM requests
+    RATE_LIMIT_TOKENS_PER_MINUTE = int(os.getenv("RATE_LIMIT_TOKENS_PER_MINUTE", "0"))  # prompt + max completion tokens
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))  # seconds, doubled per retry
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "60"))  # seconds
 
 settings = Settings()
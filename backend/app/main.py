@@ -7,7 +7,9 @@ import time
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.routers import translate
+from app.routers import translate, batch, metrics
+from app.services.validators import MULTIPART_OVERHEAD, RequestSizeLimit
+from app.worker import create_worker_pool
 
 # Lifespan context manager for startup/shutdown events
 @asynccontextmanager
@@ -17,9 +19,24 @@ async def lifespan(app: FastAPI):
     # Create upload directory if it doesn't exist
     import os
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    # Process queued documents in this process too, unless only separate workers should
+    worker_pool = create_worker_pool() if settings.JOB_WORKERS_IN_WEB else None
+    if worker_pool:
+        await worker_pool.start()
+        # Finish deferred translations submitted before a restart
+        await translate.deferred_translator.resume()
     yield
     # Shutdown
     print("Shutting down Medical Record Translator API...")
+    if worker_pool:
+        await worker_pool.stop()
+    await translate.deferred_translator.close()
+    await translate.ai_translator.close()
+    translate.pdf_processor.shutdown()
+    await translate.job_queue.close()
+    await translate.job_store.close()
+    if translate.trace_exporter:
+        await translate.trace_exporter.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,6 +55,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized uploads before receiving them
+app.add_middleware(
+    RequestSizeLimit,
+    limits={
+        f"{settings.API_V1_STR}/translate/upload": settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+        f"{settings.API_V1_STR}/translate/batch": settings.BATCH_MAX_REQUEST_SIZE
+    }
+)
+
 # Add request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -52,7 +78,8 @@ async def add_process_time_header(request: Request, call_next):
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(RequestValidationError)
@@ -68,6 +95,12 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}/translate",
     tags=["translate"]
 )
+app.include_router(
+    batch.router,
+    prefix=f"{settings.API_V1_STR}/translate",
+    tags=["batch"]
+)
+app.include_router(metrics.router, tags=["metrics"])
 
 # Root endpoint
 @app.get("/")
@@ -88,9 +121,13 @@ async def api_info():
         "description": "Translate medical records into plain English",
         "endpoints": {
             "upload": f"{settings.API_V1_STR}/translate/upload",
+            "batch": f"{settings.API_V1_STR}/translate/batch",
+            "batch_status": f"{settings.API_V1_STR}/translate/batch/{{batch_id}}",
             "status": f"{settings.API_V1_STR}/translate/status/{{job_id}}",
+            "stream": f"{settings.API_V1_STR}/translate/stream/{{job_id}}",
             "result": f"{settings.API_V1_STR}/translate/result/{{job_id}}",
-            "health": f"{settings.API_V1_STR}/translate/health"
+            "health": f"{settings.API_V1_STR}/translate/health",
+            "metrics": "/metrics"
         },
         "supported_formats": list(settings.ALLOWED_EXTENSIONS),
         "max_file_size_mb": settings.MAX_FILE_SIZE / 1024 / 1024
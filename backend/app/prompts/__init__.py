@@ -1 +1,25 @@
 # Prompts package
+import hashlib
+
+from app.prompts.lab_results import LAB_RESULTS_SYSTEM_PROMPT, LAB_RESULTS_USER_PROMPT
+from app.prompts.prescriptions import PRESCRIPTION_SYSTEM_PROMPT, PRESCRIPTION_USER_PROMPT
+from app.prompts.chunking import (
+    CHUNK_SYSTEM_PROMPT, LAB_RESULTS_CHUNK_PROMPT, PRESCRIPTION_CHUNK_PROMPT, CHUNK_NOTES_INTRO
+)
+from app.prompts.structured import STRUCTURED_OUTPUT_INSTRUCTIONS
+
+# Fingerprint of the prompt templates. Cached translations are keyed on it,
+# so editing a prompt invalidates them.
+PROMPT_VERSION = hashlib.sha256(
+    "\0".join([
+        LAB_RESULTS_SYSTEM_PROMPT,
+        LAB_RESULTS_USER_PROMPT,
+        PRESCRIPTION_SYSTEM_PROMPT,
+        PRESCRIPTION_USER_PROMPT,
+        CHUNK_SYSTEM_PROMPT,
+        LAB_RESULTS_CHUNK_PROMPT,
+        PRESCRIPTION_CHUNK_PROMPT,
+        CHUNK_NOTES_INTRO,
+        STRUCTURED_OUTPUT_INSTRUCTIONS,
+    ]).encode("utf-8")
+).hexdigest()[:12]
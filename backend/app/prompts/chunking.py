@@ -0,0 +1,31 @@
+CHUNK_SYSTEM_PROMPT = """You are a meticulous medical records assistant. You extract facts from part of a longer medical document so they can be explained to the patient later.
+
+Requirements:
+- Copy every value, unit, reference range and instruction exactly as written
+- Never leave out an item, even if it looks normal or unimportant
+- Do not explain, interpret or reassure - only extract
+- If the text is cut off mid-item, extract what is there"""
+
+LAB_RESULTS_CHUNK_PROMPT = """This is part {part} of {total} of a lab report. Extract the facts from this part only:
+
+{content}
+
+List every test in this part, one per line:
+- Test name: exact value with unit (reference range) - normal / high / low / borderline
+
+Then list any other relevant details from this part (patient information, specimen notes, doctor comments)."""
+
+PRESCRIPTION_CHUNK_PROMPT = """This is part {part} of {total} of a prescription. Extract the facts from this part only:
+
+{content}
+
+List every medication in this part, one per line:
+- Medication name and strength: form, directions, quantity, refills
+
+Then list any other relevant details from this part (prescriber, pharmacy, warnings, notes)."""
+
+# Replaces the document content in the user prompt when a document was
+# translated in parts
+CHUNK_NOTES_INTRO = """(This document was too long to read in one pass, so the facts below were extracted from each part of it. Every value is copied exactly from the original document.)
+
+{notes}"""
@@ -0,0 +1,5 @@
+STRUCTURED_OUTPUT_INSTRUCTIONS = """Output format:
+- Return your explanation as a JSON object matching the provided schema, not as markdown with section headers
+- Put the text of each section in the field named for it; the text may use markdown (lists, bold) but no section headers
+- Keep the same warm, conversational style and every exact number and reference range
+- If the schema has a "tests" list, add one record per test in the document with its exact result, unit and normal range"""
@@ -0,0 +1,327 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import asyncio
+import os
+import uuid
+import zipfile
+from datetime import datetime
+
+from app.config import settings
+from app.routers.translate import (
+    check_queue_capacity, create_job, enqueue_document, file_validator, job_store, receive_document,
+    start_trace, validate_priority
+)
+
+router = APIRouter()
+
+ZIP_CONTENT_TYPES = ['application/zip', 'application/x-zip-compressed']
+
+# Rejected files listed with a batch; the rest are only counted
+MAX_LISTED_REJECTIONS = 100
+
+# A file of a batch not yet read: (filename, function opening it)
+PendingFile = Tuple[str, Callable[[], UploadFile]]
+
+class _Rejections:
+    """Files rejected from a batch, listing the first MAX_LISTED_REJECTIONS."""
+
+    def __init__(self):
+        self.listed: List[Dict] = []
+        self.total = 0
+
+    def add(self, filename: Optional[str], error) -> None:
+        self.total += 1
+        if len(self.listed) < MAX_LISTED_REJECTIONS:
+            self.listed.append({"filename": filename, "error": error})
+
+@router.post("/batch")
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    priority: str = Form("interactive"),
+    trace: bool = Form(False)
+) -> Dict:
+    """
+    Upload several medical documents, or zip archives of them, for translation.
+
+    Each PDF becomes a child job that can also be followed through
+    /status/{job_id}. Files that fail validation are reported and skipped.
+    Each PDF is queued as soon as it has been read, so only one is held at
+    a time, and workers may start on it before the rest are read.
+
+    Args:
+        files: PDF files and/or zip archives containing PDF files
+        priority: "interactive", or "deferred" to translate through the
+            OpenAI Batch API
+        trace: Record a trace of each file's job, shown by
+            /status/{job_id}?trace=1
+
+    Returns:
+        Batch ID, the child jobs and the rejected files (the first
+        MAX_LISTED_REJECTIONS of them, with their total count)
+
+    Raises:
+        HTTPException: 429 or 503 with the queue depth while the job queue
+            is full or no worker is taking jobs. Files beyond the room left
+            in the queue are rejected.
+    """
+    validate_priority(priority)
+    batch_id = str(uuid.uuid4())
+    jobs: List[Dict] = []
+    # Every job created, including one whose enqueueing failed
+    job_ids: List[str] = []
+    rejections = _Rejections()
+
+    try:
+        # Every PDF of the batch, zip members still unread, so the queue is checked for all of them
+        candidates: List[PendingFile] = []
+        for file in files:
+            if _is_zip(file):
+                candidates.extend(_zip_members(file, rejections))
+                continue
+            try:
+                file_validator.validate_content_type(file.content_type)
+            except HTTPException as e:
+                rejections.add(file.filename, e.detail)
+                continue
+            candidates.append((file.filename, lambda file=file: file))
+
+        if candidates:
+            room = await check_queue_capacity()
+            for filename, _ in candidates[settings.BATCH_MAX_FILES:]:
+                rejections.add(filename, f"Batch is limited to {settings.BATCH_MAX_FILES} files")
+            candidates = candidates[:settings.BATCH_MAX_FILES]
+            for filename, _ in candidates[room:]:
+                rejections.add(filename, "Job queue is full; upload this file again later")
+            candidates = candidates[:room]
+
+        # Workers finishing documents before the upload is done leave an "uploading" batch alone
+        await job_store.create(batch_id, {
+            "type": "batch",
+            "status": "uploading",
+            "created_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "priority": priority,
+            "jobs": [],
+            "rejected": [],
+            "rejected_total": 0
+        })
+
+        for filename, open_file in candidates:
+            job_id = str(uuid.uuid4())
+            job_trace = start_trace(job_id, priority, trace)
+            try:
+                saved_filename, document = await receive_document(open_file(), job_id, job_trace)
+            except HTTPException as e:
+                rejections.add(filename, e.detail)
+                continue
+            except Exception as e:
+                # e.g. a corrupt zip member; the rest of the batch can still be read
+                rejections.add(filename, f"Upload failed: {str(e)}")
+                continue
+            job_ids.append(job_id)
+            try:
+                await create_job(job_id, saved_filename, trace=job_trace, batch_id=batch_id, priority=priority)
+                await enqueue_document(job_id, document, priority, batch_id=batch_id)
+            except Exception:
+                _discard_document(document)
+                raise
+            jobs.append({"job_id": job_id, "filename": saved_filename})
+
+    except Exception as e:
+        # Workers skip queued documents whose job no longer exists
+        await _discard_batch(batch_id, job_ids)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    if not jobs:
+        await job_store.delete(batch_id)
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "No valid PDF files in batch", "rejected": rejections.listed}
+        )
+
+    await job_store.update(
+        batch_id, status="processing", jobs=jobs, rejected=rejections.listed, rejected_total=rejections.total
+    )
+    # The last document may have finished while the others were read
+    await complete_batch_if_finished(batch_id)
+
+    return {
+        "batch_id": batch_id,
+        "status": "processing",
+        "priority": priority,
+        "jobs": jobs,
+        "rejected": rejections.listed,
+        "rejected_total": rejections.total,
+        "message": f"{len(jobs)} documents uploaded successfully. Processing started."
+    }
+
+def _is_zip(file: UploadFile) -> bool:
+    """Check whether an uploaded file is a zip archive."""
+    return (
+        os.path.splitext(file.filename or "")[1].lower() == ".zip"
+        or file.content_type in ZIP_CONTENT_TYPES
+    )
+
+def _zip_members(file: UploadFile, rejections: _Rejections) -> List[PendingFile]:
+    """
+    List the PDF files inside an uploaded zip archive.
+
+    Args:
+        file: The uploaded zip archive
+        rejections: Where unreadable archives and non-PDF members are added
+
+    Returns:
+        The PDF members, each opened from the archive as an UploadFile when needed
+    """
+    try:
+        archive = zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        rejections.add(file.filename, "Invalid zip archive")
+        return []
+
+    members = []
+    for info in archive.infolist():
+        if info.is_dir() or os.path.basename(info.filename).startswith("."):
+            continue
+        if os.path.splitext(info.filename)[1].lower() not in settings.ALLOWED_EXTENSIONS:
+            rejections.add(f"{file.filename}/{info.filename}", "Not a PDF file")
+            continue
+        filename = os.path.basename(info.filename)
+        # save_upload still enforces the size limit on the decompressed stream
+        members.append((filename, lambda info=info, filename=filename: UploadFile(
+            file=archive.open(info), filename=filename, size=info.file_size
+        )))
+    return members
+
+def _discard_document(document: Union[bytes, str]) -> None:
+    """Delete a document if it was saved to disk."""
+    if isinstance(document, str):
+        try:
+            os.remove(document)
+        except OSError:
+            pass
+
+async def _discard_batch(batch_id: str, job_ids: List[str]) -> None:
+    """Delete a batch whose upload failed, and its jobs, so that workers skip the queued documents."""
+    results = await asyncio.gather(
+        *(job_store.delete(job_id) for job_id in job_ids), job_store.delete(batch_id), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Failed batch {batch_id} could not be fully deleted: {result}")
+            break
+
+async def complete_batch_if_finished(batch_id: str) -> None:
+    """
+    Mark a batch as completed once none of its documents are still being
+    processed; called by the worker after each document of the batch.
+
+    Deferred documents count as processed once they are queued for the
+    Batch API; the batch is still reported as processing until they finish.
+    Until then the batch's expiry is restarted, like that of a job that
+    makes progress (the deferred translator does the same while deferred
+    documents wait).
+
+    Args:
+        batch_id: Batch identifier
+    """
+    batch = await job_store.get(batch_id)
+    if batch is None:
+        return
+    if batch["status"] != "processing":
+        # Completed, or still uploading (the upload checks once it is done)
+        await job_store.touch(batch_id)
+        return
+    children = await asyncio.gather(*(job_store.get(job["job_id"]) for job in batch["jobs"]))
+    if all(
+        child is None or child["status"] in ("completed", "failed") or child.get("deferred_status")
+        for child in children
+    ):
+        await job_store.update(batch_id, status="completed", completed_at=datetime.utcnow().isoformat())
+    else:
+        await job_store.touch(batch_id)
+
+async def _get_batch(batch_id: str) -> Tuple[Dict, List[Dict]]:
+    """Load a batch and its child jobs, raising 404 if it doesn't exist."""
+    batch = await job_store.get(batch_id)
+    if batch is None or batch.get("type") != "batch":
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    children = await asyncio.gather(*(job_store.get(job["job_id"]) for job in batch["jobs"]))
+    return batch, children
+
+def _batch_status(batch: Dict, statuses: List[str]) -> str:
+    """Report a batch as processing while any of its files are (e.g. deferred ones)."""
+    if batch["status"] == "completed" and any(status not in ("completed", "failed", "expired") for status in statuses):
+        return "processing"
+    return batch["status"]
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str) -> Dict:
+    """
+    Get aggregate progress and per-file status of a batch.
+
+    Args:
+        batch_id: The batch identifier
+
+    Returns:
+        Batch status, overall progress and the status of each file
+    """
+    batch, children = await _get_batch(batch_id)
+
+    files = []
+    for job, child in zip(batch["jobs"], children):
+        child = child or {"status": "expired", "progress": 0, "error": None}
+        files.append({
+            "job_id": job["job_id"],
+            "filename": job["filename"],
+            "status": child["status"],
+            "progress": child["progress"],
+            "error": child["error"]
+        })
+
+    return {
+        "batch_id": batch_id,
+        "status": _batch_status(batch, [f["status"] for f in files]),
+        "progress": round(sum(f["progress"] for f in files) / len(files)) if files else 0,
+        "total": len(files),
+        "completed": sum(1 for f in files if f["status"] == "completed"),
+        "failed": sum(1 for f in files if f["status"] == "failed"),
+        "created_at": batch["created_at"],
+        "completed_at": batch["completed_at"],
+        "files": files,
+        "rejected": batch["rejected"],
+        "rejected_total": batch["rejected_total"]
+    }
+
+@router.get("/batch/{batch_id}/results")
+async def get_batch_results(batch_id: str) -> Dict:
+    """
+    Get the translation results of every finished file in a batch.
+
+    Args:
+        batch_id: The batch identifier
+
+    Returns:
+        Per-file results or errors; unfinished files are listed with their status
+    """
+    batch, children = await _get_batch(batch_id)
+
+    results = []
+    for job, child in zip(batch["jobs"], children):
+        child = child or {"status": "expired", "result": None, "error": None}
+        results.append({
+            "job_id": job["job_id"],
+            "filename": job["filename"],
+            "status": child["status"],
+            "result": child["result"],
+            "error": child["error"]
+        })
+
+    return {
+        "batch_id": batch_id,
+        "status": _batch_status(batch, [r["status"] for r in results]),
+        "results": results
+    }
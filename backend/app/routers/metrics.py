@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.routers import translate
+from app.services.metrics import (
+    CONTENT_TYPE, JOB_QUEUE_DEPTH, JOBS_IN_PROGRESS, LLM_IN_FLIGHT, LLM_QUEUE_DEPTH, REGISTRY
+)
+
+router = APIRouter()
+
+# The scheduler's state is read whenever metrics are collected
+LLM_QUEUE_DEPTH.set_function(lambda: translate.ai_translator.scheduler.queue_depth)
+LLM_IN_FLIGHT.set_function(lambda: translate.ai_translator.scheduler.in_flight)
+
+async def render_metrics() -> str:
+    """
+    Collect this process's metrics, with the job queue's current state.
+    
+    Returns:
+        Metrics in the Prometheus text exposition format
+    """
+    try:
+        stats = await translate.job_queue.stats()
+        JOB_QUEUE_DEPTH.set(stats["waiting"])
+        JOBS_IN_PROGRESS.set(stats["in_progress"])
+    except Exception as e:
+        # Report the rest rather than fail the scrape
+        print(f"Could not read job queue stats for metrics: {e}")
+    return REGISTRY.render()
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """
+    Metrics for Prometheus: per-stage latency histograms, token, cache and
+    failure counters, and queue gauges. Each process (web server or worker)
+    reports its own; scrape them all.
+    """
+    return Response(await render_metrics(), headers={"Content-Type": CONTENT_TYPE})
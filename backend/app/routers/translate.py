@@ -1,76 +1,96 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Dict
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+import asyncio
+import json
 import os
+import time
 import uuid
-import aiofiles
 from datetime import datetime
 import shutil
 
 from app.config import settings
 from app.services.pdf_processor import PDFProcessor
 from app.services.ai_translator import AITranslator
+from app.services.deferred_translator import DeferredTranslator
 from app.services.validators import FileValidator
+from app.services.progress import ProgressTracker, StageTimer
+from app.services.job_store import JobEventWriter, JobProgressWriter, create_job_store
+from app.services.job_queue import create_job_queue
+from app.services.metrics import JOB_FAILURES, JOBS_COMPLETED
+from app.services.tracing import Trace, activate, create_trace_exporter, span
+from app.services.worker_pool import StageLimits
+from app.services.translation_cache import create_translation_cache
 
 router = APIRouter()
 
 # Initialize services
 pdf_processor = PDFProcessor()
-ai_translator = AITranslator()
+ai_translator = AITranslator(cache=create_translation_cache())
 file_validator = FileValidator()
 
-# In-memory storage for job status (in production, use Redis)
-job_status = {}
+# Job status storage, shared between workers when backed by Redis
+job_store = create_job_store()
+
+# Uploaded documents wait here for a worker (app.worker)
+job_queue = create_job_queue()
+
+# Jobs of this process allowed in each stage at once
+stage_limits = StageLimits({
+    "extraction": settings.JOB_WORKER_EXTRACTION_CONCURRENCY,
+    "translation": settings.JOB_WORKER_TRANSLATION_CONCURRENCY
+})
+
+# Sends finished job traces to an OpenTelemetry collector, if one is configured
+trace_exporter = create_trace_exporter(settings.OTEL_EXPORTER_OTLP_TRACES_ENDPOINT, settings.OTEL_SERVICE_NAME)
+
+# "interactive" translates right away; "deferred" goes through the OpenAI Batch API
+PRIORITIES = ("interactive", "deferred")
 
 @router.post("/upload")
 async def upload_document(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    priority: str = Form("interactive"),
+    trace: bool = Form(False)
 ) -> Dict:
     """
     Upload a medical document for translation.
     
     Args:
         file: The uploaded PDF file
+        priority: "interactive", or "deferred" for cheaper, slower translation
+            through the OpenAI Batch API (results within the completion window)
+        trace: Record a trace of the job, shown by /status/{job_id}?trace=1
         
     Returns:
         Job ID and initial status
+        
+    Raises:
+        HTTPException: 429 while too many documents are waiting, 503 if no
+            worker is taking jobs; both report the queue depth
     """
     try:
         # Validate the uploaded file
-        await file_validator.validate_upload(file)
+        validate_priority(priority)
         file_validator.validate_content_type(file.content_type)
+        await check_queue_capacity()
         
         # Generate unique job ID
         job_id = str(uuid.uuid4())
+        job_trace = start_trace(job_id, priority, trace)
         
-        # Create upload directory if it doesn't exist
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-        
-        # Save the file temporarily
-        filename = file_validator.sanitize_filename(file.filename)
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{job_id}_{filename}")
-        
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        filename, document = await receive_document(file, job_id, job_trace)
         
         # Initialize job status
-        job_status[job_id] = {
-            "status": "processing",
-            "progress": 0,
-            "filename": filename,
-            "created_at": datetime.utcnow().isoformat(),
-            "result": None,
-            "error": None
-        }
+        await create_job(job_id, filename, trace=job_trace, priority=priority)
         
-        # Process the document in the background
-        background_tasks.add_task(process_document, job_id, file_path)
+        # Hand the document to a worker
+        await enqueue_document(job_id, document, priority)
         
         return {
             "job_id": job_id,
             "status": "processing",
+            "priority": priority,
             "message": "Document uploaded successfully. Processing started."
         }
         
@@ -79,105 +99,510 @@ async def upload_document(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
-async def process_document(job_id: str, file_path: str):
+async def check_queue_capacity() -> int:
+    """
+    Refuse new documents while the job queue is full or nothing is taking jobs.
+    
+    Returns:
+        Number of documents that can still be queued (at least 1)
+    
+    Raises:
+        HTTPException: 429 when JOB_QUEUE_MAX_DEPTH jobs are waiting, 503 when
+            no worker is registered or the queue can't be reached
+    """
+    headers = {"Retry-After": str(settings.JOB_QUEUE_RETRY_AFTER)}
+    try:
+        stats = await job_queue.stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": f"Job queue unavailable: {str(e)}", "queue_depth": None},
+            headers=headers
+        )
+    if stats["workers"] == 0:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "No workers are processing documents", "queue_depth": stats["waiting"]},
+            headers=headers
+        )
+    if stats["waiting"] >= settings.JOB_QUEUE_MAX_DEPTH:
+        raise HTTPException(
+            status_code=429,
+            detail={"message": "Too many documents are waiting to be processed", "queue_depth": stats["waiting"]},
+            headers=headers
+        )
+    return settings.JOB_QUEUE_MAX_DEPTH - stats["waiting"]
+
+async def enqueue_document(
+    job_id: str,
+    document: Union[bytes, str],
+    priority: str,
+    batch_id: Optional[str] = None
+) -> None:
     """
-    Process the document in the background.
+    Queue a received document for processing by a worker.
     
     Args:
         job_id: Unique job identifier
-        file_path: Path to the uploaded file
+        document: The uploaded PDF content (in-process queues only), or the
+            path it was saved to (workers on other hosts need UPLOAD_DIR on
+            shared storage)
+        priority: "interactive" or "deferred"
+        batch_id: Batch the document belongs to, if any
     """
-    import asyncio
+    await job_queue.enqueue({
+        "job_id": job_id,
+        "document": document,
+        "priority": priority,
+        "batch_id": batch_id
+    })
+
+def start_trace(job_id: str, priority: str, requested: bool) -> Optional[Trace]:
+    """Start a job's trace if the upload asked for one or every job is traced."""
+    if not (requested or settings.TRACE_ALL_JOBS):
+        return None
+    return Trace("job", **{"job.id": job_id, "job.priority": priority})
+
+def validate_priority(priority: str) -> None:
+    """Reject unknown translation priorities."""
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid priority: {priority}. Use one of: {', '.join(PRIORITIES)}"
+        )
+
+async def receive_document(
+    file: UploadFile,
+    job_id: str,
+    trace: Optional[Trace] = None
+) -> Tuple[str, Union[bytes, str]]:
+    """
+    Validate an uploaded PDF and keep it in memory or save it temporarily.
     
-    try:
-        # Start processing - 10%
-        job_status[job_id]["progress"] = 10
-        job_status[job_id]["status"] = "processing"
-        await asyncio.sleep(0.3)
+    Args:
+        file: The uploaded PDF file
+        job_id: Job the document belongs to
+        trace: The job's trace, if it is traced
         
-        # Extracting text - 20-30%
-        job_status[job_id]["progress"] = 20
-        job_status[job_id]["status"] = "extracting_text"
-        await asyncio.sleep(0.3)
+    Returns:
+        Tuple of (sanitized filename, document content or saved file path)
+    """
+    await file_validator.validate_upload(file)
+    
+    # Create upload directory if it doesn't exist
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    
+    # Keep small files in memory; save larger ones temporarily
+    filename = file_validator.sanitize_filename(file.filename)
+    file_path = os.path.join(settings.UPLOAD_DIR, f"{job_id}_{filename}")
+    
+    with activate(trace), span("upload.write") as upload_span:
+        document = await file_validator.save_upload(file, file_path, _memory_threshold())
+        upload_span.set_attribute("stored", "memory" if isinstance(document, bytes) else "disk")
+    return filename, document
+
+async def create_job(job_id: str, filename: str, trace: Optional[Trace] = None, **fields) -> None:
+    """
+    Initialize the status of a new translation job.
+    
+    Args:
+        job_id: Unique job identifier
+        filename: Name of the uploaded file
+        trace: The job's trace, if it is traced; workers carry it on
+        **fields: Extra fields to store with the job
+    """
+    await job_store.create(job_id, {
+        "status": "processing",
+        "progress": 0,
+        "filename": filename,
+        "created_at": datetime.utcnow().isoformat(),
+        "result": None,
+        "error": None,
+        "trace": trace.to_dict() if trace else None,
+        **fields
+    })
+
+def _memory_threshold() -> int:
+    """
+    Largest upload kept in memory under settings.PDF_IN_MEMORY_MODE.
+    
+    Uploads for a queue shared with other processes are always saved to
+    disk, so document content never goes through (and is persisted by) Redis.
+    """
+    if not job_queue.in_process:
+        return 0
+    mode = settings.PDF_IN_MEMORY_MODE
+    if mode == "auto":
+        return settings.PDF_IN_MEMORY_THRESHOLD
+    if mode == "memory":
+        return settings.MAX_FILE_SIZE
+    if mode == "disk":
+        return 0
+    raise ValueError(f"Unsupported PDF in-memory mode: {mode}")
+
+async def process_document(
+    job_id: str,
+    document: Union[bytes, str],
+    priority: str = "interactive",
+    trace: Optional[Dict] = None,
+    batch_id: Optional[str] = None
+):
+    """
+    Process a document; run by a worker for each queued job.
+    
+    Progress is driven by stage completion events reported by the services.
+    Pages are cleaned as they are extracted and the document type is settled
+    from the first pages, so the API connection is warmed up and chunks of
+    long documents start translating while later pages are still extracted.
+    The time spent in each stage is stored with the result.
+    Deferred jobs stop after classification; the deferred translator
+    completes them when their batch finishes. Extraction and translation
+    each wait for a slot under stage_limits. If processing is cancelled
+    (the worker is shutting down), a saved upload is kept so the job can be
+    run again. Traced jobs record a span for each step into their trace,
+    which is stored with the result.
+    
+    Args:
+        job_id: Unique job identifier
+        document: The uploaded PDF content, or the path it was saved to
+        priority: "interactive" or "deferred"
+        trace: The job's stored trace, if it is traced
+        batch_id: Upload batch the document belongs to, if any
+    """
+    job_trace = Trace.from_dict(trace) if trace else None
+    if job_trace:
+        # From the end of the upload until a worker took the job
+        job_trace.add_span("job_queue", job_trace.last_end_ns(), time.time_ns())
+    with activate(job_trace):
+        await _process_document(job_id, document, priority, job_trace, batch_id)
+
+async def _process_document(
+    job_id: str,
+    document: Union[bytes, str],
+    priority: str,
+    trace: Optional[Trace],
+    batch_id: Optional[str]
+):
+    """Process a document for process_document, with its trace (if any) active."""
+    write_progress = JobProgressWriter(job_store, job_id)
+    track_progress = ProgressTracker(write_progress)
+    events = JobEventWriter(job_store, job_id)
+    timer = StageTimer()
+    early_chunks = None
+    warm_up = None
+    # Deferred documents that couldn't be batched wait behind interactive ones
+    llm_priority = "bulk" if priority == "deferred" else "interactive"
+    # Stage a failure is counted against
+    stage = "extraction"
+    
+    try:
+        # The upload has been written to disk
+        track_progress("upload", 1, 1)
         
-        # Extract text from PDF
-        extracted_text = pdf_processor.extract_text_from_pdf(file_path)
+        # Extract text from PDF, identifying the document type along the way
+        pages = []
+        doc_type = None
+        async with stage_limits.slot("extraction"):
+            extraction_start = time.perf_counter()
+            with span("extraction"):
+                async for page_count, page_num, page in pdf_processor.iter_pages_async(document, track_progress):
+                    pages.append(page)
+                    if doc_type is not None:
+                        if early_chunks:
+                            early_chunks.add_page(page, page_num)
+                        continue
+                    
+                    stage = "classification"
+                    with timer.measure("classification"), span("classify", pages=page_num):
+                        doc_type = pdf_processor.identify_document_type_early(pages, page_num, page_count)
+                    stage = "extraction"
+                    if doc_type is not None and priority == "interactive":
+                        warm_up = asyncio.create_task(ai_translator.warm_up())
+                        if settings.EARLY_CHUNK_TRANSLATION:
+                            early_chunks = ai_translator.early_chunk_translation(doc_type, page_count, llm_priority)
+                            for extracted_page in pages:
+                                early_chunks.add_page(extracted_page, page_num)
+            timer.record("extraction", extraction_start, time.perf_counter())
         
+        extracted_text = pdf_processor.join_pages(pages)
         if not extracted_text.strip():
             raise ValueError("No text could be extracted from the PDF")
         
-        job_status[job_id]["progress"] = 30
-        await asyncio.sleep(0.3)
-        
-        # Identifying document type - 40-50%
-        job_status[job_id]["progress"] = 40
-        job_status[job_id]["status"] = "identifying_document_type"
-        await asyncio.sleep(0.3)
+        # The type is usually known by now; report the stage once extraction is done
+        track_progress("classification", 0, 1)
+        track_progress("classification", 1, 1)
         
-        # Identify document type
-        doc_type = pdf_processor.identify_document_type(extracted_text)
+        stage = "translation"
+        if priority == "deferred" and await defer_translation(job_id, extracted_text, doc_type, batch_id):
+            track_progress("translation", 0, 1)
+            await write_progress.drain()
+            _remove_upload(document)
+            if trace:
+                # The trace ends here; the Batch API translates the document later
+                await job_store.update(job_id, trace=trace.to_dict())
+            return
         
-        job_status[job_id]["progress"] = 50
-        await asyncio.sleep(0.3)
+        # Translate the document, publishing tokens and section headers for streaming
+        track_progress("translation", 0, 1)
         
-        # Translating - 60-90%
-        job_status[job_id]["progress"] = 60
-        job_status[job_id]["status"] = "translating"
-        await asyncio.sleep(0.3)
+        def publish_tokens(text: str):
+            events.emit("token", {"text": text})
         
-        job_status[job_id]["progress"] = 70
-        await asyncio.sleep(0.3)
+        def publish_section(section_key: str, header: str):
+            events.emit("section", {"section": section_key, "header": header})
         
-        # Translate the document
-        translation_result = await ai_translator.translate_document(extracted_text, doc_type)
+        async with stage_limits.slot("translation"):
+            with timer.measure("translation"), span("translation"):
+                translation_result = await ai_translator.translate_document(
+                    extracted_text, doc_type, track_progress, publish_tokens, early_chunks, publish_section,
+                    llm_priority
+                )
+        if early_chunks:
+            for start, end in early_chunks.chunk_times:
+                timer.record("chunk_translation", start, end)
         
         if not translation_result["success"]:
             raise ValueError(translation_result.get("error", "Translation failed"))
         
-        job_status[job_id]["progress"] = 80
-        await asyncio.sleep(0.3)
-        
-        job_status[job_id]["progress"] = 90
-        await asyncio.sleep(0.3)
-        
         # Finalizing - 100%
-        job_status[job_id]["progress"] = 100
-        job_status[job_id]["status"] = "completed"
-        job_status[job_id]["result"] = {
-            "document_type": doc_type,
-            "translation": translation_result["translation"],
-            "sections": translation_result["sections"],
-            "original_text_preview": extracted_text[:500] + "..." if len(extracted_text) > 500 else extracted_text
-        }
+        await write_progress.drain()
+        await events.drain()
+        _remove_upload(document)
+        await complete_job(job_id, translation_result, _text_preview(extracted_text), timer.breakdown(), trace)
         
     except Exception as e:
-        job_status[job_id]["status"] = "failed"
-        job_status[job_id]["error"] = str(e)
-        job_status[job_id]["progress"] = 0
+        if early_chunks:
+            early_chunks.cancel()
+        await write_progress.drain()
+        await events.drain()
+        _remove_upload(document)
+        await fail_job(job_id, str(e), stage, trace)
+    
+    except asyncio.CancelledError:
+        if early_chunks:
+            early_chunks.cancel()
+        raise
     
     finally:
-        # Clean up the uploaded file
-        try:
-            os.remove(file_path)
-        except:
-            pass
+        if warm_up:
+            await warm_up
+
+def _remove_upload(document: Union[bytes, str]) -> None:
+    """Delete the uploaded file once the job has finished with it."""
+    if isinstance(document, str):
+        with span("cleanup"):
+            try:
+                os.remove(document)
+            except OSError:
+                pass
+
+async def defer_translation(
+    job_id: str,
+    extracted_text: str,
+    doc_type: str,
+    batch_id: Optional[str] = None
+) -> bool:
+    """
+    Queue a document's translation for the OpenAI Batch API.
+    
+    Args:
+        job_id: Unique job identifier
+        extracted_text: Extracted text content
+        doc_type: Type of document
+        batch_id: Upload batch the document belongs to, if any
+        
+    Returns:
+        False if the document should be translated right away instead: it is
+        cached, or long enough to need several dependent chunk requests
+    """
+    if await ai_translator.get_cached_translation(extracted_text, doc_type):
+        return False
+    request = ai_translator.build_deferred_request(extracted_text, doc_type)
+    if request is None:
+        return False
+    
+    await deferred_translator.submit(job_id, doc_type, request, _text_preview(extracted_text), batch_id)
+    await job_store.update(job_id, deferred_status="queued")
+    return True
+
+async def complete_job(
+    job_id: str,
+    translation_result: Dict,
+    text_preview: str,
+    timings: Optional[Dict] = None,
+    trace: Optional[Trace] = None
+) -> None:
+    """
+    Store a job's translation result and publish the "completed" event.
+    
+    Args:
+        job_id: Unique job identifier
+        translation_result: Successful result from the translator
+        text_preview: Preview of the extracted text
+        timings: Optional per-stage time breakdown from StageTimer
+        trace: The job's trace, if it is traced; it ends here
+    """
+    await job_store.update(
+        job_id,
+        progress=100,
+        status="completed",
+        result={
+            "document_type": translation_result["document_type"],
+            "translation": translation_result["translation"],
+            "sections": translation_result["sections"],
+            "tests": translation_result.get("tests"),
+            "output_format": translation_result.get("output_format", "markdown"),
+            "usage": translation_result["usage"],
+            "token_estimate": translation_result.get("token_estimate"),
+            "original_text_preview": text_preview,
+            "timings": timings
+        },
+        **_finish_trace(trace)
+    )
+    events = JobEventWriter(job_store, job_id)
+    events.emit("completed", {"document_type": translation_result["document_type"]})
+    await events.drain()
+    JOBS_COMPLETED.inc()
+
+async def fail_job(job_id: str, error: str, stage: str = "translation", trace: Optional[Trace] = None) -> None:
+    """
+    Mark a job as failed and publish the "failed" event.
+    
+    Args:
+        job_id: Unique job identifier
+        error: Error message for the client
+        stage: Stage the job failed in, for the failure metrics
+        trace: The job's trace, if it is traced; it ends here
+    """
+    JOB_FAILURES.inc(stage=stage)
+    await job_store.update(job_id, status="failed", error=error, progress=0, **_finish_trace(trace))
+    events = JobEventWriter(job_store, job_id)
+    events.emit("failed", {"error": error})
+    await events.drain()
+
+def _finish_trace(trace: Optional[Trace]) -> Dict:
+    """End a job's trace and export it; returns the job fields to store it in."""
+    if trace is None:
+        return {}
+    trace.finish()
+    if trace_exporter:
+        trace_exporter.export(trace)
+    return {"trace": trace.to_dict()}
+
+def _text_preview(text: str) -> str:
+    """First 500 characters of the extracted text."""
+    return text[:500] + "..." if len(text) > 500 else text
+
+# Collects deferred translations into Batch API submissions and completes their jobs
+deferred_translator = DeferredTranslator(ai_translator, job_store, complete_job, fail_job)
+
+async def _get_job(job_id: str) -> Dict:
+    """Load a job, raising 404 if it doesn't exist or is a batch."""
+    job = await job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get("type") == "batch":
+        raise HTTPException(status_code=404, detail=f"Job not found; {job_id} is a batch, see /batch/{job_id}")
+    return job
 
 @router.get("/status/{job_id}")
-async def get_job_status(job_id: str) -> Dict:
+async def get_job_status(job_id: str, trace: Optional[str] = None) -> Dict:
     """
     Get the status of a translation job.
     
     Args:
         job_id: The job identifier
+        trace: "1" to include the job's trace (None if it wasn't traced), or
+            "otlp" to include it as an OTLP/JSON export request
         
     Returns:
         Current job status and progress
     """
-    if job_id not in job_status:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = await _get_job(job_id)
     
-    status = job_status[job_id]
-    return status
+    recorded = job.pop("trace", None)
+    if trace and trace.lower() not in ("0", "false"):
+        if recorded is None:
+            job["trace"] = None
+        elif trace == "otlp":
+            job["trace"] = Trace.from_dict(recorded).to_otlp(settings.OTEL_SERVICE_NAME)
+        else:
+            job["trace"] = Trace.from_dict(recorded).summary()
+    
+    return job
+
+@router.get("/stream/{job_id}")
+async def stream_translation(job_id: str, request: Request) -> StreamingResponse:
+    """
+    Stream a translation job as Server-Sent Events.
+    
+    Sends "token" events with translation text as it is generated, "section"
+    events when a section header is detected, and a final "completed" or
+    "failed" event. Reconnecting clients resume from the Last-Event-ID header.
+    
+    Args:
+        job_id: The job identifier
+        
+    Returns:
+        text/event-stream response
+    """
+    await _get_job(job_id)
+    
+    try:
+        cursor = int(request.headers.get("last-event-id", -1)) + 1
+    except ValueError:
+        cursor = 0
+    
+    return StreamingResponse(
+        _job_event_stream(job_id, cursor),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering in nginx
+        }
+    )
+
+async def _job_event_stream(job_id: str, cursor: int) -> AsyncIterator[str]:
+    """
+    Yield SSE messages for a job's events starting at index `cursor`.
+    
+    Args:
+        job_id: The job identifier
+        cursor: Index of the first event to send
+        
+    Yields:
+        Formatted SSE messages
+    """
+    idle_time = 0.0
+    
+    while True:
+        new_events = await job_store.get_events(job_id, cursor)
+        for event in new_events:
+            yield f"id: {cursor}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            cursor += 1
+            if event["event"] in ("completed", "failed"):
+                return
+        
+        if new_events:
+            idle_time = 0.0
+            continue
+        
+        # Stop if the job is gone, or finished without a terminal event on record
+        job = await job_store.get(job_id)
+        if job is None:
+            yield f"event: failed\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+            return
+        if job["status"] in ("completed", "failed") and not await job_store.get_events(job_id, cursor):
+            yield f"event: {job['status']}\ndata: {json.dumps({'error': job['error']} if job['error'] else {})}\n\n"
+            return
+        
+        # Comment line keeps idle connections open through proxies
+        if idle_time >= settings.STREAM_KEEPALIVE_INTERVAL:
+            idle_time = 0.0
+            yield ": keep-alive\n\n"
+        
+        await asyncio.sleep(settings.STREAM_POLL_INTERVAL)
+        idle_time += settings.STREAM_POLL_INTERVAL
 
 @router.get("/result/{job_id}")
 async def get_translation_result(job_id: str) -> Dict:
@@ -190,10 +615,8 @@ async def get_translation_result(job_id: str) -> Dict:
     Returns:
         Translation result or error
     """
-    if job_id not in job_status:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = await _get_job(job_id)
     
-    job = job_status[job_id]
     
     processing_states = ["processing", "extracting_text", "identifying_document_type", "translating"]
     if job["status"] in processing_states:
@@ -214,7 +637,7 @@ async def get_translation_result(job_id: str) -> Dict:
 @router.delete("/job/{job_id}")
 async def delete_job(job_id: str) -> Dict:
     """
-    Delete a job and its results from memory.
+    Delete a job and its results from the job store.
     
     Args:
         job_id: The job identifier
@@ -222,13 +645,45 @@ async def delete_job(job_id: str) -> Dict:
     Returns:
         Deletion confirmation
     """
-    if job_id not in job_status:
+    if not await job_store.delete(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    del job_status[job_id]
-    
     return {"message": "Job deleted successfully"}
 
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict:
+    """
+    Get translation cache hit/miss counters for this worker.
+    
+    Returns:
+        Cache statistics, or enabled=False when caching is off
+    """
+    if not ai_translator.cache:
+        return {"enabled": False}
+    
+    return {"enabled": True, **ai_translator.cache.stats()}
+
+@router.get("/deferred/stats")
+async def get_deferred_stats() -> Dict:
+    """
+    Get the number of deferred translations waiting on OpenAI.
+    
+    Returns:
+        Requests waiting in this worker to be submitted, and requests and
+        batches waiting on OpenAI for all workers
+    """
+    return await deferred_translator.stats()
+
+@router.get("/queue/stats")
+async def get_queue_stats() -> Dict:
+    """
+    Get the state of the job queue shared by all workers.
+    
+    Returns:
+        Jobs waiting for a worker, jobs in progress and workers taking jobs
+    """
+    return await job_queue.stats()
+
 @router.get("/health")
 async def health_check() -> Dict:
     """Health check endpoint."""
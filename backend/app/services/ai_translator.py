@@ -1,83 +1,864 @@
-from openai import OpenAI
-from typing import Dict, Optional
+from openai import AsyncOpenAI
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import httpx
 import json
+import math
 import re
+import time
 from app.config import settings
 from app.prompts.lab_results import LAB_RESULTS_SYSTEM_PROMPT, LAB_RESULTS_USER_PROMPT
 from app.prompts.prescriptions import PRESCRIPTION_SYSTEM_PROMPT, PRESCRIPTION_USER_PROMPT
+from app.prompts import PROMPT_VERSION
+from app.prompts.structured import STRUCTURED_OUTPUT_INSTRUCTIONS
+from app.prompts.chunking import (
+    CHUNK_SYSTEM_PROMPT, LAB_RESULTS_CHUNK_PROMPT, PRESCRIPTION_CHUNK_PROMPT, CHUNK_NOTES_INTRO
+)
+from app.services.chunking import chunk_document
+from app.services.field_extractor import FieldExtractor
+from app.services.llm_scheduler import LLMScheduler
+from app.services.metrics import LLM_REQUEST_SECONDS, LLM_TIME_TO_FIRST_TOKEN_SECONDS, LLM_TOKENS, SECTION_PARSE_SECONDS
+from app.services.progress import ProgressCallback
+from app.services.section_parser import SectionMatcher, SectionParser, section_key
+from app.services.structured_output import OUTPUT_FORMATS, parse_structured_translation, response_format
+from app.services.token_budget import TokenEstimator
+from app.services.tracing import record_span, span
+from app.services.translation_cache import TranslationCache, make_cache_key
+
+# Typical length of a conversational translation, used to scale streaming progress
+EXPECTED_COMPLETION_TOKENS = 1200
+
+# Output limit for the notes extracted from each chunk of a long document
+CHUNK_NOTES_MAX_TOKENS = 2048
+
+# Times the combined notes of a long document are condensed again when they
+# are too long for the final request
+MAX_NOTES_CONDENSING_ROUNDS = 3
+
+# httpx closes pooled connections idle for longer than this (its default
+# keepalive expiry), so a warm-up request is only worth it after such a gap
+CONNECTION_IDLE_SECONDS = 5.0
+
+# Section headers the prompts ask the model to use, per document type
+SECTION_HEADERS = {
+    'lab_results': [
+        "First, the good news about your results",
+        "Here's what we need to keep an eye on",
+        "Should you be worried?",
+        "What this means for your daily life",
+        "Your next steps"
+    ],
+    'prescription': [
+        "Here's what your doctor has prescribed for you",
+        "What each medicine does for your health",
+        "How to take your medications properly",
+        "What to expect and side effects to know about",
+        "Important things to remember",
+        "Questions to ask your pharmacist"
+    ]
+}
+
+# Test blocks in markdown translations are separated by horizontal rules
+# and named by a "###" header
+TEST_BLOCK_SEPARATOR = '\n---\n'
+TEST_NAME_PATTERN = re.compile(r'###\s*(.+)')
+
+# Result key -> bold field label in a test block
+TEST_FIELDS = {
+    "purpose": "Test Name & Purpose",
+    "your_result": "Your Result",
+    "normal_range": "Normal Range",
+    "status": "Status",
+    "what_this_means": "What This Means",
+    "health_impact": "Health Impact",
+    "medical_significance": "Medical Significance"
+}
+
+# Used for fields missing from a test block (others default to "")
+TEST_FIELD_DEFAULTS = {
+    "What This Means": "This test result provides information about your metabolic health.",
+    "Health Impact": "This measurement helps assess your overall metabolic function.",
+    "Medical Significance": "Doctors use this to evaluate your metabolic health status."
+}
+
+# Status words and emoji looked for in the Status field, first found wins
+TEST_STATUSES = ["normal", "high", "low", "borderline", "desirable"]
+TEST_STATUS_EMOJIS = ["🟢", "🔴", "🟡"]
 
 class AITranslator:
     """Service for translating medical documents using OpenAI."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[TranslationCache] = None):
         if not settings.OPENAI_API_KEY:
             raise ValueError("OpenAI API key not configured")
         
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Shared, size-limited connection pool for all requests from this worker
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT)
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            max_retries=0  # retries are left to the scheduler
+        )
         self.model = settings.OPENAI_MODEL
+        
+        # Every request is queued by priority, kept within the concurrency
+        # and rate limits, and retried with backoff when it can be
+        self.scheduler = LLMScheduler(
+            max_concurrent=settings.OPENAI_MAX_CONCURRENT_REQUESTS,
+            request_limit=settings.RATE_LIMIT_PER_MINUTE,
+            token_limit=settings.RATE_LIMIT_TOKENS_PER_MINUTE,
+            max_retries=settings.LLM_MAX_RETRIES,
+            retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+            retry_max_delay=settings.LLM_RETRY_MAX_DELAY
+        )
+        
+        # Optional cache of previous translations, keyed on document content
+        self.cache = cache
+        
+        # Local prompt-size estimates used to size requests before sending them
+        self.token_estimator = TokenEstimator()
+        
+        # When the last request was sent or finished, to skip needless warm-ups
+        self._last_request_at = 0.0
+        
+        # Test block fields are all read in one pass per block
+        self.test_field_extractor = FieldExtractor(TEST_FIELDS.values())
+        
+        # Section header matchers, compiled once per document type
+        self.section_matchers = {
+            doc_type: SectionMatcher(headers) for doc_type, headers in SECTION_HEADERS.items()
+        }
+        
+        # Translations come back as markdown sections or as schema-checked JSON
+        if settings.TRANSLATION_OUTPUT_FORMAT not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported TRANSLATION_OUTPUT_FORMAT: {settings.TRANSLATION_OUTPUT_FORMAT} "
+                f"(expected one of {', '.join(OUTPUT_FORMATS)})"
+            )
+        self.output_format = settings.TRANSLATION_OUTPUT_FORMAT
+        # JSON results are cached apart from markdown ones
+        self.prompt_version = PROMPT_VERSION if self.output_format == "markdown" else f"{PROMPT_VERSION}-json"
+    
+    def completion_params(
+        self,
+        messages: List[Dict],
+        max_tokens: int,
+        response_format: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Build the chat completion parameters shared by every request.
+        
+        Args:
+            messages: Chat messages to send
+            max_tokens: Maximum number of tokens to generate
+            response_format: Optional response_format constraining the output
+            
+        Returns:
+            Request body for the chat completions endpoint
+        """
+        params = dict(
+            model=self.model,
+            messages=messages,
+            temperature=0.3,  # Lower temperature for more consistent output
+            max_tokens=max_tokens,
+            top_p=0.95,  # Slightly more focused sampling for medical content
+            presence_penalty=0.0,  # Neutral presence penalty
+            frequency_penalty=0.1  # Slight penalty to reduce repetition
+        )
+        if response_format:
+            params["response_format"] = response_format
+        return params
+    
+    async def _complete(
+        self,
+        messages: List[Dict],
+        max_tokens: int,
+        on_delta: Optional[Callable[[str], None]] = None,
+        response_format: Optional[Dict] = None,
+        priority: str = "interactive",
+        prompt_tokens: Optional[int] = None
+    ) -> Tuple[str, Dict]:
+        """
+        Run a chat completion once the scheduler lets it through.
+        
+        When on_delta is given the response is streamed and on_delta is called
+        with each piece of content as it arrives. The request's slot is held
+        until the whole response has been received. Failed requests are
+        retried by the scheduler, unless part of a streamed response was
+        already passed to on_delta.
+        
+        Args:
+            messages: Chat messages to send
+            max_tokens: Maximum number of tokens to generate
+            on_delta: Optional callback for streamed content
+            response_format: Optional response_format constraining the output
+            priority: Scheduler priority ("interactive" or "bulk")
+            prompt_tokens: Estimated prompt size, counted from the messages
+                if not given
+            
+        Returns:
+            Tuple of (completion text, usage dictionary)
+        """
+        params = self.completion_params(messages, max_tokens, response_format)
+        if prompt_tokens is None:
+            prompt_tokens = self.token_estimator.count_messages(messages)
+        
+        async def send() -> Tuple[str, Dict]:
+            self._last_request_at = time.monotonic()
+            sent = time.perf_counter()
+            sent_at = time.time_ns()
+            outcome = "error"
+            first_token_seconds = None
+            try:
+                if on_delta is None:
+                    response = await self.client.chat.completions.create(**params)
+                    outcome = "success"
+                    return response.choices[0].message.content, {
+                        "prompt_tokens": response.usage.prompt_tokens,
+                        "completion_tokens": response.usage.completion_tokens,
+                        "total_tokens": response.usage.total_tokens
+                    }
+                
+                stream = await self.client.chat.completions.create(
+                    stream=True,
+                    # openai 1.10 predates the stream_options parameter
+                    extra_body={"stream_options": {"include_usage": True}} if settings.OPENAI_STREAM_USAGE else None,
+                    **params
+                )
+                parts = []
+                reported_usage = None
+                try:
+                    async for chunk in stream:
+                        # The final chunk has no choices, only the usage
+                        reported_usage = getattr(chunk, "usage", None) or reported_usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if not parts:
+                                first_token_seconds = time.perf_counter() - sent
+                                LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(first_token_seconds)
+                            parts.append(delta)
+                            on_delta(delta)
+                except Exception as e:
+                    if parts:
+                        # Text already passed on can't be taken back, so a
+                        # retry would repeat it
+                        raise RuntimeError(f"Response stream interrupted: {e}") from e
+                    raise
+                outcome = "success"
+            finally:
+                self._last_request_at = time.monotonic()
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - sent, outcome=outcome)
+                # Time on the network, apart from the time spent queued in the scheduler
+                attributes = {"outcome": outcome, "streamed": on_delta is not None}
+                if first_token_seconds is not None:
+                    attributes["time_to_first_token"] = round(first_token_seconds, 6)
+                record_span("llm.request", sent_at, time.time_ns(), **attributes)
+            
+            content = "".join(parts)
+            if reported_usage:
+                return content, _usage_counts(reported_usage)
+            # Without a usage chunk, count locally and say so
+            completion_tokens = self.token_estimator.count(content)
+            return content, {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "estimated": True
+            }
+        
+        with span("llm", priority=priority, prompt_tokens=prompt_tokens, max_tokens=max_tokens):
+            content, usage = await self.scheduler.submit(send, prompt_tokens + max_tokens, priority)
+        _count_tokens(usage, prompt_tokens)
+        return content, usage
     
-    async def translate_document(self, content: str, doc_type: str) -> Dict:
+    async def warm_up(self) -> None:
+        """
+        Open a connection to the API ahead of a job's first request.
+        
+        Sends a cheap request (looking up the model) so the TCP and TLS
+        handshakes are done while the document is still being extracted.
+        It goes through the scheduler like any request, so it counts against
+        the rate limits and waits out a rate limit pause, but is not retried.
+        Skipped while pooled connections are still fresh; failures are only
+        logged, as the translation request will report them properly.
+        """
+        if time.monotonic() - self._last_request_at < CONNECTION_IDLE_SECONDS:
+            return
+        self._last_request_at = time.monotonic()
+        try:
+            await self.scheduler.submit(lambda: self.client.models.retrieve(self.model), max_retries=0)
+        except Exception as e:
+            print(f"API connection warm-up failed: {e}")
+    
+    def early_chunk_translation(
+        self,
+        doc_type: str,
+        page_count: int,
+        priority: str = "interactive"
+    ) -> "EarlyChunkTranslation":
+        """
+        Start translating a long document's chunks while it is still extracted.
+        
+        Args:
+            doc_type: Type of document ('lab_results' or 'prescription')
+            page_count: Number of pages in the document
+            priority: Scheduler priority of the chunk requests
+            
+        Returns:
+            EarlyChunkTranslation to add cleaned pages to, then pass to
+            translate_document
+        """
+        return EarlyChunkTranslation(self, doc_type, page_count, priority)
+    
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool and cache connections."""
+        await self.client.close()
+        if self.cache:
+            await self.cache.close()
+    
+    async def translate_document(
+        self,
+        content: str,
+        doc_type: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        token_callback: Optional[Callable[[str], None]] = None,
+        early_chunks: Optional["EarlyChunkTranslation"] = None,
+        section_callback: Optional[Callable[[str, str], None]] = None,
+        priority: str = "interactive"
+    ) -> Dict:
         """
         Translate medical document content to plain English.
         
+        Concurrent calls for the same document share one translation; calls
+        that join one already under way get its tokens and sections in one
+        go once it finishes.
+        
         Args:
             content: Extracted text content from the document
             doc_type: Type of document ('lab_results' or 'prescription')
+            progress_callback: Optional callback receiving (stage, done, total)
+                as tokens are received and sections are parsed
+            token_callback: Optional callback receiving translation text as it
+                is generated
+            early_chunks: Chunk translation started during extraction, used
+                instead of chunking the content again if it got under way
+            section_callback: Optional callback receiving (section_key,
+                header_line) as each section header is generated
+            priority: Scheduler priority of the requests: "interactive", or
+                "bulk" to let interactive requests go first
             
         Returns:
             Dictionary containing the translation and metadata
         """
+        cache_key = self._cache_key(content, doc_type)
+        result, shared = await self.scheduler.coalesce(cache_key, lambda: self._translate_document(
+            content, doc_type, progress_callback, token_callback, early_chunks, section_callback,
+            priority, cache_key
+        ))
+        if not shared:
+            return result
+        
+        if early_chunks:
+            early_chunks.cancel()
+        if result["success"]:
+            self._replay_translation(result, doc_type, token_callback, section_callback)
+        if progress_callback:
+            progress_callback("parsing", 1, 1)
+        return dict(result)
+    
+    async def _translate_document(
+        self,
+        content: str,
+        doc_type: str,
+        progress_callback: Optional[ProgressCallback],
+        token_callback: Optional[Callable[[str], None]],
+        early_chunks: Optional["EarlyChunkTranslation"],
+        section_callback: Optional[Callable[[str, str], None]],
+        priority: str,
+        cache_key: str
+    ) -> Dict:
+        """Translate a document for translate_document, which shares the result between identical calls."""
         try:
-            # Select appropriate prompts based on document type
-            if doc_type == 'lab_results':
-                system_prompt = LAB_RESULTS_SYSTEM_PROMPT
-                user_prompt = LAB_RESULTS_USER_PROMPT.format(content=content)
-            elif doc_type == 'prescription':
-                system_prompt = PRESCRIPTION_SYSTEM_PROMPT
-                user_prompt = PRESCRIPTION_USER_PROMPT.format(content=content)
+            system_prompt, user_prompt_template, chunk_prompt_template = self._select_prompts(doc_type)
+            
+            # Serve repeat documents from the cache without calling the API
+            if not self.cache:
+                cache_key = None
+            cached = await self._lookup_cache(cache_key) if cache_key else None
+            if cached:
+                if early_chunks:
+                    early_chunks.cancel()
+                self._replay_translation(cached, doc_type, token_callback, section_callback)
+                if progress_callback:
+                    progress_callback("parsing", 1, 1)
+                return cached
+            
+            # Size the document before spending any tokens on it
+            document_tokens = self._count_document_tokens(content)
+            
+            # Long documents are condensed chunk by chunk (map), then the
+            # combined notes are translated as a whole (reduce)
+            map_usage = None
+            if early_chunks is not None and early_chunks.started:
+                content, map_usage, chunk_count = await early_chunks.finish(progress_callback)
             else:
-                raise ValueError(f"Unsupported document type: {doc_type}")
+                if early_chunks:
+                    early_chunks.cancel()
+                chunks = [content]
+                if document_tokens > settings.TRANSLATION_CHUNK_TOKENS:
+                    chunk_chars = self.token_estimator.chars_for_tokens(content, settings.TRANSLATION_CHUNK_TOKENS)
+                    chunks = chunk_document(content, chunk_chars)
+                chunk_count = len(chunks)
+                if len(chunks) > 1:
+                    content, map_usage = await self._translate_chunks(
+                        chunks, chunk_prompt_template, progress_callback, priority
+                    )
+            if chunk_count > 1:
+                content, condense_usage = await self._condense_chunk_notes(
+                    content, system_prompt, user_prompt_template, chunk_prompt_template, priority
+                )
+                if condense_usage:
+                    map_usage = _sum_usage([map_usage] + condense_usage)
+            
+            with span("build_prompt"):
+                messages, token_estimate = self._build_translation_request(
+                    system_prompt, user_prompt_template, content
+                )
+            token_estimate["document_tokens"] = document_tokens
+            
+            # Progress units: one per chunk, plus one for the final translation
+            map_units = chunk_count if chunk_count > 1 else 0
+            
+            # Stream the response when the caller wants tokens, sections or
+            # token progress; streamed text is split into sections as it arrives.
+            # JSON output is only readable once complete, so it is streamed
+            # for progress alone and replayed as markdown when parsed.
+            structured = self.output_format == "json"
+            on_delta = None
+            section_parser = None
+            # Time spent parsing sections out of the streamed response
+            parse_seconds = 0.0
+            if progress_callback or token_callback or section_callback:
+                tokens_received = 0
+                if not structured:
+                    section_parser = self.section_parser(doc_type)
+                
+                def on_delta(delta: str) -> None:
+                    nonlocal tokens_received, parse_seconds
+                    tokens_received += 1
+                    if section_parser:
+                        if token_callback:
+                            token_callback(delta)
+                        parse_start = time.perf_counter()
+                        headers = section_parser.feed(delta)
+                        parse_seconds += time.perf_counter() - parse_start
+                        for section_key, header in headers:
+                            if section_callback:
+                                section_callback(section_key, header)
+                    if progress_callback:
+                        progress_callback(
+                            "translation",
+                            map_units + min(tokens_received / EXPECTED_COMPLETION_TOKENS, 1.0),
+                            map_units + 1
+                        )
             
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent output
-                max_tokens=4096,  # Appropriate for gpt-4o-2024-08-06 model
-                top_p=0.95,  # Slightly more focused sampling for medical content
-                presence_penalty=0.0,  # Neutral presence penalty
-                frequency_penalty=0.1  # Slight penalty to reduce repetition
+            translation, usage = await self._complete(
+                messages=messages,
+                max_tokens=token_estimate["max_tokens"],
+                on_delta=on_delta,
+                response_format=response_format(doc_type) if structured else None,
+                priority=priority,
+                prompt_tokens=token_estimate["prompt_tokens"]
             )
-            
-            # Extract the translation
-            translation = response.choices[0].message.content
+            if map_usage:
+                usage = _sum_usage([map_usage, usage])
             
             # Parse the translation into sections
-            sections = self._parse_translation_sections(translation, doc_type)
+            if progress_callback:
+                progress_callback("parsing", 0, 1)
+            sections = None
+            if section_parser:
+                parse_start = time.perf_counter()
+                headers = section_parser.finish()
+                sections = section_parser.sections()
+                parse_seconds += time.perf_counter() - parse_start
+                for section_key, header in headers:
+                    if section_callback:
+                        section_callback(section_key, header)
+            result = self._build_result(
+                doc_type, translation, usage, token_estimate, chunk_count, sections, parse_seconds
+            )
+            if structured:
+                self._replay_translation(result, doc_type, token_callback, section_callback)
+            if progress_callback:
+                progress_callback("parsing", 1, 1)
             
-            return {
-                "success": True,
-                "document_type": doc_type,
-                "translation": translation,
-                "sections": sections,
-                "model_used": self.model,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
-            }
+            if cache_key:
+                await self.cache.set(cache_key, result)
+            
+            return result
             
         except Exception as e:
+            if early_chunks:
+                early_chunks.cancel()
             return {
                 "success": False,
                 "error": str(e),
                 "document_type": doc_type
             }
     
+    def _select_prompts(self, doc_type: str) -> Tuple[str, str, str]:
+        """
+        Select the prompts for a document type.
+        
+        Returns:
+            Tuple of (system prompt, user prompt template, chunk prompt template)
+        """
+        if doc_type == 'lab_results':
+            prompts = LAB_RESULTS_SYSTEM_PROMPT, LAB_RESULTS_USER_PROMPT, LAB_RESULTS_CHUNK_PROMPT
+        elif doc_type == 'prescription':
+            prompts = PRESCRIPTION_SYSTEM_PROMPT, PRESCRIPTION_USER_PROMPT, PRESCRIPTION_CHUNK_PROMPT
+        else:
+            raise ValueError(f"Unsupported document type: {doc_type}")
+        system_prompt, user_prompt_template, chunk_prompt_template = prompts
+        if self.output_format == "json":
+            system_prompt = f"{system_prompt}\n\n{STRUCTURED_OUTPUT_INSTRUCTIONS}"
+        return system_prompt, user_prompt_template, chunk_prompt_template
+    
+    def _count_document_tokens(self, content: str) -> int:
+        """Estimate a document's size, rejecting documents that are too long to translate."""
+        document_tokens = self.token_estimator.count(content)
+        if document_tokens > settings.MAX_DOCUMENT_TOKENS:
+            raise ValueError(
+                f"Document is too long to translate (about {document_tokens} tokens, "
+                f"limit {settings.MAX_DOCUMENT_TOKENS})"
+            )
+        return document_tokens
+    
+    def _final_prompt_tokens(self, system_prompt: str, user_prompt_template: str, content: str) -> int:
+        """Estimate the prompt size of the final translation request for some content."""
+        return self.token_estimator.count_messages([
+            {"content": system_prompt},
+            {"content": user_prompt_template.format(content=content)}
+        ])
+    
+    def _build_translation_request(
+        self,
+        system_prompt: str,
+        user_prompt_template: str,
+        content: str
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        Build the messages for the final translation request, leaving room for
+        the completion.
+        
+        Returns:
+            Tuple of (chat messages, token estimate without document_tokens)
+        
+        Raises:
+            ValueError: If the prompt leaves less than MIN_COMPLETION_TOKENS
+                for the translation
+        """
+        prompt_tokens = self._final_prompt_tokens(system_prompt, user_prompt_template, content)
+        max_tokens = self.token_estimator.completion_budget(prompt_tokens)
+        if max_tokens < settings.MIN_COMPLETION_TOKENS:
+            raise ValueError(
+                f"Document is too long to translate (its prompt is about {prompt_tokens} tokens, "
+                f"leaving less than {settings.MIN_COMPLETION_TOKENS} for the translation)"
+            )
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt_template.format(content=content)}
+        ]
+        return messages, {
+            "encoding": self.token_estimator.encoding.name,
+            "prompt_tokens": prompt_tokens,
+            "max_tokens": max_tokens
+        }
+    
+    async def _condense_chunk_notes(
+        self,
+        notes: str,
+        system_prompt: str,
+        user_prompt_template: str,
+        chunk_prompt_template: str,
+        priority: str
+    ) -> Tuple[str, List[Dict]]:
+        """
+        Shorten the combined notes of a long document until they fit in the
+        final request. Each round splits the notes into chunks and extracts
+        the facts from each again, up to MAX_NOTES_CONDENSING_ROUNDS times;
+        notes that still don't fit are rejected by _build_translation_request.
+        
+        Returns:
+            Tuple of (notes, usage of each round)
+        """
+        usages = []
+        for _ in range(MAX_NOTES_CONDENSING_ROUNDS):
+            prompt_tokens = self._final_prompt_tokens(system_prompt, user_prompt_template, notes)
+            if self.token_estimator.completion_budget(prompt_tokens) >= settings.MIN_COMPLETION_TOKENS:
+                break
+            chunk_chars = self.token_estimator.chars_for_tokens(notes, settings.TRANSLATION_CHUNK_TOKENS)
+            groups = chunk_document(notes, chunk_chars)
+            if len(groups) < 2:
+                break
+            with span("condense_notes", groups=len(groups)):
+                notes, usage = await self._translate_chunks(groups, chunk_prompt_template, priority=priority)
+            usages.append(usage)
+        return notes, usages
+    
+    def _build_result(
+        self,
+        doc_type: str,
+        translation: str,
+        usage: Dict,
+        token_estimate: Dict,
+        chunks: int = 1,
+        sections: Optional[Dict] = None,
+        parse_seconds: float = 0.0
+    ) -> Dict:
+        """
+        Assemble the translation result, parsing the sections unless already
+        parsed.
+        
+        JSON output is validated against the document type's schema in one
+        pass; its fields become the sections and test data directly, and the
+        translation text is rendered from them as markdown. Output that fails
+        validation is parsed as markdown instead. The parsing time, plus
+        parse_seconds already spent on a streamed response, is recorded.
+        """
+        parse_start = time.perf_counter()
+        parse_started_at = time.time_ns()
+        output_format = "markdown"
+        tests = None
+        structured = parse_structured_translation(doc_type, translation) if self.output_format == "json" else None
+        if structured is not None:
+            output_format = "json"
+            sections = self._structured_sections(doc_type, structured)
+            tests = [test.model_dump() for test in getattr(structured, "tests", [])] or None
+            translation = "\n\n".join(
+                f"## {header}\n{sections[section_key(header)]}" for header in SECTION_HEADERS[doc_type]
+            )
+        else:
+            if sections is None:
+                sections = self._parse_translation_sections(translation, doc_type)
+            if self.output_format == "json" and doc_type == 'lab_results':
+                tests = self._extract_test_data_from_markdown(translation)
+        SECTION_PARSE_SECONDS.observe(parse_seconds + time.perf_counter() - parse_start, format=output_format)
+        record_span(
+            "parse_sections", parse_started_at, time.time_ns(),
+            format=output_format, streamed_parse_seconds=round(parse_seconds, 6)
+        )
+        
+        result = {
+            "success": True,
+            "document_type": doc_type,
+            "translation": translation,
+            "sections": sections,
+            "model_used": self.model,
+            "chunks": chunks,
+            "usage": usage,
+            "token_estimate": token_estimate
+        }
+        if self.output_format == "json":
+            result["output_format"] = output_format
+            result["tests"] = tests
+        return result
+    
+    @staticmethod
+    def _structured_sections(doc_type: str, structured) -> Dict:
+        """Sections of a validated JSON translation, in the same form as parsed markdown."""
+        sections: Dict[str, object] = {'conversational_format': True} if doc_type == 'lab_results' else {}
+        for header in SECTION_HEADERS[doc_type]:
+            key = section_key(header)
+            sections[key] = getattr(structured, key).strip()
+        return sections
+    
+    def _replay_translation(
+        self,
+        result: Dict,
+        doc_type: str,
+        token_callback: Optional[Callable[[str], None]],
+        section_callback: Optional[Callable[[str, str], None]]
+    ) -> None:
+        """Send a finished translation to the token and section callbacks in one go."""
+        if token_callback:
+            token_callback(result["translation"])
+        if section_callback:
+            section_parser = self.section_parser(doc_type)
+            for key, header in section_parser.feed(result["translation"]) + section_parser.finish():
+                section_callback(key, header)
+    
+    async def get_cached_translation(self, content: str, doc_type: str) -> Optional[Dict]:
+        """
+        Look up a previous translation of the same document.
+        
+        Returns:
+            The cached translation result, or None on a miss or with caching disabled
+        """
+        if not self.cache:
+            return None
+        return await self._lookup_cache(self._cache_key(content, doc_type))
+    
+    def _cache_key(self, content: str, doc_type: str) -> str:
+        """Cache key of a document's translation with this model, prompts and output format."""
+        return make_cache_key(content, doc_type, self.model, self.prompt_version)
+    
+    async def _lookup_cache(self, cache_key: str) -> Optional[Dict]:
+        """Fetch a cached result, marked as cached and with zero usage."""
+        cached = await self.cache.get(cache_key)
+        if not cached:
+            return None
+        return {
+            **cached,
+            "cached": True,
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+    
+    def build_deferred_request(self, content: str, doc_type: str) -> Optional[Dict]:
+        """
+        Build the translation request for a document without sending it, for
+        submission through the Batch API.
+        
+        Uses the same prompts and token budget as translate_document.
+        
+        Args:
+            content: Extracted text content from the document
+            doc_type: Type of document ('lab_results' or 'prescription')
+            
+        Returns:
+            Dictionary with the request "body", its "token_estimate" and the
+            "cache_key", or None if the document is long enough to need chunking
+        """
+        system_prompt, user_prompt_template, _ = self._select_prompts(doc_type)
+        document_tokens = self._count_document_tokens(content)
+        if document_tokens > settings.TRANSLATION_CHUNK_TOKENS:
+            return None
+        
+        messages, token_estimate = self._build_translation_request(
+            system_prompt, user_prompt_template, content
+        )
+        token_estimate["document_tokens"] = document_tokens
+        return {
+            "body": self.completion_params(
+                messages,
+                token_estimate["max_tokens"],
+                response_format(doc_type) if self.output_format == "json" else None
+            ),
+            "token_estimate": token_estimate,
+            "cache_key": self._cache_key(content, doc_type) if self.cache else None
+        }
+    
+    async def finish_deferred_translation(
+        self,
+        request: Dict,
+        doc_type: str,
+        translation: str,
+        usage: Dict
+    ) -> Dict:
+        """
+        Turn a Batch API response into a translation result and cache it.
+        
+        Args:
+            request: The request built by build_deferred_request
+            doc_type: Type of document
+            translation: Content of the model's response
+            usage: Usage reported for the request
+            
+        Returns:
+            Translation result in the same form as translate_document
+        """
+        _count_tokens(usage, request["token_estimate"]["prompt_tokens"])
+        result = self._build_result(doc_type, translation, usage, request["token_estimate"])
+        if request.get("cache_key"):
+            await self.cache.set(request["cache_key"], result)
+        return result
+    
+    async def _translate_chunks(
+        self,
+        chunks: List[str],
+        chunk_prompt_template: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        priority: str = "interactive"
+    ) -> Tuple[str, Dict]:
+        """
+        Extract the facts from each chunk of a long document concurrently.
+        
+        Args:
+            chunks: Document chunks in order
+            chunk_prompt_template: Prompt for a single chunk
+            progress_callback: Optional callback receiving (stage, done, total)
+                as chunks complete
+            priority: Scheduler priority of the chunk requests
+            
+        Returns:
+            Tuple of (combined notes to translate, total usage)
+        """
+        chunk_slots = asyncio.Semaphore(settings.TRANSLATION_CHUNK_CONCURRENCY)
+        chunks_done = 0
+        
+        async def translate_chunk(index: int, chunk: str) -> Tuple[str, Dict]:
+            nonlocal chunks_done
+            async with chunk_slots:
+                result = await self._translate_chunk(index, len(chunks), chunk, chunk_prompt_template, priority)
+            chunks_done += 1
+            if progress_callback:
+                progress_callback("translation", chunks_done, len(chunks) + 1)
+            return result
+        
+        results = await asyncio.gather(*(translate_chunk(index, chunk) for index, chunk in enumerate(chunks)))
+        return self._combine_chunk_notes(results)
+    
+    async def _translate_chunk(
+        self,
+        index: int,
+        total: int,
+        chunk: str,
+        chunk_prompt_template: str,
+        priority: str = "interactive"
+    ) -> Tuple[str, Dict]:
+        """
+        Extract the facts from one chunk of a long document.
+        
+        Returns:
+            Tuple of (chunk notes, usage)
+        """
+        return await self._complete(
+            messages=[
+                {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+                {"role": "user", "content": chunk_prompt_template.format(
+                    part=index + 1, total=total, content=chunk
+                )}
+            ],
+            max_tokens=CHUNK_NOTES_MAX_TOKENS,
+            priority=priority
+        )
+    
+    @staticmethod
+    def _combine_chunk_notes(results: List[Tuple[str, Dict]]) -> Tuple[str, Dict]:
+        """
+        Combine the notes of every chunk, in order, into the content to translate.
+        
+        Returns:
+            Tuple of (combined notes to translate, total usage)
+        """
+        notes = "\n\n".join(
+            f"### Part {index + 1}\n{chunk_notes.strip()}"
+            for index, (chunk_notes, _) in enumerate(results)
+        )
+        return CHUNK_NOTES_INTRO.format(notes=notes), _sum_usage([usage for _, usage in results])
+    
     def _parse_translation_sections(self, translation: str, doc_type: str) -> Dict:
         """
         Parse the translation into structured sections.
@@ -89,92 +870,27 @@ class AITranslator:
         Returns:
             Dictionary of parsed sections
         """
-        sections = {}
+        section_parser = self.section_parser(doc_type)
+        section_parser.feed(translation)
+        section_parser.finish()
+        return section_parser.sections()
+    
+    def section_parser(self, doc_type: str) -> SectionParser:
+        """
+        Create a parser that splits a translation into sections as it streams in.
         
-        if doc_type == 'lab_results':
-            section_headers = [
-                "First, the good news about your results",
-                "Here's what we need to keep an eye on",
-                "Should you be worried?",
-                "What this means for your daily life",
-                "Your next steps"
-            ]
-            
-            # For conversational format, we don't need structured test data
-            # The content will be displayed as flowing text sections
-            sections['conversational_format'] = True
-            
-        elif doc_type == 'prescription':
-            section_headers = [
-                "Here's what your doctor has prescribed for you",
-                "What each medicine does for your health",
-                "How to take your medications properly",
-                "What to expect and side effects to know about",
-                "Important things to remember",
-                "Questions to ask your pharmacist"
-            ]
-        else:
-            return {"full_text": translation}
-        
-        # Parse sections based on headers
-        current_section = None
-        current_content = []
-        
-        lines = translation.split('\n')
-        for line in lines:
-            # Check if line is a section header
-            is_header = False
-            for header in section_headers:
-                # More flexible header matching for conversational format
-                if header.lower() in line.lower() and (line.startswith('**') or line.startswith('#') or line.startswith('##')):
-                    # Save previous section
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    
-                    # Start new section - create key from header
-                    if "good news" in header.lower():
-                        current_section = "good_news"
-                    elif "keep an eye on" in header.lower():
-                        current_section = "keep_eye_on"
-                    elif "should you be worried" in header.lower():
-                        current_section = "should_worry"
-                    elif "daily life" in header.lower():
-                        current_section = "daily_life"
-                    elif "next steps" in header.lower():
-                        current_section = "next_steps"
-                    # Prescription section mappings
-                    elif "doctor has prescribed" in header.lower():
-                        current_section = "prescribed_medications"
-                    elif "what each medicine does" in header.lower():
-                        current_section = "medicine_purposes"
-                    elif "how to take your medications" in header.lower():
-                        current_section = "medication_instructions"
-                    elif "what to expect and side effects" in header.lower():
-                        current_section = "side_effects"
-                    elif "important things to remember" in header.lower():
-                        current_section = "important_warnings"
-                    elif "questions to ask your pharmacist" in header.lower():
-                        current_section = "pharmacist_questions"
-                    else:
-                        current_section = header.lower().replace(' ', '_').replace(',', '').replace('?', '').replace('...', '')
-                    
-                    current_content = []
-                    is_header = True
-                    break
+        Args:
+            doc_type: Type of document
             
-            # Add line to current section if not a header
-            if not is_header and current_section:
-                current_content.append(line)
-        
-        # Save last section
-        if current_section:
-            sections[current_section] = '\n'.join(current_content).strip()
-        
-        # If no sections were parsed, return the full text
-        if not sections:
-            sections = {"full_text": translation}
-        
-        return sections
+        Returns:
+            A SectionParser for the document type
+        """
+        # For conversational format, we don't need structured test data;
+        # lab results are displayed as flowing text sections
+        return SectionParser(
+            self.section_matchers.get(doc_type),
+            conversational_format=doc_type == 'lab_results'
+        )
     
     def _extract_test_data_from_markdown(self, translation: str) -> Optional[list]:
         """
@@ -190,33 +906,28 @@ class AITranslator:
             test_data = []
             
             # Look for test sections directly (they start with ### and are separated by ---)
-            # Split the entire translation by horizontal lines to find test blocks
-            test_blocks = re.split(r'\n---\n', translation)
-            
-            for block in test_blocks:
+            for block in translation.split(TEST_BLOCK_SEPARATOR):
                 if not block.strip():
                     continue
                     
                 # Extract test name from ### header
-                test_name_match = re.search(r'###\s*(.+)', block)
+                test_name_match = TEST_NAME_PATTERN.search(block)
                 if not test_name_match:
                     continue
                     
                 test_name = test_name_match.group(1).strip()
                 
-                # Extract each field
-                test_dict = {
-                    "test_name": test_name,
-                    "category": self._categorize_test(test_name),
-                    "purpose": self._extract_field(block, "Test Name & Purpose"),
-                    "your_result": self._extract_field(block, "Your Result"),
-                    "normal_range": self._extract_field(block, "Normal Range"),
-                    "status": self._extract_status(block),
-                    "status_emoji": self._extract_status_emoji(block),
-                    "what_this_means": self._extract_field(block, "What This Means"),
-                    "health_impact": self._extract_field(block, "Health Impact"),
-                    "medical_significance": self._extract_field(block, "Medical Significance")
-                }
+                # Read every field of the block at once
+                fields = self.test_field_extractor.extract(block)
+                status_text = fields.get(TEST_FIELDS["status"], "")
+                
+                test_dict = {"test_name": test_name, "category": self._categorize_test(test_name)}
+                for key, field_name in TEST_FIELDS.items():
+                    if key == "status":
+                        test_dict["status"] = self._extract_status(status_text)
+                        test_dict["status_emoji"] = self._extract_status_emoji(status_text)
+                    else:
+                        test_dict[key] = self._extract_field(fields, field_name)
                 
                 test_data.append(test_dict)
             
@@ -226,56 +937,25 @@ class AITranslator:
             print(f"Error parsing test data from markdown: {e}")
             return None
     
-    def _extract_field(self, block: str, field_name: str) -> str:
-        """Extract a specific field from a test block."""
-        # Try the standard format first
-        pattern = rf'\*\*{re.escape(field_name)}\*\*:?\s*(.+?)(?=\n\s*-|\n\s*\*\*|\n\s*$|\Z)'
-        match = re.search(pattern, block, re.DOTALL | re.IGNORECASE)
-        
-        if match:
-            return match.group(1).strip()
-        
-        # Try alternative format (without the colon)
-        alt_pattern = rf'\*\*{re.escape(field_name)}\*\*\s*(.+?)(?=\n\s*-|\n\s*\*\*|\n\s*$|\Z)'
-        alt_match = re.search(alt_pattern, block, re.DOTALL | re.IGNORECASE)
-        
-        if alt_match:
-            return alt_match.group(1).strip()
-            
-        # If field is still not found, provide a default value based on field name
-        if field_name == "What This Means":
-            return "This test result provides information about your metabolic health."
-        elif field_name == "Health Impact":
-            return "This measurement helps assess your overall metabolic function."
-        elif field_name == "Medical Significance":
-            return "Doctors use this to evaluate your metabolic health status."
-        
-        return ""
-    
-    def _extract_status(self, block: str) -> str:
-        """Extract status from the Status field."""
-        status_text = self._extract_field(block, "Status")
-        if "normal" in status_text.lower():
-            return "normal"
-        elif "high" in status_text.lower():
-            return "high"
-        elif "low" in status_text.lower():
-            return "low"
-        elif "borderline" in status_text.lower():
-            return "borderline"
-        elif "desirable" in status_text.lower():
-            return "desirable"
+    def _extract_field(self, fields: Dict[str, str], field_name: str) -> str:
+        """Get a field read from a test block, or its default if it was missing."""
+        if field_name in fields:
+            return fields[field_name]
+        return TEST_FIELD_DEFAULTS.get(field_name, "")
+    
+    def _extract_status(self, status_text: str) -> str:
+        """Get the status from the Status field."""
+        status_lower = status_text.lower()
+        for status in TEST_STATUSES:
+            if status in status_lower:
+                return status
         return "normal"
     
-    def _extract_status_emoji(self, block: str) -> str:
-        """Extract emoji from the Status field."""
-        status_text = self._extract_field(block, "Status")
-        if "🟢" in status_text:
-            return "🟢"
-        elif "🔴" in status_text:
-            return "🔴"
-        elif "🟡" in status_text:
-            return "🟡"
+    def _extract_status_emoji(self, status_text: str) -> str:
+        """Get the emoji from the Status field."""
+        for emoji in TEST_STATUS_EMOJIS:
+            if emoji in status_text:
+                return emoji
         return "🟢"
     
     def _categorize_test(self, test_name: str) -> str:
@@ -372,20 +1052,184 @@ class AITranslator:
         try:
             prompt = f"Summarize this {doc_type.replace('_', ' ')} in one simple sentence: {content[:500]}..."
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            summary, _ = await self._complete(
                 messages=[
                     {"role": "system", "content": "You are a medical document summarizer. Provide brief, clear summaries."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3,
-                max_tokens=200,  # Appropriate for summaries with gpt-4o-2024-08-06
-                top_p=0.95,  # Slightly more focused sampling for medical content
-                presence_penalty=0.0,  # Neutral presence penalty
-                frequency_penalty=0.1  # Slight penalty to reduce repetition
+                max_tokens=200  # Appropriate for summaries with gpt-4o-2024-08-06
             )
             
-            return response.choices[0].message.content.strip()
+            return summary.strip()
             
         except Exception as e:
             return f"Summary unavailable: {str(e)}"
+
+
+def _count_tokens(usage: Dict, prompt_estimate: int) -> None:
+    """Add a response's tokens to the token counters, estimating a missing prompt count."""
+    prompt_tokens = usage.get("prompt_tokens")
+    LLM_TOKENS.inc(prompt_tokens if prompt_tokens is not None else prompt_estimate, type="prompt")
+    LLM_TOKENS.inc(usage.get("completion_tokens") or 0, type="completion")
+
+
+def _usage_counts(usage) -> Dict:
+    """
+    Token counts of a usage block, which openai 1.10 leaves as a plain
+    dictionary on stream chunks.
+    """
+    if not isinstance(usage, dict):
+        usage = {key: getattr(usage, key, None) for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+    return {key: usage.get(key) for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+def _sum_usage(usages: List[Dict]) -> Dict:
+    """
+    Add up usage blocks; a count unknown in any block is unknown in the
+    total, and the total is estimated if any block is.
+    """
+    total = {}
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        values = [usage.get(key) for usage in usages]
+        total[key] = None if None in values else sum(values)
+    if any(usage.get("estimated") for usage in usages):
+        total["estimated"] = True
+    return total
+
+
+class EarlyChunkTranslation:
+    """
+    Translates the chunks of a long document while later pages are still
+    being extracted.
+    
+    Cleaned pages are added as they come in. Nothing is sent until the pages
+    so far are over settings.TRANSLATION_CHUNK_TOKENS, the size at which
+    translate_document would chunk the document anyway; from then on each
+    chunk starts as soon as its pages are in. Chunks are packed like
+    chunking.chunk_document packs them. Until the last page is in, the
+    number of parts named in the chunk prompts is estimated from the page
+    count.
+    """
+    
+    def __init__(self, translator: AITranslator, doc_type: str, page_count: int, priority: str = "interactive"):
+        """
+        Args:
+            translator: Translator sending the chunk requests
+            doc_type: Type of document ('lab_results' or 'prescription')
+            page_count: Number of pages in the document
+            priority: Scheduler priority of the chunk requests
+        """
+        self.translator = translator
+        self.priority = priority
+        _, _, self.chunk_prompt_template = translator._select_prompts(doc_type)
+        self.page_count = page_count
+        self.chunk_tokens = settings.TRANSLATION_CHUNK_TOKENS
+        
+        # Pages not yet assigned to a started chunk
+        self._pending: List[str] = []
+        self._pending_tokens = 0
+        self._document_tokens = 0
+        self._pages_extracted = 0
+        self._tasks: List[asyncio.Task] = []
+        self._chunk_slots = asyncio.Semaphore(settings.TRANSLATION_CHUNK_CONCURRENCY)
+        self._cancelled = False
+        
+        # (start, end) perf_counter times of each chunk request
+        self.chunk_times: List[Tuple[float, float]] = []
+    
+    @property
+    def started(self) -> bool:
+        """Whether any chunk has been sent."""
+        return bool(self._tasks) and not self._cancelled
+    
+    def add_page(self, page: str, pages_extracted: int) -> None:
+        """
+        Add the next cleaned page, starting the chunks it completes.
+        
+        Args:
+            page: Cleaned page text (empty for a blank page)
+            pages_extracted: Number of pages extracted so far, blank ones included
+        """
+        if self._cancelled:
+            return
+        self._pages_extracted = pages_extracted
+        if not page:
+            return
+        
+        tokens = self.translator.token_estimator.count(page)
+        self._pending.append(page)
+        self._pending_tokens += tokens
+        self._document_tokens += tokens
+        
+        if self._document_tokens > settings.MAX_DOCUMENT_TOKENS:
+            # translate_document rejects the document; stop spending tokens on it
+            self.cancel()
+        elif self._document_tokens > self.chunk_tokens and self._pending_tokens > self.chunk_tokens:
+            self._start_chunks(final=False)
+    
+    def _start_chunks(self, final: bool) -> None:
+        """Start every full chunk of the pending pages (all of them if final)."""
+        if not self._pending:
+            return
+        text = " ".join(self._pending)
+        chunk_chars = self.translator.token_estimator.chars_for_tokens(text, self.chunk_tokens)
+        chunks = chunk_document(text, chunk_chars)
+        
+        # The last chunk may still grow, unless every page is in
+        ready = chunks if final else chunks[:-1]
+        self._pending = [] if final else chunks[-1:]
+        self._pending_tokens = 0 if final else self.translator.token_estimator.count(chunks[-1])
+        
+        total = len(self._tasks) + len(ready) if final else self._estimate_total(len(ready) + 1)
+        for chunk in ready:
+            task = asyncio.create_task(self._translate(len(self._tasks), total, chunk))
+            # Failures surface in finish(); don't also log cancelled leftovers
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._tasks.append(task)
+    
+    def _estimate_total(self, chunks_to_come: int) -> int:
+        """Estimate the number of chunks from the tokens per page so far."""
+        tokens_per_page = self._document_tokens / max(self._pages_extracted, 1)
+        estimate = math.ceil(tokens_per_page * self.page_count / self.chunk_tokens)
+        return max(estimate, len(self._tasks) + chunks_to_come)
+    
+    async def _translate(self, index: int, total: int, chunk: str) -> Tuple[str, Dict]:
+        async with self._chunk_slots:
+            start = time.perf_counter()
+            try:
+                return await self.translator._translate_chunk(
+                    index, total, chunk, self.chunk_prompt_template, self.priority
+                )
+            finally:
+                self.chunk_times.append((start, time.perf_counter()))
+    
+    async def finish(self, progress_callback: Optional[ProgressCallback] = None) -> Tuple[str, Dict, int]:
+        """
+        Send the remaining pages and wait for every chunk.
+        
+        Args:
+            progress_callback: Optional callback receiving (stage, done, total)
+                as chunks complete
+            
+        Returns:
+            Tuple of (combined notes to translate, total usage, number of chunks)
+        """
+        self._start_chunks(final=True)
+        results = []
+        try:
+            for task in self._tasks:
+                results.append(await task)
+                if progress_callback:
+                    progress_callback("translation", len(results), len(self._tasks) + 1)
+        except BaseException:
+            self.cancel()
+            raise
+        notes, usage = self.translator._combine_chunk_notes(results)
+        return notes, usage, len(results)
+    
+    def cancel(self) -> None:
+        """Stop sending chunks and cancel the ones in flight."""
+        self._cancelled = True
+        self._pending = []
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,72 @@
+import re
+from typing import List
+
+# Page markers written by PDFProcessor ("--- Page N ---")
+PAGE_MARKER_PATTERN = re.compile(r'(?=--- Page \d+ ---)')
+
+# Places to break a page that is too long on its own, best first
+BLOCK_BOUNDARIES = ['. ', '; ', ' ']
+
+
+def split_pages(text: str) -> List[str]:
+    """
+    Split extracted text into pages on the page markers.
+
+    Args:
+        text: Extracted text content
+
+    Returns:
+        List of pages, each starting with its marker
+    """
+    return [page.strip() for page in PAGE_MARKER_PATTERN.split(text) if page.strip()]
+
+
+def _split_oversized(page: str, max_chars: int) -> List[str]:
+    """Break a page longer than max_chars at the best boundary within each window."""
+    pieces = []
+    while len(page) > max_chars:
+        cut = -1
+        for boundary in BLOCK_BOUNDARIES:
+            cut = page.rfind(boundary, max_chars // 2, max_chars)
+            if cut != -1:
+                cut += len(boundary)
+                break
+        if cut == -1:
+            cut = max_chars
+        pieces.append(page[:cut].strip())
+        page = page[cut:].strip()
+    if page:
+        pieces.append(page)
+    return pieces
+
+
+def chunk_document(text: str, max_chars: int) -> List[str]:
+    """
+    Split a document into chunks of at most max_chars characters.
+
+    Whole pages are packed together where possible; a page that is too long
+    on its own is broken at sentence or word boundaries.
+
+    Args:
+        text: Extracted text content
+        max_chars: Maximum chunk length
+
+    Returns:
+        List of chunks in document order (a single chunk if the text fits)
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = ""
+    for page in split_pages(text):
+        for piece in _split_oversized(page, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+
+    return chunks
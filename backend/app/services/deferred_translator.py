@@ -0,0 +1,383 @@
+import asyncio
+import httpx
+import json
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services.ai_translator import AITranslator
+from app.services.job_store import JobStore, RedisJobStore
+
+# Batch states in which OpenAI is still working on the requests
+ACTIVE_BATCH_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
+# Rounds in a row a worker may fail to read a finished batch's results before
+# failing its jobs
+MAX_RESULT_READ_ATTEMPTS = 3
+
+# Called with (job_id, translation result, original text preview)
+CompleteCallback = Callable[[str, Dict, str], Awaitable[None]]
+# Called with (job_id, error message)
+FailureCallback = Callable[[str, str], Awaitable[None]]
+
+
+class DeferredBatchStore(ABC):
+    """
+    Submitted Batch API batches and the requests waiting on each, kept where
+    a restarted worker (or any other worker) can pick them up again.
+    """
+
+    @abstractmethod
+    async def save(self, batch_id: str, entries: Dict[str, Dict]) -> None:
+        """Record a submitted batch's requests, by job ID."""
+
+    @abstractmethod
+    async def load(self) -> Dict[str, Dict[str, Dict]]:
+        """Return every recorded batch: batch ID -> job ID -> request."""
+
+    @abstractmethod
+    async def remove(self, batch_id: str) -> bool:
+        """
+        Forget a batch.
+
+        Returns:
+            False if it was already removed (e.g. by another worker)
+        """
+
+
+class InMemoryDeferredBatchStore(DeferredBatchStore):
+    """Per-process batch store, for use with the in-memory job store."""
+
+    def __init__(self):
+        self._batches: Dict[str, Dict[str, Dict]] = {}
+
+    async def save(self, batch_id: str, entries: Dict[str, Dict]) -> None:
+        self._batches[batch_id] = entries
+
+    async def load(self) -> Dict[str, Dict[str, Dict]]:
+        return dict(self._batches)
+
+    async def remove(self, batch_id: str) -> bool:
+        return self._batches.pop(batch_id, None) is not None
+
+
+class RedisDeferredBatchStore(DeferredBatchStore):
+    """
+    Batch store shared by all workers: one Redis hash field per batch,
+    holding its requests as JSON.
+    """
+
+    def __init__(self, redis, key: str = "deferred:batches"):
+        """
+        Args:
+            redis: A redis.asyncio.Redis client created with decode_responses=True
+                (or a FakeRedis)
+            key: Key of the hash
+        """
+        self.redis = redis
+        self.key = key
+
+    async def save(self, batch_id: str, entries: Dict[str, Dict]) -> None:
+        await self.redis.hset(self.key, batch_id, json.dumps(entries))
+
+    async def load(self) -> Dict[str, Dict[str, Dict]]:
+        raw = await self.redis.hgetall(self.key)
+        return {batch_id: json.loads(entries) for batch_id, entries in raw.items()}
+
+    async def remove(self, batch_id: str) -> bool:
+        return bool(await self.redis.hdel(self.key, batch_id))
+
+
+def create_deferred_batch_store(job_store: JobStore) -> DeferredBatchStore:
+    """
+    Keep batches next to the jobs waiting on them: in the job store's Redis
+    if it has one, otherwise in memory (where the jobs don't outlive the
+    process either).
+    """
+    if isinstance(job_store, RedisJobStore):
+        return RedisDeferredBatchStore(job_store.redis)
+    return InMemoryDeferredBatchStore()
+
+
+class DeferredTranslator:
+    """
+    Translates non-urgent documents through the OpenAI Batch API.
+
+    Requests wait in memory and are uploaded together as one batch each round
+    (or as soon as max_batch_requests are waiting). The same loop polls the
+    submitted batches and hands finished translations to on_complete. Jobs
+    waiting on a batch are updated every round, which keeps them from
+    expiring in the job store.
+
+    Submitted batches are recorded in a DeferredBatchStore. Once started
+    (see resume), the loop runs until close and polls every batch in the
+    store, so a batch submitted by a worker that has since stopped is
+    finished by the workers still running, or by the worker once it is
+    restarted. The worker that removes a finished batch from the store
+    records its results. Requests not yet submitted are submitted on
+    shutdown.
+    """
+
+    def __init__(
+        self,
+        translator: AITranslator,
+        job_store: JobStore,
+        on_complete: CompleteCallback,
+        on_failure: FailureCallback,
+        poll_interval: float = settings.DEFERRED_POLL_INTERVAL,
+        max_batch_requests: int = settings.DEFERRED_MAX_BATCH_REQUESTS,
+        completion_window: str = settings.DEFERRED_COMPLETION_WINDOW,
+        batch_store: Optional[DeferredBatchStore] = None
+    ):
+        self.translator = translator
+        self.client = translator.client
+        self.job_store = job_store
+        self.on_complete = on_complete
+        self.on_failure = on_failure
+        self.poll_interval = poll_interval
+        self.max_batch_requests = max(1, max_batch_requests)
+        self.completion_window = completion_window
+        # OpenAI batch ID -> job ID -> request waiting on that batch
+        self.batch_store = batch_store or create_deferred_batch_store(job_store)
+
+        # Requests not yet submitted, in arrival order
+        self._pending: List[Dict] = []
+        self._submit_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Finished batch ID -> rounds in a row its results could not be read
+        self._read_failures: Dict[str, int] = {}
+
+    async def submit(
+        self,
+        job_id: str,
+        doc_type: str,
+        request: Dict,
+        text_preview: str,
+        batch_id: Optional[str] = None
+    ) -> None:
+        """
+        Queue a translation request for the next batch.
+
+        Args:
+            job_id: Job the translation belongs to
+            doc_type: Type of document
+            request: Request built by AITranslator.build_deferred_request
+            text_preview: Preview of the original text to store with the result
+            batch_id: Upload batch the job belongs to, if any; kept from
+                expiring while the job waits
+        """
+        self._pending.append({
+            "job_id": job_id,
+            "doc_type": doc_type,
+            "request": request,
+            "text_preview": text_preview,
+            "batch_id": batch_id
+        })
+        self._start()
+        if len(self._pending) >= self.max_batch_requests:
+            await self.flush()
+
+    async def resume(self) -> None:
+        """
+        Start the loop, which picks up the batches already in the batch store
+        (e.g. after a restart) and any that other workers leave behind.
+        """
+        self._start()
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Submit waiting requests and poll submitted batches every poll_interval until closed."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.flush()
+                await self.poll()
+            except Exception as e:
+                print(f"Deferred translation round failed: {e}")
+
+    async def flush(self) -> None:
+        """Submit all waiting requests as one or more batches."""
+        async with self._submit_lock:
+            while self._pending:
+                entries = self._pending[:self.max_batch_requests]
+                del self._pending[:self.max_batch_requests]
+                await self._submit_batch(entries)
+
+    async def _submit_batch(self, entries: List[Dict]) -> None:
+        """Upload a batch input file and start a batch for it."""
+        lines = [
+            json.dumps({
+                "custom_id": entry["job_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": entry["request"]["body"]
+            })
+            for entry in entries
+        ]
+        try:
+            input_file = await self.client.files.create(
+                file=("translations.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            # openai 1.10 has no batches resource, so call the endpoint directly
+            response = await self.client.post(
+                "/batches",
+                body={
+                    "input_file_id": input_file.id,
+                    "endpoint": "/v1/chat/completions",
+                    "completion_window": self.completion_window
+                },
+                cast_to=httpx.Response
+            )
+            batch = response.json()
+        except Exception as e:
+            for entry in entries:
+                await self.on_failure(entry["job_id"], f"Deferred translation could not be submitted: {str(e)}")
+            return
+
+        for entry in entries:
+            # The request body is no longer needed once uploaded
+            entry["request"] = {key: value for key, value in entry["request"].items() if key != "body"}
+        try:
+            await self.batch_store.save(batch["id"], {entry["job_id"]: entry for entry in entries})
+        except Exception as e:
+            # Nothing would pick up the batch's results; don't pay for it
+            await self._cancel_batch(batch["id"])
+            for entry in entries:
+                await self.on_failure(entry["job_id"], f"Deferred translation could not be recorded: {str(e)}")
+            return
+        await self._update_jobs(entries, deferred_batch_id=batch["id"], deferred_status=batch["status"])
+
+    async def _cancel_batch(self, batch_id: str) -> None:
+        try:
+            await self.client.post(f"/batches/{batch_id}/cancel", cast_to=httpx.Response)
+        except Exception as e:
+            print(f"Deferred translation batch {batch_id} could not be cancelled: {e}")
+
+    async def poll(self) -> int:
+        """
+        Check every submitted batch and record the results of finished ones.
+
+        Returns:
+            Number of batches still in progress
+        """
+        active = 0
+        for batch_id, entries in (await self.batch_store.load()).items():
+            response = await self.client.get(f"/batches/{batch_id}", cast_to=httpx.Response)
+            batch = response.json()
+            status = batch["status"]
+
+            await self._update_jobs(entries.values(), deferred_status=status)
+            if status in ACTIVE_BATCH_STATUSES:
+                active += 1
+                continue
+
+            # Read the results before taking the batch out of the store, so
+            # that a failed download is retried next round
+            try:
+                records = await self._read_results(batch)
+            except Exception as e:
+                attempts = self._read_failures.get(batch_id, 0) + 1
+                if attempts < MAX_RESULT_READ_ATTEMPTS:
+                    self._read_failures[batch_id] = attempts
+                    print(f"Deferred translation batch {batch_id} results could not be read: {e}")
+                    active += 1
+                    continue
+                self._read_failures.pop(batch_id, None)
+                if await self.batch_store.remove(batch_id):
+                    for job_id in entries:
+                        await self.on_failure(job_id, f"Deferred translation results could not be read: {str(e)}")
+                continue
+            self._read_failures.pop(batch_id, None)
+
+            # Another worker polling the same batch may have finished it already
+            if not await self.batch_store.remove(batch_id):
+                continue
+            finished = set()
+            for record in records:
+                entry = entries.get(record.get("custom_id"))
+                if entry is None or entry["job_id"] in finished:
+                    continue
+                finished.add(entry["job_id"])
+                await self._record_result(entry, record)
+
+            for job_id in entries:
+                if job_id not in finished:
+                    await self.on_failure(job_id, f"Deferred translation batch {status} without a result")
+        return active
+
+    async def _read_results(self, batch: Dict) -> List[Dict]:
+        """Download and parse the lines of a finished batch's output and error files."""
+        records = []
+        # Expired and cancelled batches may still have partial output
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Its job fails for having no result
+                    print(f"Deferred translation batch {batch['id']} has an unreadable result line")
+        return records
+
+    async def _record_result(self, entry: Dict, record: Dict) -> None:
+        """Complete or fail a job from its line in a batch output or error file."""
+        job_id = entry["job_id"]
+        try:
+            response = record.get("response") or {}
+            body = response.get("body") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                error = (record.get("error") or body.get("error") or {}).get("message")
+                raise ValueError(error or f"status {response.get('status_code')}")
+
+            usage = body.get("usage") or {}
+            result = await self.translator.finish_deferred_translation(
+                entry["request"],
+                entry["doc_type"],
+                body["choices"][0]["message"]["content"],
+                {
+                    "prompt_tokens": usage.get("prompt_tokens"),
+                    "completion_tokens": usage.get("completion_tokens"),
+                    "total_tokens": usage.get("total_tokens")
+                }
+            )
+            await self.on_complete(job_id, result, entry["text_preview"])
+        except Exception as e:
+            await self.on_failure(job_id, f"Deferred translation failed: {str(e)}")
+
+    async def _update_jobs(self, entries, **fields) -> None:
+        """Record batch progress on the waiting jobs, refreshing their (and their upload batches') expiry."""
+        upload_batches = {entry["batch_id"] for entry in entries if entry.get("batch_id")}
+        await asyncio.gather(
+            *(self.job_store.update(entry["job_id"], **fields) for entry in entries),
+            *(self.job_store.touch(batch_id) for batch_id in upload_batches)
+        )
+
+    async def stats(self) -> Dict:
+        """
+        Number of requests waiting in this worker to be submitted, and of
+        requests and batches waiting on OpenAI for all workers sharing the
+        batch store.
+        """
+        batches = await self.batch_store.load()
+        return {
+            "pending": len(self._pending),
+            "submitted": sum(len(entries) for entries in batches.values()),
+            "batches": len(batches)
+        }
+
+    async def close(self) -> None:
+        """
+        Stop the loop, submitting the requests still waiting so that their
+        batch is picked up by the other workers or after a restart.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
@@ -0,0 +1,231 @@
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.chunking import PAGE_MARKER_PATTERN
+
+# Keyword weights per document type. Keywords match whole words, case
+# insensitively, with an optional plural "s"; each keyword found adds its
+# weight once to its document type's score.
+DOCUMENT_TYPE_KEYWORDS: Dict[str, Dict[str, float]] = {
+    'lab_results': {
+        'laboratory': 2.0, 'lab results': 2.0, 'test results': 2.0, 'blood test': 1.5,
+        'urinalysis': 1.5, 'hemoglobin': 1.0, 'glucose': 1.0, 'cholesterol': 1.0,
+        'white blood cell': 1.0, 'red blood cell': 1.0, 'platelet': 1.0,
+        'reference range': 2.0, 'normal range': 1.5, 'specimen': 1.5
+    },
+    'prescription': {
+        'prescription': 2.0, 'rx': 1.5, 'medication': 1.0, 'drug name': 1.5,
+        'dosage': 1.0, 'sig:': 2.0, 'dispense': 1.5, 'refills': 1.5,
+        'take': 0.5, 'tablet': 1.0, 'capsule': 1.0, 'daily': 0.5,
+        'prescriber': 2.0, 'pharmacy': 1.5
+    }
+}
+
+# Returned when no document type scores higher than the others
+DEFAULT_DOCUMENT_TYPE = 'lab_results'
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton finding many keywords in one pass over a text.
+
+    The trie and failure links are compiled into a full transition table
+    once, with upper and lower case transitions, so scanning costs a single
+    dictionary lookup per character and the text is never lowercased.
+    """
+
+    def __init__(self, keywords: List[str]):
+        """
+        Args:
+            keywords: Lowercase keywords to search for
+        """
+        self.keywords = keywords
+
+        # Trie of the keywords; outputs[state] lists the keywords ending there
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for keyword_index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(keyword_index)
+
+        # Breadth-first, each state inherits the transitions and outputs of
+        # its failure state, which is shallower and so already complete
+        transitions: List[Dict[str, int]] = [{} for _ in goto]
+        transitions[0] = self._with_case_variants(goto[0])
+        queue = deque((child, 0) for child in goto[0].values())
+        while queue:
+            state, fail = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail]
+            transitions[state] = {**transitions[fail], **self._with_case_variants(goto[state])}
+            for char, child in goto[state].items():
+                queue.append((child, transitions[fail].get(char, 0)))
+
+        self._transitions = transitions
+        self._outputs = outputs
+
+    @staticmethod
+    def _with_case_variants(edges: Dict[str, int]) -> Dict[str, int]:
+        variants = dict(edges)
+        for char, state in edges.items():
+            upper = char.upper()
+            if len(upper) == 1:
+                variants.setdefault(upper, state)
+        return variants
+
+    def find(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Find every occurrence of every keyword, including overlapping ones.
+
+        Args:
+            text: Text to search
+
+        Yields:
+            (start index, keyword index) tuples in order of where they end
+        """
+        transitions = self._transitions
+        outputs = self._outputs
+        keywords = self.keywords
+        state = 0
+        for index, char in enumerate(text):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                for keyword_index in outputs[state]:
+                    yield index + 1 - len(keywords[keyword_index]), keyword_index
+
+
+class DocumentClassifier:
+    """
+    Scores text against weighted keyword lists to identify the document type.
+
+    New document types (imaging reports, discharge summaries, ...) are added
+    by passing their keywords in the table or through add_document_type.
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Dict[str, Dict[str, float]]] = None,
+        default_type: str = DEFAULT_DOCUMENT_TYPE
+    ):
+        """
+        Args:
+            keywords: Document type -> {keyword: weight}
+            default_type: Type returned when no type scores highest on its own
+        """
+        self.keywords = {doc_type: dict(weights) for doc_type, weights in (keywords or DOCUMENT_TYPE_KEYWORDS).items()}
+        self.default_type = default_type
+        self._compile()
+
+    def add_document_type(self, doc_type: str, keywords: Dict[str, float]) -> None:
+        """
+        Add a document type, or replace the keywords of an existing one.
+
+        Args:
+            doc_type: Name of the document type
+            keywords: Keyword -> weight
+        """
+        self.keywords[doc_type] = dict(keywords)
+        self._compile()
+
+    def _compile(self) -> None:
+        """Build the automaton over the keywords of every document type."""
+        # keyword -> [(doc_type, weight)], as a keyword may count for several types
+        weights: Dict[str, List[Tuple[str, float]]] = {}
+        for doc_type, keywords in self.keywords.items():
+            for keyword, weight in keywords.items():
+                weights.setdefault(keyword.lower(), []).append((doc_type, weight))
+
+        self._keyword_weights = list(weights.values())
+        self.automaton = KeywordAutomaton(list(weights))
+
+    def _matches_word(self, text: str, start: int, keyword: str) -> bool:
+        """Check a keyword occurrence isn't part of a longer word (a plural "s" is allowed)."""
+        if _is_word_char(keyword[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        end = start + len(keyword)
+        if not _is_word_char(keyword[-1]) or end >= len(text) or not _is_word_char(text[end]):
+            return True
+        return text[end] in 'sS' and (end + 1 >= len(text) or not _is_word_char(text[end + 1]))
+
+    def scores(self, text: str, max_pages: int = 0) -> Dict[str, float]:
+        """
+        Score text against each document type in one pass.
+
+        Args:
+            text: Extracted text content
+            max_pages: Only read this many pages (0 for the whole text)
+
+        Returns:
+            Document type -> sum of the weights of its keywords found
+        """
+        text = first_pages(text, max_pages)
+        keywords = self.automaton.keywords
+        found = set()
+        for start, keyword_index in self.automaton.find(text):
+            if keyword_index not in found and self._matches_word(text, start, keywords[keyword_index]):
+                found.add(keyword_index)
+
+        scores = {doc_type: 0.0 for doc_type in self.keywords}
+        for keyword_index in found:
+            for doc_type, weight in self._keyword_weights[keyword_index]:
+                scores[doc_type] += weight
+        return scores
+
+    def classify(self, text: str, max_pages: int = 0) -> str:
+        """
+        Identify the document type.
+
+        Args:
+            text: Extracted text content
+            max_pages: Only read this many pages (0 for the whole text)
+
+        Returns:
+            The highest scoring document type, or the default type on a tie
+        """
+        return self.leading_type(text, max_pages) or self.default_type
+
+    def leading_type(self, text: str, max_pages: int = 0, margin: float = 0.0) -> Optional[str]:
+        """
+        Find the document type that scores highest by more than a margin.
+
+        Args:
+            text: Extracted text content
+            max_pages: Only read this many pages (0 for the whole text)
+            margin: How far the leader must score above every other type
+
+        Returns:
+            The leading document type, or None if no type leads by the margin
+        """
+        ranked = sorted(self.scores(text, max_pages).items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] == 0:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] <= margin:
+            return None
+        return ranked[0][0]
+
+def first_pages(text: str, max_pages: int) -> str:
+    """
+    Cut extracted text after its first pages.
+
+    Args:
+        text: Extracted text with page markers
+        max_pages: Number of pages to keep (0 keeps everything)
+
+    Returns:
+        The text up to the start of page max_pages + 1
+    """
+    if max_pages <= 0:
+        return text
+    for count, marker in enumerate(PAGE_MARKER_PATTERN.finditer(text)):
+        if count == max_pages:
+            return text[:marker.start()]
+    return text
@@ -0,0 +1,245 @@
+import fitz  # PyMuPDF
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from app.config import settings
+from app.services.metrics import PAGE_EXTRACTION_SECONDS, PDF_OPEN_SECONDS
+from app.services.progress import ProgressCallback
+from app.services.tracing import is_tracing, record_span
+
+# A PDF given either as a file path or as its content
+PDFSource = Union[str, bytes]
+
+
+class SharedPDF:
+    """PDF content copied once into a shared memory block, so worker tasks are sent its name instead of the bytes."""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+
+def open_pdf(source: Union[PDFSource, SharedPDF]) -> fitz.Document:
+    """
+    Open a PDF from a file path or from its content in memory.
+
+    Args:
+        source: Path to the PDF file, the PDF content, or the shared memory
+            block holding it
+
+    Returns:
+        The opened document
+    """
+    if isinstance(source, SharedPDF):
+        block = shared_memory.SharedMemory(name=source.name)
+        try:
+            content = bytes(block.buf[:source.size])
+        finally:
+            block.close()
+        return fitz.open(stream=content, filetype="pdf")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def _count_pages(source: Union[PDFSource, SharedPDF]) -> Tuple[int, int, float]:
+    """
+    Return the number of pages in a PDF (runs in a worker process).
+
+    Returns:
+        Tuple of (page count, when opening the PDF started in Unix epoch
+        nanoseconds, seconds taken to open it)
+    """
+    started_at = time.time_ns()
+    start = time.perf_counter()
+    with open_pdf(source) as pdf_document:
+        return pdf_document.page_count, started_at, time.perf_counter() - start
+
+
+def _extract_page_range(
+    source: Union[PDFSource, SharedPDF],
+    start: int,
+    end: int
+) -> Tuple[List[Tuple[int, str]], int, float, List[float]]:
+    """
+    Extract raw text from pages [start, end) of a PDF (runs in a worker process).
+
+    Args:
+        source: Path to the PDF file, the PDF content, or the shared memory
+            block holding it
+        start: First page index (inclusive)
+        end: Last page index (exclusive)
+
+    Returns:
+        Tuple of ([(page_number, text), ...] with page numbers starting at 1,
+        when opening the PDF started in Unix epoch nanoseconds, seconds taken
+        to open the PDF, seconds taken by each page)
+    """
+    started_at = time.time_ns()
+    opened = time.perf_counter()
+    with open_pdf(source) as pdf_document:
+        open_seconds = time.perf_counter() - opened
+        pages, page_seconds = [], []
+        for page_num in range(start, end):
+            page_start = time.perf_counter()
+            pages.append((page_num + 1, pdf_document[page_num].get_text()))
+            page_seconds.append(time.perf_counter() - page_start)
+        return pages, started_at, open_seconds, page_seconds
+
+
+def _record_range_spans(
+    started_at: int,
+    open_seconds: float,
+    pages: List[Tuple[int, str]],
+    page_seconds: List[float]
+) -> None:
+    """Add the opening and per-page get_text spans of an extracted page range to the current trace."""
+    end = started_at + int(open_seconds * 1e9)
+    record_span("pdf.open", started_at, end, pages=len(pages))
+    # Pages are extracted one after the other right after opening
+    for (page_num, text), seconds in zip(pages, page_seconds):
+        start, end = end, end + int(seconds * 1e9)
+        record_span("pdf.get_text", start, end, page=page_num, chars=len(text))
+
+
+class ExtractionEngine:
+    """Runs PyMuPDF text extraction on a bounded process pool."""
+
+    def __init__(
+        self,
+        max_workers: int = settings.PDF_EXTRACTION_WORKERS,
+        queue_depth: int = settings.PDF_EXTRACTION_QUEUE_DEPTH,
+        pages_per_task: int = settings.PDF_PAGES_PER_TASK,
+        max_tasks_per_document: int = settings.PDF_MAX_TASKS_PER_DOCUMENT
+    ):
+        self.max_workers = max_workers
+        self.pages_per_task = max(1, pages_per_task)
+        self.max_tasks_per_document = max(1, max_tasks_per_document)
+
+        # Tasks running or waiting in the pool, across all documents
+        self._slots = asyncio.Semaphore(max_workers + queue_depth)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker pool on first use."""
+        if self._executor is None:
+            # Spawn rather than fork: the server process runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def extract_pages(
+        self,
+        source: PDFSource,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Extract the raw text of every page, splitting the document into page
+        ranges that are processed in parallel.
+        
+        Args:
+            source: Path to the PDF file, or the PDF content
+            progress_callback: Optional callback receiving (stage, done, total)
+                as page ranges complete
+        
+        Returns:
+            List of (page_number, text) tuples in page order
+        """
+        return [
+            page
+            async for _, pages in self.iter_page_ranges(source, progress_callback)
+            for page in pages
+        ]
+    
+    async def iter_page_ranges(
+        self,
+        source: PDFSource,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> AsyncIterator[Tuple[int, List[Tuple[int, str]]]]:
+        """
+        Extract page ranges in parallel, yielding each as soon as it and all
+        earlier ranges are done.
+        
+        The first page is extracted on its own when the document spans
+        several ranges, so callers can look at it early.
+        
+        Args:
+            source: Path to the PDF file, or the PDF content
+            progress_callback: Optional callback receiving (stage, done, total)
+                as page ranges complete
+        
+        Yields:
+            Tuples of (page_count, [(page_number, text), ...]) in page order
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        
+        # Every task reopens the document, so in-memory content goes to the
+        # workers through shared memory rather than being pickled per task
+        block = None
+        if isinstance(source, (bytes, bytearray, memoryview)) and len(source):
+            block = shared_memory.SharedMemory(create=True, size=len(source))
+            block.buf[:len(source)] = source
+            task_source = SharedPDF(block.name, len(source))
+        else:
+            task_source = source
+        
+        tasks = []
+        try:
+            async with self._slots:
+                page_count, started_at, open_seconds = await loop.run_in_executor(
+                    executor, _count_pages, task_source
+                )
+            PDF_OPEN_SECONDS.observe(open_seconds)
+            record_span("pdf.open", started_at, started_at + int(open_seconds * 1e9), pages=page_count)
+            
+            first_range = 1 if page_count > self.pages_per_task else self.pages_per_task
+            page_ranges = [(0, min(first_range, page_count))] + [
+                (start, min(start + self.pages_per_task, page_count))
+                for start in range(first_range, page_count, self.pages_per_task)
+            ] if page_count else []
+            
+            # Keep one large document from filling the whole queue
+            document_slots = asyncio.Semaphore(self.max_tasks_per_document)
+            pages_done = 0
+            
+            async def run_range(start: int, end: int) -> List[Tuple[int, str]]:
+                nonlocal pages_done
+                async with document_slots, self._slots:
+                    pages, started_at, open_seconds, page_seconds = await loop.run_in_executor(
+                        executor, _extract_page_range, task_source, start, end
+                    )
+                PDF_OPEN_SECONDS.observe(open_seconds)
+                for seconds in page_seconds:
+                    PAGE_EXTRACTION_SECONDS.observe(seconds)
+                if is_tracing():
+                    _record_range_spans(started_at, open_seconds, pages, page_seconds)
+                pages_done += end - start
+                if progress_callback:
+                    progress_callback("extraction", pages_done, page_count)
+                return pages
+            
+            # Tasks queue for the semaphores in creation order, so earlier ranges
+            # are extracted first
+            tasks = [asyncio.create_task(run_range(start, end)) for start, end in page_ranges]
+            for task in tasks:
+                yield page_count, await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            if block is not None:
+                # Workers already reading it keep their mapping until they close it
+                block.close()
+                block.unlink()
+    
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
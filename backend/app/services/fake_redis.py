@@ -0,0 +1,347 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import WatchError
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the subset of redis.asyncio.Redis used by the app.
+
+    Values behave as with decode_responses=True. Meant for tests and for
+    running the Redis-backed services without a Redis server.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Source of the current time in seconds, for key expiry and
+                the idle time of pending stream entries
+        """
+        self._clock = clock
+        # key -> (value, expires_at)
+        self._data: Dict[str, Tuple[object, Optional[float]]] = {}
+        # key -> number of times it was changed, for WATCH
+        self._versions: Dict[str, int] = {}
+
+    def _get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            self._touch(key)
+            return None
+        return value
+
+    def _set(self, key: str, value) -> None:
+        # Writing a value keeps any expiry already set on the key
+        expires_at = self._data[key][1] if key in self._data else None
+        self._data[key] = (value, expires_at)
+        self._touch(key)
+
+    def _touch(self, key: str) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _version(self, key: str) -> int:
+        self._get(key)  # expire the key first, as expired keys count as changed
+        return self._versions.get(key, 0)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._get(key)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        self._data[key] = (str(value), None)
+        self._touch(key)
+        if ex is not None:
+            await self.expire(key, ex)
+        return True
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._get(key) is not None)
+
+    async def delete(self, *keys: str) -> int:
+        deleted = await self.exists(*keys)
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                self._touch(key)
+        return deleted
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        value = self._get(key)
+        if value is None:
+            return False
+        self._data[key] = (value, self._clock() + seconds)
+        self._touch(key)
+        return True
+
+    async def hset(self, key: str, field: Optional[str] = None, value=None, mapping: Optional[Dict] = None) -> int:
+        current = dict(self._get(key) or {})
+        updates = dict(mapping or {})
+        if field is not None:
+            updates[field] = value
+        added = sum(1 for name in updates if name not in current)
+        current.update({name: str(item) for name, item in updates.items()})
+        self._set(key, current)
+        return added
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self._get(key) or {})
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        current = dict(self._get(key) or {})
+        removed = sum(1 for name in fields if current.pop(name, None) is not None)
+        if removed:
+            if current:
+                self._set(key, current)
+            else:
+                self._data.pop(key, None)
+                self._touch(key)
+        return removed
+
+    async def rpush(self, key: str, *values: str) -> int:
+        current = list(self._get(key) or [])
+        current.extend(str(value) for value in values)
+        self._set(key, current)
+        return len(current)
+
+    async def lrange(self, key: str, start: int, end: int) -> List[str]:
+        current = self._get(key) or []
+        return list(current[start:] if end == -1 else current[start:end + 1])
+
+    async def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        current = dict(self._get(key) or {})
+        added = sum(1 for member in mapping if member not in current)
+        current.update({member: float(score) for member, score in mapping.items()})
+        self._set(key, current)
+        return added
+
+    async def zrem(self, key: str, *members: str) -> int:
+        current = dict(self._get(key) or {})
+        removed = sum(1 for member in members if current.pop(member, None) is not None)
+        self._set(key, current)
+        return removed
+
+    async def zcount(self, key: str, low, high) -> int:
+        return sum(1 for score in (self._get(key) or {}).values() if float(low) <= score <= float(high))
+
+    async def zremrangebyscore(self, key: str, low, high) -> int:
+        current = dict(self._get(key) or {})
+        members = [member for member, score in current.items() if float(low) <= score <= float(high)]
+        for member in members:
+            del current[member]
+        self._set(key, current)
+        return len(members)
+
+    # Streams: a stream is a FakeStream; only consumer group reads are supported
+
+    async def xgroup_create(self, key: str, group: str, id: str = "$", mkstream: bool = False) -> bool:
+        stream = self._get(key)
+        if stream is None:
+            if not mkstream:
+                raise ValueError("ERR The XGROUP subcommand requires the key to exist")
+            stream = FakeStream()
+            self._set(key, stream)
+        if group in stream.groups:
+            raise ValueError("BUSYGROUP Consumer Group name already exists")
+        stream.groups[group] = {"last_delivered": stream.last_id if id == "$" else _stream_id(id), "pending": {}}
+        return True
+
+    async def xadd(self, key: str, fields: Dict[str, str]) -> str:
+        stream = self._get(key)
+        if stream is None:
+            stream = FakeStream()
+            self._set(key, stream)
+        return stream.add({name: str(value) for name, value in fields.items()})
+
+    async def xlen(self, key: str) -> int:
+        stream = self._get(key)
+        return len(stream.entries) if stream else 0
+
+    async def xreadgroup(
+        self,
+        group: str,
+        consumer: str,
+        streams: Dict[str, str],
+        count: Optional[int] = None,
+        block: Optional[int] = None
+    ) -> List:
+        deadline = time.monotonic() + (block or 0) / 1000
+        while True:
+            response = []
+            for key in streams:
+                stream = self._get(key)
+                state = stream.groups[group]
+                entries = [
+                    (entry_id, fields) for entry_id, fields in stream.entries.items()
+                    if _stream_id(entry_id) > state["last_delivered"]
+                ][:count]
+                for entry_id, _ in entries:
+                    state["last_delivered"] = _stream_id(entry_id)
+                    state["pending"][entry_id] = [consumer, self._clock(), 1]
+                if entries:
+                    response.append([key, [(entry_id, dict(fields)) for entry_id, fields in entries]])
+            if response or block is None or time.monotonic() >= deadline:
+                return response
+            await asyncio.sleep(0.005)
+
+    async def xautoclaim(
+        self,
+        key: str,
+        group: str,
+        consumer: str,
+        min_idle_time: int,
+        start_id: str = "0-0",
+        count: Optional[int] = None
+    ) -> List:
+        stream = self._get(key)
+        pending = stream.groups[group]["pending"]
+        now = self._clock()
+        claimed = []
+        for entry_id, state in list(pending.items()):
+            if count is not None and len(claimed) >= count:
+                break
+            if _stream_id(entry_id) < _stream_id(start_id) or (now - state[1]) * 1000 < min_idle_time:
+                continue
+            if entry_id not in stream.entries:
+                del pending[entry_id]
+                continue
+            pending[entry_id] = [consumer, now, state[2] + 1]
+            claimed.append((entry_id, dict(stream.entries[entry_id])))
+        return ["0-0", claimed, []]
+
+    async def xclaim(
+        self,
+        key: str,
+        group: str,
+        consumer: str,
+        min_idle_time: int,
+        message_ids: List[str],
+        justid: bool = False
+    ) -> List:
+        pending = self._get(key).groups[group]["pending"]
+        now = self._clock()
+        claimed = []
+        for entry_id in message_ids:
+            state = pending.get(entry_id)
+            if state is None or (now - state[1]) * 1000 < min_idle_time:
+                continue
+            pending[entry_id] = [consumer, now, state[2] if justid else state[2] + 1]
+            claimed.append(entry_id)
+        return claimed
+
+    async def xpending(self, key: str, group: str) -> Dict:
+        pending = self._get(key).groups[group]["pending"]
+        ids = sorted(pending, key=_stream_id)
+        return {"pending": len(ids), "min": ids[0] if ids else None, "max": ids[-1] if ids else None, "consumers": []}
+
+    async def xpending_range(self, key: str, group: str, min: str, max: str, count: int) -> List[Dict]:
+        pending = self._get(key).groups[group]["pending"]
+        now = self._clock()
+        return [
+            {
+                "message_id": entry_id,
+                "consumer": state[0],
+                "time_since_delivered": int((now - state[1]) * 1000),
+                "times_delivered": state[2]
+            }
+            for entry_id, state in sorted(pending.items(), key=lambda item: _stream_id(item[0]))
+            if _stream_id(min) <= _stream_id(entry_id) <= _stream_id(max)
+        ][:count]
+
+    async def xack(self, key: str, group: str, *ids: str) -> int:
+        pending = self._get(key).groups[group]["pending"]
+        return sum(1 for entry_id in ids if pending.pop(entry_id, None) is not None)
+
+    async def xdel(self, key: str, *ids: str) -> int:
+        stream = self._get(key)
+        return sum(1 for entry_id in ids if stream.entries.pop(entry_id, None) is not None)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeStream:
+    """Entries and consumer groups of a FakeRedis stream."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self.groups: Dict[str, Dict] = {}
+        self.last_id: Tuple[int, int] = (0, 0)
+
+    def add(self, fields: Dict[str, str]) -> str:
+        milliseconds = int(time.time() * 1000)
+        if milliseconds > self.last_id[0]:
+            self.last_id = (milliseconds, 0)
+        else:
+            self.last_id = (self.last_id[0], self.last_id[1] + 1)
+        entry_id = f"{self.last_id[0]}-{self.last_id[1]}"
+        self.entries[entry_id] = fields
+        return entry_id
+
+
+def _stream_id(entry_id: str) -> Tuple[int, int]:
+    """Parse a stream entry ID for comparison."""
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+class FakePipeline:
+    """
+    Queues FakeRedis commands and runs them together on execute().
+
+    Supports optimistic locking like redis-py: after watch() commands run
+    right away until multi(), and execute() raises WatchError if a watched
+    key changed (or expired) since it was watched.
+    """
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands = []
+        # Watched key -> its version when watched
+        self._watched: Dict[str, int] = {}
+        self._immediate = False
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+        if self._immediate:
+            return command
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def watch(self, *keys: str) -> bool:
+        self._watched.update({key: self._redis._version(key) for key in keys})
+        self._immediate = True
+        return True
+
+    def multi(self) -> None:
+        self._immediate = False
+
+    async def reset(self) -> None:
+        self._commands = []
+        self._watched = {}
+        self._immediate = False
+
+    async def execute(self) -> List:
+        commands, self._commands = self._commands, []
+        watched, self._watched = self._watched, {}
+        self._immediate = False
+        if any(self._redis._version(key) != version for key, version in watched.items()):
+            raise WatchError("Watched variable changed.")
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.reset()
@@ -0,0 +1,71 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+# A field's value is at least one character, up to the first line break
+# followed by a list item, a bold label or only whitespace, or the end of
+# the block: the same as (.+?)(?=\n\s*-|\n\s*\*\*|\n\s*$|\Z) with DOTALL.
+# Runs of other characters are taken whole (possessively), so the end is
+# only tested at line breaks instead of after every character.
+FIELD_VALUE = r'(.[^\n]*+(?:\n(?!\s*-|\s*\*\*|\s*\Z)[^\n]*+)*+)'
+
+
+class FieldExtractor:
+    """
+    Reads "**Field Name**: value" fields from a markdown block in one pass.
+
+    The pattern for the field names is compiled once, and one scan of a
+    block finds every field. A field's value is the one of its first
+    occurrence that has a value, matching field names case insensitively,
+    the same as searching the block for each field separately.
+    """
+
+    def __init__(self, field_names: Iterable[str]):
+        """
+        Args:
+            field_names: Names of the fields to read, as written between the
+                "**" markers
+        """
+        self.field_names: List[str] = list(field_names)
+        self._by_folded_name = {name.casefold(): name for name in self.field_names}
+        self._name_patterns = {
+            name: re.compile(re.escape(name), re.IGNORECASE) for name in self.field_names
+        }
+
+        # Only the first "*" is consumed, so labels that overlap (the closing
+        # "**" of one starting the next) are all still seen. Longest names
+        # first, so a name that contains another still matches whole.
+        names = "|".join(map(re.escape, sorted(self.field_names, key=len, reverse=True)))
+        self.pattern = re.compile(
+            rf'\*(?=\*({names})\*\*:?\s*{FIELD_VALUE})',
+            re.DOTALL | re.IGNORECASE
+        )
+
+    def extract(self, block: str) -> Dict[str, str]:
+        """
+        Read the fields of a block.
+
+        Args:
+            block: Markdown text with bold field labels
+
+        Returns:
+            Field name -> stripped value, for the fields found
+        """
+        fields: Dict[str, str] = {}
+        for match in self.pattern.finditer(block):
+            name = self._field_name(match.group(1))
+            if name is not None and name not in fields:
+                fields[name] = match.group(2).strip()
+                if len(fields) == len(self.field_names):
+                    break
+        return fields
+
+    def _field_name(self, label: str) -> Optional[str]:
+        """Map a label as written back to the field name it matched."""
+        name = self._by_folded_name.get(label.casefold())
+        if name is not None:
+            return name
+        # Characters that only match case insensitively in the regex engine
+        for name, pattern in self._name_patterns.items():
+            if pattern.fullmatch(label):
+                return name
+        return None
@@ -0,0 +1,322 @@
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+
+# Workers not seen for this long no longer count as taking jobs
+WORKER_PRESENCE_TTL = 30.0
+
+
+class QueuedJob:
+    """A job claimed from a queue by a worker."""
+
+    def __init__(self, message_id: str, payload: Dict, attempts: int):
+        """
+        Args:
+            message_id: Identifies this job in the queue
+            payload: The job as enqueued
+            attempts: Times the job has been claimed, including this one
+        """
+        self.message_id = message_id
+        self.payload = payload
+        self.attempts = attempts
+
+
+class JobQueue(ABC):
+    """
+    Queue of document jobs waiting for a worker.
+
+    Jobs are delivered at least once. A claimed job stays invisible to other
+    workers for the visibility timeout; a worker extends the timeout while
+    it is working on the job and acks the job when done. If the worker
+    crashes, the timeout runs out and the job is claimed again.
+
+    Queues that aren't in_process pass payloads between processes and take
+    only JSON-serializable ones: documents go by path, not content.
+    """
+
+    # Whether payloads stay in this process's memory
+    in_process = False
+
+    def __init__(self, visibility_timeout: float = settings.JOB_VISIBILITY_TIMEOUT):
+        self.visibility_timeout = visibility_timeout
+
+    @abstractmethod
+    async def enqueue(self, payload: Dict) -> str:
+        """
+        Add a job to the end of the queue.
+
+        Returns:
+            The job's message ID
+        """
+
+    @abstractmethod
+    async def claim(self, worker: str, timeout: float) -> Optional[QueuedJob]:
+        """
+        Take the next job, including jobs whose visibility timeout ran out.
+
+        Args:
+            worker: Name of the claiming worker
+            timeout: Seconds to wait for a job
+
+        Returns:
+            The job, or None if none became available in time
+        """
+
+    @abstractmethod
+    async def extend(self, job: QueuedJob, worker: str) -> None:
+        """Restart a claimed job's visibility timeout."""
+
+    @abstractmethod
+    async def ack(self, job: QueuedJob) -> None:
+        """Remove a finished job from the queue."""
+
+    @abstractmethod
+    async def release(self, job: QueuedJob) -> None:
+        """Make a claimed job available again right away (e.g. on shutdown)."""
+
+    @abstractmethod
+    async def register_worker(self, worker: str) -> None:
+        """Record that a worker is taking jobs; called periodically."""
+
+    @abstractmethod
+    async def unregister_worker(self, worker: str) -> None:
+        """Record that a worker has stopped taking jobs."""
+
+    @abstractmethod
+    async def stats(self) -> Dict:
+        """
+        Get the state of the queue.
+
+        Returns:
+            Jobs "waiting" for a worker, jobs "in_progress" and the number of
+            "workers" taking jobs
+        """
+
+    async def close(self) -> None:
+        """Release any connections held by the queue."""
+
+
+class InMemoryJobQueue(JobQueue):
+    """Per-process job queue, for workers running inside the web process."""
+
+    in_process = True
+
+    def __init__(self, visibility_timeout: float = settings.JOB_VISIBILITY_TIMEOUT):
+        super().__init__(visibility_timeout)
+        self._waiting: Deque[str] = deque()
+        # message ID -> (payload, attempts)
+        self._messages: Dict[str, Tuple[Dict, int]] = {}
+        # message ID -> visibility deadline of claimed jobs
+        self._claimed: Dict[str, float] = {}
+        self._workers: Dict[str, float] = {}
+        self._changed = asyncio.Condition()
+
+    async def enqueue(self, payload: Dict) -> str:
+        message_id = uuid.uuid4().hex
+        self._messages[message_id] = (payload, 0)
+        self._waiting.append(message_id)
+        async with self._changed:
+            self._changed.notify()
+        return message_id
+
+    async def claim(self, worker: str, timeout: float) -> Optional[QueuedJob]:
+        deadline = time.monotonic() + timeout
+        async with self._changed:
+            while True:
+                now = time.monotonic()
+                self._requeue_expired(now)
+                if self._waiting:
+                    message_id = self._waiting.popleft()
+                    payload, attempts = self._messages[message_id]
+                    self._messages[message_id] = (payload, attempts + 1)
+                    self._claimed[message_id] = now + self.visibility_timeout
+                    return QueuedJob(message_id, payload, attempts + 1)
+                if now >= deadline:
+                    return None
+                # Wake up for new jobs, or when a claimed job's timeout runs out
+                wait = min([deadline] + list(self._claimed.values())) - now
+                try:
+                    await asyncio.wait_for(self._changed.wait(), max(wait, 0.001))
+                except asyncio.TimeoutError:
+                    pass
+
+    def _requeue_expired(self, now: float) -> None:
+        for message_id in [message_id for message_id, until in self._claimed.items() if until <= now]:
+            del self._claimed[message_id]
+            self._waiting.appendleft(message_id)
+
+    async def extend(self, job: QueuedJob, worker: str) -> None:
+        if job.message_id in self._claimed:
+            self._claimed[job.message_id] = time.monotonic() + self.visibility_timeout
+
+    async def ack(self, job: QueuedJob) -> None:
+        self._claimed.pop(job.message_id, None)
+        self._messages.pop(job.message_id, None)
+
+    async def release(self, job: QueuedJob) -> None:
+        if self._claimed.pop(job.message_id, None) is not None:
+            # Released jobs weren't interrupted by a crash; don't count the attempt
+            payload, attempts = self._messages[job.message_id]
+            self._messages[job.message_id] = (payload, attempts - 1)
+            self._waiting.appendleft(job.message_id)
+            async with self._changed:
+                self._changed.notify()
+
+    async def register_worker(self, worker: str) -> None:
+        self._workers[worker] = time.monotonic()
+
+    async def unregister_worker(self, worker: str) -> None:
+        self._workers.pop(worker, None)
+
+    async def stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "waiting": len(self._waiting),
+            "in_progress": len(self._claimed),
+            "workers": sum(1 for seen in self._workers.values() if now - seen < WORKER_PRESENCE_TTL)
+        }
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Job queue shared by web servers and worker processes through a Redis
+    stream.
+
+    Workers read the stream as one consumer group, so each job goes to one
+    worker and stays in the group's pending list until acked. Jobs idle in
+    the pending list for longer than the visibility timeout (their worker
+    crashed or hung) are taken over by the next worker to look. Acked jobs
+    are deleted, so the stream holds only waiting and pending jobs.
+
+    Payloads must not carry document content: Redis persists the stream
+    (RDB/AOF), and documents may contain patient data. Uploads for this
+    queue are saved to UPLOAD_DIR and passed by path.
+    """
+
+    def __init__(
+        self,
+        redis,
+        visibility_timeout: float = settings.JOB_VISIBILITY_TIMEOUT,
+        key_prefix: str = "queue:",
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            redis: A redis.asyncio.Redis client created with decode_responses=True
+                (or a FakeRedis)
+            visibility_timeout: Seconds before an unacked job is given to another worker
+            key_prefix: Prefix for the queue's keys
+            clock: Source of the current time in seconds, for pacing the
+                search for abandoned jobs
+        """
+        super().__init__(visibility_timeout)
+        self.redis = redis
+        self.stream = f"{key_prefix}jobs"
+        self.workers_key = f"{key_prefix}workers"
+        self.group = "workers"
+        self._clock = clock
+        self._group_created = False
+        # Look for abandoned jobs at most this often while none are found
+        self._reclaim_interval = max(visibility_timeout / 4, 0.1)
+        self._next_reclaim = 0.0
+
+    async def _ensure_group(self) -> None:
+        if self._group_created:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_created = True
+
+    async def enqueue(self, payload: Dict) -> str:
+        if any(isinstance(value, bytes) for value in payload.values()):
+            raise TypeError("Redis job payloads can't carry document content; pass the document's path")
+        await self._ensure_group()
+        return await self.redis.xadd(self.stream, {"payload": json.dumps(payload)})
+
+    async def claim(self, worker: str, timeout: float) -> Optional[QueuedJob]:
+        await self._ensure_group()
+        if self._clock() >= self._next_reclaim:
+            reclaimed = await self.redis.xautoclaim(
+                self.stream, self.group, worker, int(self.visibility_timeout * 1000), count=1
+            )
+            entries = [entry for entry in reclaimed[1] if entry and entry[1]]
+            if entries:
+                return await self._claimed(entries[0])
+            self._next_reclaim = self._clock() + self._reclaim_interval
+
+        response = await self.redis.xreadgroup(
+            self.group, worker, {self.stream: ">"}, count=1, block=max(int(timeout * 1000), 1)
+        )
+        if not response or not response[0][1]:
+            return None
+        return await self._claimed(response[0][1][0])
+
+    async def _claimed(self, entry) -> QueuedJob:
+        message_id, fields = entry
+        pending = await self.redis.xpending_range(self.stream, self.group, message_id, message_id, 1)
+        attempts = pending[0]["times_delivered"] if pending else 1
+        return QueuedJob(message_id, json.loads(fields["payload"]), attempts)
+
+    async def extend(self, job: QueuedJob, worker: str) -> None:
+        # Claiming the job again resets its idle time
+        await self.redis.xclaim(self.stream, self.group, worker, 0, [job.message_id], justid=True)
+
+    async def ack(self, job: QueuedJob) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, job.message_id)
+            pipe.xdel(self.stream, job.message_id)
+            await pipe.execute()
+
+    async def release(self, job: QueuedJob) -> None:
+        # A delivered stream entry can't be handed back; add it again instead
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.stream, {"payload": json.dumps(job.payload)})
+            pipe.xack(self.stream, self.group, job.message_id)
+            pipe.xdel(self.stream, job.message_id)
+            await pipe.execute()
+
+    async def register_worker(self, worker: str) -> None:
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.workers_key, {worker: now})
+            pipe.zremrangebyscore(self.workers_key, "-inf", now - WORKER_PRESENCE_TTL)
+            await pipe.execute()
+
+    async def unregister_worker(self, worker: str) -> None:
+        await self.redis.zrem(self.workers_key, worker)
+
+    async def stats(self) -> Dict:
+        await self._ensure_group()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xlen(self.stream)
+            pipe.xpending(self.stream, self.group)
+            pipe.zcount(self.workers_key, time.time() - WORKER_PRESENCE_TTL, "+inf")
+            length, pending, workers = await pipe.execute()
+        in_progress = pending["pending"]
+        return {"waiting": max(length - in_progress, 0), "in_progress": in_progress, "workers": workers}
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_job_queue() -> JobQueue:
+    """Create the job queue selected by settings.JOB_QUEUE_BACKEND."""
+    backend = settings.JOB_QUEUE_BACKEND
+    if backend == "memory":
+        return InMemoryJobQueue()
+    if backend == "redis":
+        import redis.asyncio as redis
+        return RedisJobQueue(redis.from_url(settings.REDIS_URL, decode_responses=True))
+    if backend == "fakeredis":
+        from app.services.fake_redis import FakeRedis
+        return RedisJobQueue(FakeRedis())
+    raise ValueError(f"Unsupported job queue backend: {backend}")
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import WatchError
+
+from app.config import settings
+
+
+class JobStore(ABC):
+    """Storage for translation job status and results."""
+
+    @abstractmethod
+    async def create(self, job_id: str, job: Dict) -> None:
+        """Store a new job."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Return a copy of the job, or None if it does not exist or has expired."""
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields) -> bool:
+        """
+        Set one or more fields of an existing job in a single write.
+
+        Returns:
+            False if the job does not exist
+        """
+
+    @abstractmethod
+    async def touch(self, job_id: str) -> bool:
+        """
+        Restart a job's expiry without changing it.
+
+        Returns:
+            False if the job does not exist
+        """
+
+    @abstractmethod
+    async def delete(self, job_id: str) -> bool:
+        """
+        Remove a job and its events.
+
+        Returns:
+            False if the job did not exist
+        """
+
+    @abstractmethod
+    async def append_events(self, job_id: str, events: List[Dict]) -> None:
+        """Append events to the job's event log (used for streaming)."""
+
+    @abstractmethod
+    async def get_events(self, job_id: str, start: int = 0) -> List[Dict]:
+        """Return the job's events from index `start` onwards."""
+
+    async def close(self) -> None:
+        """Release any connections held by the store."""
+
+
+class InMemoryJobStore(JobStore):
+    """Per-process job store with LRU eviction and expiry."""
+
+    def __init__(self, max_jobs: int = settings.JOB_STORE_MAX_JOBS, ttl: int = settings.JOB_EXPIRY):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        # job_id -> (expires_at, job), least recently used first
+        self._jobs: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        # job_id -> event log
+        self._events: Dict[str, List[Dict]] = {}
+
+    def _lookup(self, job_id: str) -> Optional[Dict]:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        expires_at, job = entry
+        if expires_at <= time.monotonic():
+            self._remove(job_id)
+            return None
+        self._jobs.move_to_end(job_id)
+        return job
+
+    def _remove(self, job_id: str) -> bool:
+        self._events.pop(job_id, None)
+        return self._jobs.pop(job_id, None) is not None
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for job_id in [job_id for job_id, (expires_at, _) in self._jobs.items() if expires_at <= now]:
+            self._remove(job_id)
+
+    async def create(self, job_id: str, job: Dict) -> None:
+        self._purge_expired()
+        self._jobs[job_id] = (time.monotonic() + self.ttl, dict(job))
+        self._jobs.move_to_end(job_id)
+
+        # Evict the least recently used jobs once over capacity
+        while len(self._jobs) > self.max_jobs:
+            self._remove(next(iter(self._jobs)))
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        job = self._lookup(job_id)
+        return dict(job) if job is not None else None
+
+    async def update(self, job_id: str, **fields) -> bool:
+        job = self._lookup(job_id)
+        if job is None:
+            return False
+        job.update(fields)
+        self._jobs[job_id] = (time.monotonic() + self.ttl, job)
+        return True
+
+    async def touch(self, job_id: str) -> bool:
+        job = self._lookup(job_id)
+        if job is None:
+            return False
+        self._jobs[job_id] = (time.monotonic() + self.ttl, job)
+        return True
+
+    async def delete(self, job_id: str) -> bool:
+        return self._remove(job_id)
+
+    async def append_events(self, job_id: str, events: List[Dict]) -> None:
+        if self._lookup(job_id) is not None:
+            self._events.setdefault(job_id, []).extend(events)
+
+    async def get_events(self, job_id: str, start: int = 0) -> List[Dict]:
+        return list(self._events.get(job_id, [])[start:])
+
+
+class RedisJobStore(JobStore):
+    """
+    Job store shared by all workers through Redis.
+
+    Each job is a hash with JSON-encoded field values, so single fields can be
+    updated without rewriting the whole job, plus a list holding its event
+    log. Every write refreshes the key's expiry. Writes to an existing job
+    check that it exists and write in one transaction (WATCH/MULTI), so a
+    job deleted or expired meanwhile is never recreated with partial fields.
+    """
+
+    def __init__(self, redis, ttl: int = settings.JOB_EXPIRY, key_prefix: str = "job:"):
+        """
+        Args:
+            redis: A redis.asyncio.Redis client created with decode_responses=True
+                (or a FakeRedis)
+            ttl: Seconds a job is kept after its last update
+            key_prefix: Prefix for job keys
+        """
+        self.redis = redis
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.key_prefix}{job_id}"
+
+    def _events_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}{job_id}:events"
+
+    async def _write(self, job_id: str, fields: Dict) -> None:
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={name: json.dumps(value) for name, value in fields.items()})
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def create(self, job_id: str, job: Dict) -> None:
+        await self._write(job_id, job)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        raw = await self.redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {name: json.loads(value) for name, value in raw.items()}
+
+    async def _write_if_exists(self, job_id: str, queue_writes: Callable) -> bool:
+        """
+        Run writes queued by queue_writes(pipe) only if the job still exists.
+
+        Returns:
+            False if the job does not exist
+        """
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    # Don't resurrect a job that was deleted or has expired
+                    if not await pipe.exists(key):
+                        return False
+                    pipe.multi()
+                    queue_writes(pipe)
+                    await pipe.execute()
+                    return True
+                except WatchError:
+                    # The job changed between the check and the write; check again
+                    continue
+
+    async def update(self, job_id: str, **fields) -> bool:
+        key = self._key(job_id)
+
+        def queue_writes(pipe) -> None:
+            pipe.hset(key, mapping={name: json.dumps(value) for name, value in fields.items()})
+            pipe.expire(key, self.ttl)
+
+        return await self._write_if_exists(job_id, queue_writes)
+
+    async def touch(self, job_id: str) -> bool:
+        # EXPIRE leaves missing keys alone, so this can't resurrect a job
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.expire(self._key(job_id), self.ttl)
+            pipe.expire(self._events_key(job_id), self.ttl)
+            exists, _ = await pipe.execute()
+        return bool(exists)
+
+    async def delete(self, job_id: str) -> bool:
+        return bool(await self.redis.delete(self._key(job_id), self._events_key(job_id)))
+
+    async def append_events(self, job_id: str, events: List[Dict]) -> None:
+        if not events:
+            return
+        key = self._events_key(job_id)
+
+        def queue_writes(pipe) -> None:
+            pipe.rpush(key, *[json.dumps(event) for event in events])
+            pipe.expire(key, self.ttl)
+
+        await self._write_if_exists(job_id, queue_writes)
+
+    async def get_events(self, job_id: str, start: int = 0) -> List[Dict]:
+        raw = await self.redis.lrange(self._events_key(job_id), start, -1)
+        return [json.loads(event) for event in raw]
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class JobProgressWriter:
+    """
+    Write frequent progress updates for one job to a store in order.
+
+    Updates arrive from synchronous callbacks; they are merged and flushed by
+    a single background task so at most one write per job is in flight.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._pending: Dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __call__(self, progress: int, status: str) -> None:
+        self._pending.update(progress=progress, status=status)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._pending:
+            fields, self._pending = self._pending, {}
+            await self.store.update(self.job_id, **fields)
+
+    async def drain(self) -> None:
+        """
+        Wait until all pending updates have been written. A failed write is
+        logged rather than raised, so callers can still record the job's outcome.
+        """
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:
+                print(f"Progress update for job {self.job_id} failed: {e}")
+
+
+class JobEventWriter:
+    """
+    Append streaming events for one job to a store in order.
+
+    Consecutive token events are merged while a write is in flight, so a
+    fast token stream turns into a few larger appends.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._pending: List[Dict] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def emit(self, event: str, data: Dict) -> None:
+        """
+        Queue an event.
+
+        Args:
+            event: Event name ("token", "section", "completed" or "failed")
+            data: JSON-serializable event payload
+        """
+        if event == "token" and self._pending and self._pending[-1]["event"] == "token":
+            self._pending[-1]["data"]["text"] += data["text"]
+        else:
+            self._pending.append({"event": event, "data": dict(data)})
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._pending:
+            events, self._pending = self._pending, []
+            await self.store.append_events(self.job_id, events)
+
+    async def drain(self) -> None:
+        """
+        Wait until all queued events have been written. A failed write is
+        logged rather than raised, so callers can still record the job's outcome.
+        """
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:
+                print(f"Events for job {self.job_id} could not be written: {e}")
+
+
+def create_job_store() -> JobStore:
+    """Create the job store selected by settings.JOB_STORE_BACKEND."""
+    backend = settings.JOB_STORE_BACKEND
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "redis":
+        import redis.asyncio as redis
+        return RedisJobStore(redis.from_url(settings.REDIS_URL, decode_responses=True))
+    if backend == "fakeredis":
+        from app.services.fake_redis import FakeRedis
+        return RedisJobStore(FakeRedis())
+    raise ValueError(f"Unsupported job store backend: {backend}")
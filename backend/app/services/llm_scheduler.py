@@ -0,0 +1,329 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import openai
+
+from app.services.metrics import LLM_QUEUE_WAIT_SECONDS
+from app.services.tracing import span
+
+# Request priorities, most urgent first: interactive requests have a user
+# waiting on them, bulk ones (CLI runs, deferred fallbacks) do not
+PRIORITIES = ("interactive", "bulk")
+PRIORITY_RANKS = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Allows a number of units per window of time, in bursts of up to a
+    window's worth.
+
+    Units are refilled continuously. A request for more units than the
+    bucket can ever hold is treated as a request for a full bucket, so it
+    waits for the bucket to fill rather than forever.
+    """
+
+    def __init__(self, limit: float, window: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            limit: Units allowed per window
+            window: Length of the window in seconds
+            clock: Source of the current time in seconds
+        """
+        self.capacity = limit
+        self.rate = limit / window
+        self.available = limit
+        self._clock = clock
+        self._updated = clock()
+
+    def delay(self, amount: float) -> float:
+        """
+        Seconds until an amount can be taken.
+
+        Args:
+            amount: Units wanted
+
+        Returns:
+            0 if the units are available now
+        """
+        self._refill()
+        missing = min(amount, self.capacity) - self.available
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Take units, which must be available."""
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Read how long the API asked us to wait from an error response.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Seconds from the retry-after-ms or Retry-After header (a number of
+        seconds or an HTTP date), or None if there is none
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(float(milliseconds) / 1000, 0.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether a failed request may succeed if sent again."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+class LLMScheduler:
+    """
+    Central gate for every request to the LLM API.
+
+    Requests wait in a priority queue (interactive ahead of bulk, first come
+    first served within a priority) and are sent when a concurrency slot is
+    free and the requests-per-minute and tokens-per-minute buckets allow it.
+    Failed requests that can succeed later are retried with exponential
+    backoff and full jitter. A Retry-After from a rate limit response pauses
+    all requests for that long, since the limit is shared by the account,
+    and the request is retried no sooner than asked. Identical work in
+    flight can be shared between callers with coalesce().
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        request_limit: float = 0,
+        token_limit: float = 0,
+        max_retries: int = 4,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 60.0,
+        window: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            max_concurrent: Maximum number of requests in flight
+            request_limit: Requests allowed per window, or 0 for no limit
+            token_limit: Tokens (prompt plus maximum completion tokens)
+                allowed per window, or 0 for no limit
+            max_retries: Times a request is retried before giving up
+            retry_base_delay: Backoff before the first retry, in seconds;
+                doubled for each further retry
+            retry_max_delay: Upper bound on the backoff, in seconds
+            window: Seconds the rate limits are counted over; a minute, as
+                for the API, but can be shortened for tests
+            clock: Source of the current time in seconds
+            seed: Seed for the backoff jitter, for reproducible runs
+        """
+        self.max_concurrent = max_concurrent
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.request_bucket = TokenBucket(request_limit, window, clock) if request_limit > 0 else None
+        self.token_bucket = TokenBucket(token_limit, window, clock) if token_limit > 0 else None
+        self._clock = clock
+        self._random = random.Random(seed)
+
+        # Waiting requests as [rank, arrival, tokens, future] heap entries
+        self._queue: List[list] = []
+        self._arrivals = itertools.count()
+        self._available = max_concurrent
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "coalesced": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting to be sent."""
+        return sum(1 for entry in self._queue if not entry[3].done())
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests being sent."""
+        return self.max_concurrent - self._available
+
+    async def submit(
+        self,
+        send: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        priority: str = "interactive",
+        max_retries: Optional[int] = None
+    ) -> T:
+        """
+        Send a request once the queue, concurrency and rate limits allow,
+        retrying it if it fails in a way that can succeed later.
+
+        Args:
+            send: Makes the request; called again for each retry
+            tokens: Tokens the request counts against the token limit
+            priority: One of PRIORITIES
+            max_retries: Times to retry this request, instead of the
+                scheduler's max_retries
+
+        Returns:
+            The result of send()
+        """
+        if priority not in PRIORITY_RANKS:
+            raise ValueError(f"Unknown request priority: {priority}")
+        attempt = 0
+        while True:
+            queued = time.perf_counter()
+            with span("llm.queue_wait", priority=priority, attempt=attempt):
+                await self._acquire(tokens, PRIORITY_RANKS[priority])
+            LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, priority=priority)
+            self.stats["requests"] += 1
+            try:
+                return await send()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt, max_retries)
+                if delay is None:
+                    raise
+            finally:
+                self._release()
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def retry_delay(self, error: Exception, attempt: int, max_retries: Optional[int] = None) -> Optional[float]:
+        """
+        Decide whether and when to retry a failed request.
+
+        A rate limit response's Retry-After pauses all requests even when
+        this one is not retried.
+
+        Args:
+            error: Exception the request raised
+            attempt: Number of retries made so far
+            max_retries: Retries allowed, if not the scheduler's max_retries
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        wait = retry_after(error)
+        if wait is not None and isinstance(error, openai.RateLimitError):
+            self.stats["rate_limited"] += 1
+            self._paused_until = max(self._paused_until, self._clock() + wait)
+        if attempt >= (self.max_retries if max_retries is None else max_retries) or not is_retryable(error):
+            return None
+        backoff = self._random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        return backoff if wait is None else max(wait, backoff)
+
+    async def coalesce(self, key: str, work: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run a piece of work once for all concurrent callers with the same key.
+
+        The first caller starts the work; callers arriving while it runs wait
+        for the same result. The work is shielded from the cancellation of
+        any one caller.
+
+        Args:
+            key: Identifies the work, e.g. a translation's cache key
+            work: Starts the work
+
+        Returns:
+            Tuple of (result, whether it was shared from another caller)
+        """
+        running = self._in_flight.get(key)
+        if running is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(running), True
+
+        task = asyncio.ensure_future(work())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task), False
+
+    async def _acquire(self, tokens: int, rank: int) -> None:
+        """Wait in the queue until the request may be sent."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, [rank, next(self._arrivals), tokens, future])
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Admitted just as the caller was cancelled: give the slot back
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Free a concurrency slot and admit the next request."""
+        self._available += 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit queued requests in order while slots and rate limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue and self._available > 0:
+            _, _, tokens, future = self._queue[0]
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            delay = self._admission_delay(tokens)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            if self.request_bucket:
+                self.request_bucket.take(1)
+            if self.token_bucket:
+                self.token_bucket.take(tokens)
+            self._available -= 1
+            future.set_result(None)
+
+    def _admission_delay(self, tokens: int) -> float:
+        """Seconds until the rate limits allow a request of this size."""
+        delay = self._paused_until - self._clock()
+        if self.request_bucket:
+            delay = max(delay, self.request_bucket.delay(1))
+        if self.token_bucket:
+            delay = max(delay, self.token_bucket.delay(tokens))
+        return max(delay, 0.0)
@@ -0,0 +1,265 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram buckets, in seconds
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """A named metric with one value (or histogram) per combination of label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        """Sample lines of the metric in the text exposition format."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.help, quotes=False)}", f"# TYPE {self.name} {self.type}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    """A count that only goes up, e.g. tokens used or failed jobs."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format(value)}" for key, value in values]
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. a queue depth."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the (unlabelled) value from a function each time metrics are collected."""
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format(self._function())}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format(value)}" for key, value in values]
+
+
+class Histogram(Metric):
+    """Counts observations, e.g. durations, in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> ([count per bucket, then above the last bucket], sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the time spent in a with block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        values = self._values.get(self._key(labels))
+        return sum(values[0]) if values else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics of one process, rendered together for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+# Extraction (per document, page and call; PDF work in the extraction
+# processes is timed there and recorded here)
+PDF_OPEN_SECONDS = REGISTRY.histogram(
+    "translator_pdf_open_seconds", "Time to open a PDF with PyMuPDF", buckets=FAST_BUCKETS
+)
+PAGE_EXTRACTION_SECONDS = REGISTRY.histogram(
+    "translator_page_extraction_seconds", "Time to extract the text of one PDF page", buckets=FAST_BUCKETS
+)
+TEXT_CLEAN_SECONDS = REGISTRY.histogram(
+    "translator_text_clean_seconds", "Time to clean one page or document of extracted text", buckets=FAST_BUCKETS
+)
+CLASSIFICATION_SECONDS = REGISTRY.histogram(
+    "translator_classification_seconds", "Time to identify a document's type", buckets=FAST_BUCKETS
+)
+
+# Translation
+LLM_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "translator_llm_queue_wait_seconds",
+    "Time an LLM request waited for the scheduler (concurrency and rate limits)",
+    ("priority",), buckets=LLM_BUCKETS
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "translator_llm_request_seconds", "Duration of one LLM request attempt", ("outcome",), buckets=LLM_BUCKETS
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "translator_llm_time_to_first_token_seconds",
+    "Time from sending a streamed LLM request to its first content", buckets=LLM_BUCKETS
+)
+SECTION_PARSE_SECONDS = REGISTRY.histogram(
+    "translator_section_parse_seconds",
+    "Time spent splitting one translation into sections (streamed or validated)",
+    ("format",), buckets=FAST_BUCKETS
+)
+LLM_TOKENS = REGISTRY.counter(
+    "translator_llm_tokens_total",
+    "LLM tokens used; prompt tokens of streamed requests are estimated",
+    ("type",)
+)
+LLM_QUEUE_DEPTH = REGISTRY.gauge("translator_llm_queue_depth", "LLM requests waiting for the scheduler")
+LLM_IN_FLIGHT = REGISTRY.gauge("translator_llm_in_flight", "LLM requests being sent")
+CACHE_LOOKUPS = REGISTRY.counter(
+    "translator_cache_lookups_total", "Translation cache lookups, and the tier that answered hits", ("result", "tier")
+)
+
+# Jobs
+JOBS_COMPLETED = REGISTRY.counter("translator_jobs_completed_total", "Documents translated")
+JOB_FAILURES = REGISTRY.counter(
+    "translator_job_failures_total", "Documents that failed, by the stage they failed in", ("stage",)
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge("translator_job_queue_depth", "Jobs waiting for a worker")
+JOBS_IN_PROGRESS = REGISTRY.gauge("translator_jobs_in_progress", "Jobs claimed by any worker")
+WORKER_JOBS_RUNNING = REGISTRY.gauge("translator_worker_jobs_running", "Jobs running in this process")
@@ -1,112 +1,229 @@
 import fitz  # PyMuPDF
+import io
 import os
-from typing import Dict, List, Optional
+import time
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
 import re
 from pathlib import Path
 
+from app.config import settings
+from app.services.document_classifier import DocumentClassifier
+from app.services.extraction_engine import ExtractionEngine, PDFSource, open_pdf
+from app.services.metrics import CLASSIFICATION_SECONDS, PAGE_EXTRACTION_SECONDS, PDF_OPEN_SECONDS, TEXT_CLEAN_SECONDS
+from app.services.progress import ProgressCallback
+from app.services.text_cleaner import create_text_cleaner
+from app.services.tracing import span
+
 class PDFProcessor:
     """Service for extracting and processing text from PDF files."""
     
     def __init__(self):
         self.supported_formats = ['.pdf']
+        self.extraction_engine = ExtractionEngine()
+        self.text_cleaner = create_text_cleaner()
+        self.document_classifier = DocumentClassifier()
     
-    def extract_text_from_pdf(self, file_path: str) -> str:
+    def extract_text_from_pdf(
+        self,
+        source: Union[PDFSource, BinaryIO],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> str:
         """
         Extract text content from a PDF file.
         
         Args:
-            file_path: Path to the PDF file
+            source: Path to the PDF file, or its content as bytes or a buffer
+            progress_callback: Optional callback receiving (stage, done, total)
+                after each page is extracted
             
         Returns:
             Extracted text content
         """
         try:
             # Open the PDF file
-            pdf_document = fitz.open(file_path)
-            text_content = []
+            with PDF_OPEN_SECONDS.time():
+                pdf_document = open_pdf(self._as_pdf_source(source))
+            pages = []
             
             # Extract text from each page
             for page_num in range(pdf_document.page_count):
+                page_start = time.perf_counter()
                 page = pdf_document[page_num]
-                text = page.get_text()
-                if text.strip():
-                    text_content.append(f"--- Page {page_num + 1} ---\n{text}")
+                pages.append((page_num + 1, page.get_text()))
+                PAGE_EXTRACTION_SECONDS.observe(time.perf_counter() - page_start)
+                if progress_callback:
+                    progress_callback("extraction", page_num + 1, pdf_document.page_count)
             
             pdf_document.close()
             
-            # Join all pages
-            full_text = "\n\n".join(text_content)
+            return self._join_pages(pages)
             
-            # Clean up the text
-            full_text = self._clean_text(full_text)
+        except Exception as e:
+            raise Exception(f"Error processing PDF: {str(e)}")
+    
+    async def extract_text_from_pdf_async(
+        self,
+        source: Union[PDFSource, BinaryIO],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> str:
+        """
+        Extract text content from a PDF file on the extraction process pool.
+        
+        Produces the same output as extract_text_from_pdf without blocking
+        the event loop.
+        
+        Args:
+            source: Path to the PDF file, or its content as bytes or a buffer
+            progress_callback: Optional callback receiving (stage, done, total)
+                as pages are extracted
             
-            return full_text
+        Returns:
+            Extracted text content
+        """
+        try:
+            pages = await self.extraction_engine.extract_pages(self._as_pdf_source(source), progress_callback)
+            return self._join_pages(pages)
+        except Exception as e:
+            raise Exception(f"Error processing PDF: {str(e)}")
+    
+    async def iter_pages_async(
+        self,
+        source: Union[PDFSource, BinaryIO],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> AsyncIterator[Tuple[int, int, str]]:
+        """
+        Extract and clean pages on the extraction process pool, yielding
+        each page in order as soon as it is ready.
+        
+        Joining the yielded pages with join_pages gives the same text as
+        extract_text_from_pdf_async.
+        
+        Args:
+            source: Path to the PDF file, or its content as bytes or a buffer
+            progress_callback: Optional callback receiving (stage, done, total)
+                as pages are extracted
             
+        Yields:
+            Tuples of (page_count, page_number, cleaned page text), with an
+            empty text for pages without any
+        """
+        try:
+            async for page_count, pages in self.extraction_engine.iter_page_ranges(
+                self._as_pdf_source(source), progress_callback
+            ):
+                for page_num, text in pages:
+                    yield page_count, page_num, self._clean_page(page_num, text)
         except Exception as e:
             raise Exception(f"Error processing PDF: {str(e)}")
     
+    def join_pages(self, pages: List[str]) -> str:
+        """
+        Combine pages cleaned by iter_pages_async into the document text.
+        
+        Args:
+            pages: Cleaned pages in page order
+            
+        Returns:
+            Cleaned text content
+        """
+        return self.text_cleaner.join(pages)
+    
+    @staticmethod
+    def _as_pdf_source(source: Union[PDFSource, BinaryIO]) -> PDFSource:
+        """Read buffers into bytes; paths and bytes are used as they are."""
+        if isinstance(source, (str, bytes)):
+            return source
+        if isinstance(source, (bytearray, memoryview)):
+            return bytes(source)
+        if isinstance(source, io.BytesIO):
+            return source.getvalue()
+        source.seek(0)
+        return source.read()
+    
+    def _join_pages(self, pages: List[Tuple[int, str]]) -> str:
+        """
+        Join extracted pages with page markers and clean the result.
+        
+        Args:
+            pages: List of (page_number, text) tuples in page order
+            
+        Returns:
+            Cleaned text content
+        """
+        return self.join_pages([self._clean_page(page_num, text) for page_num, text in pages])
+    
+    def _clean_page(self, page_num: int, text: str) -> str:
+        """Clean one page behind its page marker; blank pages become empty."""
+        if not text.strip():
+            return ""
+        with TEXT_CLEAN_SECONDS.time(), span("clean", page=page_num):
+            return self.text_cleaner.clean_page(f"--- Page {page_num} ---\n{text}")
+    
+    def shutdown(self) -> None:
+        """Stop the extraction process pool."""
+        self.extraction_engine.shutdown()
+    
     def _clean_text(self, text: str) -> str:
         """
         Clean and normalize extracted text.
         
+        Collapses whitespace, fixes common OCR mistakes (plus any configured
+        in OCR_FIXUPS), removes page numbers and ensures spacing after
+        periods, page by page with patterns compiled once.
+        
         Args:
             text: Raw extracted text
             
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Fix common OCR issues
-        text = text.replace('|', 'I')  # Common OCR mistake
-        
-        # Remove page numbers and headers/footers if they follow a pattern
-        text = re.sub(r'Page \d+ of \d+', '', text)
-        
-        # Ensure proper spacing after periods
-        text = re.sub(r'\.(?=[A-Z])', '. ', text)
-        
-        return text.strip()
+        with TEXT_CLEAN_SECONDS.time():
+            return self.text_cleaner.clean(text)
     
-    def identify_document_type(self, text: str) -> str:
+    def identify_document_type(self, text: str, max_pages: int = settings.CLASSIFICATION_MAX_PAGES) -> str:
         """
         Identify whether the document is a lab result or prescription.
         
         Args:
             text: Extracted text content
+            max_pages: Only read this many pages (0 for the whole document)
             
         Returns:
             Document type: 'lab_results' or 'prescription'
         """
-        text_lower = text.lower()
-        
-        # Keywords for lab results
-        lab_keywords = [
-            'laboratory', 'lab results', 'test results', 'blood test',
-            'urinalysis', 'hemoglobin', 'glucose', 'cholesterol',
-            'white blood cell', 'red blood cell', 'platelet',
-            'reference range', 'normal range', 'specimen'
-        ]
-        
-        # Keywords for prescriptions
-        prescription_keywords = [
-            'prescription', 'rx', 'medication', 'drug name',
-            'dosage', 'sig:', 'dispense', 'refills',
-            'take', 'tablet', 'capsule', 'daily',
-            'prescriber', 'pharmacy'
-        ]
-        
-        lab_score = sum(1 for keyword in lab_keywords if keyword in text_lower)
-        prescription_score = sum(1 for keyword in prescription_keywords if keyword in text_lower)
-        
-        if lab_score > prescription_score:
-            return 'lab_results'
-        elif prescription_score > lab_score:
-            return 'prescription'
-        else:
-            # Default to lab results if unclear
-            return 'lab_results'
+        with CLASSIFICATION_SECONDS.time():
+            return self.document_classifier.classify(text, max_pages)
+    
+    def identify_document_type_early(self, pages: List[str], pages_extracted: int, page_count: int) -> Optional[str]:
+        """
+        Identify the document type from the pages extracted so far.
+        
+        Settles on a type as soon as one leads every other by more than
+        settings.EARLY_CLASSIFICATION_MARGIN (when classification reads a
+        limited number of pages), and otherwise once the pages
+        identify_document_type would read are all in, in which case the
+        result is the same as identify_document_type on the whole text.
+        
+        Args:
+            pages: Cleaned pages extracted so far, in page order
+            pages_extracted: Number of pages extracted so far, blank ones included
+            page_count: Number of pages in the document
+            
+        Returns:
+            Document type, or None if more pages are needed to tell
+        """
+        max_pages = settings.CLASSIFICATION_MAX_PAGES
+        # Blank pages have no page marker and don't count towards max_pages
+        pages_read = len([page for page in pages if page])
+        if pages_extracted >= page_count or (max_pages > 0 and pages_read >= max_pages):
+            return self.identify_document_type(self.join_pages(pages), max_pages)
+        if max_pages <= 0:
+            # Rescoring the whole document after every page would be quadratic
+            return None
+        with CLASSIFICATION_SECONDS.time():
+            return self.document_classifier.leading_type(
+                self.join_pages(pages), max_pages, settings.EARLY_CLASSIFICATION_MARGIN
+            )
     
     def extract_structured_data(self, text: str, doc_type: str) -> Dict:
         """
@@ -0,0 +1,134 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Callback signature shared by the services: (stage, units done, units total)
+ProgressCallback = Callable[[str, int, int], None]
+
+# Share of the overall job progress covered by each stage (start %, end %)
+STAGE_PROGRESS: Dict[str, Tuple[int, int]] = {
+    "upload": (0, 5),
+    "extraction": (5, 35),
+    "classification": (35, 40),
+    "translation": (40, 90),
+    "parsing": (90, 98),
+}
+
+# Job status reported to clients while a stage is running
+STAGE_STATUS: Dict[str, str] = {
+    "upload": "processing",
+    "extraction": "extracting_text",
+    "classification": "identifying_document_type",
+    "translation": "translating",
+    "parsing": "translating",
+}
+
+
+class ProgressTracker:
+    """Turn stage completion events into an overall job percentage."""
+
+    def __init__(self, on_update: Callable[[int, str], None]):
+        """
+        Args:
+            on_update: Called with (progress, status) whenever either changes
+        """
+        self.on_update = on_update
+        self.progress = 0
+        self.status = None
+
+    def __call__(self, stage: str, done: int, total: int) -> None:
+        """
+        Record that `done` of `total` units of work in a stage have finished.
+
+        Args:
+            stage: Stage name from STAGE_PROGRESS
+            done: Units of work completed so far
+            total: Expected units of work for the stage
+        """
+        start, end = STAGE_PROGRESS[stage]
+        fraction = min(done / total, 1.0) if total else 1.0
+        progress = max(self.progress, int(start + (end - start) * fraction))
+        status = STAGE_STATUS[stage]
+
+        # Only report real changes so per-token events stay cheap
+        if progress != self.progress or status != self.status:
+            self.progress = progress
+            self.status = status
+            self.on_update(progress, status)
+
+
+class StageTimer:
+    """
+    Record when each stage of a job runs, to break its time down by stage.
+
+    A stage may run several times (classification is retried as pages come
+    in) or overlap other stages (translation starting during extraction);
+    the breakdown reports each stage's busy time and how much time was
+    spent on several stages at once.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # Stage name -> (start, end) perf_counter times, in recording order
+        self._intervals: Dict[str, List[Tuple[float, float]]] = {}
+
+    def record(self, stage: str, start: float, end: float) -> None:
+        """
+        Record that a stage ran between two time.perf_counter() times.
+
+        Args:
+            stage: Stage name
+            start: When the stage started
+            end: When the stage ended
+        """
+        self._intervals.setdefault(stage, []).append((start, end))
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Record the time spent in the with block as a run of the stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter())
+
+    def breakdown(self) -> Dict:
+        """
+        Summarize the stages recorded so far.
+
+        Returns:
+            Dictionary with "stages" (name -> start and end relative to when
+            the timer was created, and busy seconds), "total_seconds" since
+            the timer was created, and "overlap_seconds", the busy time of
+            all stages minus the time any stage was running
+        """
+        stages = {}
+        for stage, intervals in self._intervals.items():
+            stages[stage] = {
+                "start": round(min(start for start, _ in intervals) - self.origin, 4),
+                "end": round(max(end for _, end in intervals) - self.origin, 4),
+                "seconds": round(_covered_seconds(intervals), 4)
+            }
+        all_intervals = [interval for intervals in self._intervals.values() for interval in intervals]
+        busy = sum(_covered_seconds(intervals) for intervals in self._intervals.values())
+        return {
+            "stages": stages,
+            "total_seconds": round(time.perf_counter() - self.origin, 4),
+            "overlap_seconds": round(max(busy - _covered_seconds(all_intervals), 0.0), 4)
+        }
+
+
+def _covered_seconds(intervals: List[Tuple[float, float]]) -> float:
+    """Length of the union of time intervals."""
+    covered = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered
@@ -0,0 +1,235 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Section keys by a phrase of the header they belong to, checked in order
+SECTION_KEYS: List[Tuple[str, str]] = [
+    # Lab results sections
+    ("good news", "good_news"),
+    ("keep an eye on", "keep_eye_on"),
+    ("should you be worried", "should_worry"),
+    ("daily life", "daily_life"),
+    ("next steps", "next_steps"),
+    # Prescription sections
+    ("doctor has prescribed", "prescribed_medications"),
+    ("what each medicine does", "medicine_purposes"),
+    ("how to take your medications", "medication_instructions"),
+    ("what to expect and side effects", "side_effects"),
+    ("important things to remember", "important_warnings"),
+    ("questions to ask your pharmacist", "pharmacist_questions"),
+]
+
+# Lines that can be headers: markdown headings or bold text
+HEADER_LINE_PATTERN = re.compile(r'^(?:\*\*|#).*', re.MULTILINE)
+HEADER_LINE_PREFIXES = ('**', '#')
+
+# (section key, header line) pairs reported as headers are found
+HeaderMatch = Tuple[str, str]
+
+
+def section_key(header: str) -> str:
+    """
+    Map a section header to the key its content is stored under.
+
+    Args:
+        header: Section header from the prompts
+
+    Returns:
+        The key for a known header, otherwise the header as a slug
+    """
+    lowered = header.lower()
+    for phrase, key in SECTION_KEYS:
+        if phrase in lowered:
+            return key
+    return lowered.replace(' ', '_').replace(',', '').replace('?', '').replace('...', '')
+
+
+class SectionMatcher:
+    """
+    Recognizes the section headers of one document type, compiled once.
+
+    A line is a header if it starts with "#" or "**" and contains one of the
+    headers, case insensitively. All headers are searched for in a single
+    regex alternation, and each maps straight to its section key. Header
+    lines in a block of text are found by scanning the lowercased block for
+    the headers once, then checking how the lines they are on start.
+    """
+
+    def __init__(self, headers: Iterable[str]):
+        """
+        Args:
+            headers: Section headers expected for the document type, in order
+        """
+        self.headers = list(headers)
+        self.keys = [section_key(header) for header in self.headers]
+        self._lowered = [header.lower() for header in self.headers]
+        self._index: Dict[str, int] = {}
+        for index, lowered in enumerate(self._lowered):
+            self._index.setdefault(lowered, index)
+
+        # Longest first, so a header that contains another still matches whole
+        alternatives = "|".join(map(re.escape, sorted(self._index, key=len, reverse=True)))
+        self.pattern = re.compile(alternatives) if alternatives else None
+
+    def match(self, line: str) -> Optional[str]:
+        """
+        Check whether a line is one of the section headers.
+
+        Args:
+            line: A line of the translation
+
+        Returns:
+            The section key if the line is a header, otherwise None
+        """
+        if self.pattern is None or not line.startswith(HEADER_LINE_PREFIXES):
+            return None
+        lowered = line.lower()
+        found = self.pattern.search(lowered)
+        if found is None:
+            return None
+        return self._first_key(lowered, found.group())
+
+    def find(self, block: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Find the header lines in a block of complete lines.
+
+        Args:
+            block: Lines joined by newlines
+
+        Yields:
+            (line start, line end, section key) for each header line, in order
+        """
+        if self.pattern is None:
+            return
+        lowered = block.lower()
+        if len(lowered) != len(block):
+            # Some characters lowercase to several; offsets into the
+            # lowercased text would be off, so check line by line
+            for candidate in HEADER_LINE_PATTERN.finditer(block):
+                key = self.match(candidate.group())
+                if key is not None:
+                    yield candidate.start(), candidate.end(), key
+            return
+
+        # Headers are rare, so checking the line of each one found is cheap
+        next_line = 0
+        for found in self.pattern.finditer(lowered):
+            if found.start() < next_line:
+                continue
+            start = lowered.rfind('\n', 0, found.start()) + 1
+            end = lowered.find('\n', found.end())
+            if end == -1:
+                end = len(lowered)
+            next_line = end + 1
+            if lowered.startswith(HEADER_LINE_PREFIXES, start):
+                yield start, end, self._first_key(lowered[start:end], found.group())
+
+    def _first_key(self, lowered_line: str, header: str) -> str:
+        """Section key of a header found in a line; when a line holds several headers, the first in the list wins."""
+        index = self._index[header]
+        for earlier in range(index):
+            if self._lowered[earlier] in lowered_line:
+                return self.keys[earlier]
+        return self.keys[index]
+
+
+class SectionParser:
+    """
+    Splits a translation into its sections in one pass, as it streams in.
+
+    Text can be fed in pieces of any size; headers are reported as soon as
+    their line is complete. Header lines are found by SectionMatcher.find
+    and the content between headers is sliced out as a whole, so ordinary
+    lines are never looked at one by one.
+    """
+
+    def __init__(self, matcher: Optional[SectionMatcher], conversational_format: bool = False):
+        """
+        Args:
+            matcher: Headers of the document type, or None if it has no
+                known sections (the whole text is then kept as "full_text")
+            conversational_format: Mark the sections as conversational
+                format (lab results are shown as flowing text)
+        """
+        self.matcher = matcher
+        self._sections: Dict[str, object] = {'conversational_format': True} if conversational_format else {}
+        self._current: Optional[str] = None
+        # Runs of complete lines of the current section, each joined by newlines
+        self._content: List[str] = []
+        self._partial_line = ""
+        self._parts: List[str] = []
+        self._finished = False
+
+    def feed(self, text: str) -> List[HeaderMatch]:
+        """
+        Add the next piece of the translation.
+
+        Args:
+            text: Next piece of the translation
+
+        Returns:
+            List of (section_key, header_line) tuples for headers it completes
+        """
+        self._parts.append(text)
+        if '\n' not in text:
+            self._partial_line += text
+            return []
+        block, _, self._partial_line = (self._partial_line + text).rpartition('\n')
+        return self._add_lines(block)
+
+    def finish(self) -> List[HeaderMatch]:
+        """
+        Process the final unterminated line once the whole text is in.
+
+        Returns:
+            List of (section_key, header_line) tuples for a header on that line
+        """
+        if self._finished:
+            return []
+        self._finished = True
+        line, self._partial_line = self._partial_line, ""
+        headers = self._add_lines(line)
+        self._close_section()
+        return headers
+
+    def sections(self) -> Dict:
+        """
+        Get the parsed sections; call after finish().
+
+        Returns:
+            Section key -> content, or {"full_text": translation} if no
+            sections were found
+        """
+        if not self._sections:
+            return {"full_text": "".join(self._parts)}
+        return dict(self._sections)
+
+    def _add_lines(self, block: str) -> List[HeaderMatch]:
+        """Process complete lines, given joined by newlines."""
+        if self.matcher is None:
+            return []
+        headers = []
+        position = 0
+        for start, end, key in self.matcher.find(block):
+            if start > position:
+                self._add_content(block[position:start - 1])
+            self._close_section()
+            self._current = key
+            headers.append((key, block[start:end].strip()))
+            # Continue after the header line's newline
+            position = end + 1
+
+        if position <= len(block):
+            self._add_content(block[position:])
+        return headers
+
+    def _add_content(self, lines: str) -> None:
+        """Add lines to the current section; lines before the first header are dropped."""
+        if self._current is not None:
+            self._content.append(lines)
+
+    def _close_section(self) -> None:
+        """Store the content of the current section."""
+        if self._current is not None:
+            self._sections[self._current] = '\n'.join(self._content).strip()
+        self._current = None
+        self._content = []
@@ -0,0 +1,99 @@
+from typing import Dict, List, Literal, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+# Output formats a translation can be requested in
+OUTPUT_FORMATS = ("markdown", "json")
+
+
+class StructuredTranslation(BaseModel):
+    """Base for translations returned as JSON; unknown fields are rejected."""
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LabTest(StructuredTranslation):
+    """One test of a lab report, with the same fields as the markdown test blocks."""
+
+    test_name: str
+    category: Literal["Blood Count", "Immune System", "Metabolic", "Cardiovascular", "Other"]
+    purpose: str
+    your_result: str
+    normal_range: str
+    status: Literal["normal", "high", "low", "borderline", "desirable"]
+    status_emoji: Literal["🟢", "🔴", "🟡"]
+    what_this_means: str
+    health_impact: str
+    medical_significance: str
+
+
+class LabResultsTranslation(StructuredTranslation):
+    """Lab results explanation; section fields match the markdown section keys."""
+
+    good_news: str
+    keep_eye_on: str
+    should_worry: str
+    daily_life: str
+    next_steps: str
+    tests: List[LabTest]
+
+
+class PrescriptionTranslation(StructuredTranslation):
+    """Prescription explanation; section fields match the markdown section keys."""
+
+    prescribed_medications: str
+    medicine_purposes: str
+    medication_instructions: str
+    side_effects: str
+    important_warnings: str
+    pharmacist_questions: str
+
+
+# Document type -> model the JSON output is validated against
+STRUCTURED_MODELS: Dict[str, Type[StructuredTranslation]] = {
+    'lab_results': LabResultsTranslation,
+    'prescription': PrescriptionTranslation,
+}
+
+
+def response_format(doc_type: str) -> Dict:
+    """
+    Build the response_format parameter constraining output to a document
+    type's schema.
+
+    Args:
+        doc_type: Type of document
+
+    Returns:
+        A strict json_schema response format for the chat completions API
+    """
+    model = STRUCTURED_MODELS[doc_type]
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": f"{doc_type}_translation",
+            "strict": True,
+            "schema": model.model_json_schema()
+        }
+    }
+
+
+def parse_structured_translation(doc_type: str, text: str) -> Optional[StructuredTranslation]:
+    """
+    Parse and validate a JSON translation in a single pass.
+
+    Args:
+        doc_type: Type of document
+        text: Model output
+
+    Returns:
+        The validated translation, or None if the output is not valid JSON
+        for the document type's schema
+    """
+    model = STRUCTURED_MODELS.get(doc_type)
+    if model is None:
+        return None
+    try:
+        return model.model_validate_json(text)
+    except ValidationError:
+        return None
@@ -0,0 +1,137 @@
+import json
+import re
+from typing import Dict, Iterable, Iterator, Optional
+
+from app.config import settings
+
+# Page breaks written by PDFProcessor._join_pages, split on to clean page by page
+PAGE_BREAK = "\n\n--- Page "
+
+# "Page N of M" headers and footers (after whitespace is collapsed)
+PAGE_NUMBER = r'Page \d+ of \d+'
+
+# Rules applied after whitespace is collapsed, keyed by the character every
+# match of the rule starts with. The keys differ, so all rules run as one
+# alternation and the rule that matched is known from its first character.
+CLEANING_RULES = {
+    # Page numbers are removed
+    'P': (PAGE_NUMBER, ''),
+    # A period directly followed by a capital letter gets a space, also when
+    # a removed page number or an OCR'd "|" (which becomes "I") sits between.
+    # The possessive *+ stops "Page" itself counting as the capital letter.
+    '.': (rf'\.(?=(?:{PAGE_NUMBER})*+[A-Z|])', '. '),
+    # Common OCR mistake
+    '|': (r'\|', 'I'),
+}
+
+RULES_PATTERN = re.compile("|".join(pattern for pattern, _ in CLEANING_RULES.values()))
+RULE_REPLACEMENTS = {first: replacement for first, (_, replacement) in CLEANING_RULES.items()}
+
+
+def parse_fixups(value: str) -> Dict[str, str]:
+    """
+    Parse extra OCR fixups from settings.
+
+    Args:
+        value: JSON object mapping regex patterns to literal replacements,
+            or an empty string
+
+    Returns:
+        Mapping of pattern to replacement
+    """
+    if not value.strip():
+        return {}
+    fixups = json.loads(value)
+    if not isinstance(fixups, dict) or not all(isinstance(v, str) for v in fixups.values()):
+        raise ValueError("OCR_FIXUPS must be a JSON object of pattern -> replacement strings")
+    return fixups
+
+
+class TextCleaner:
+    """
+    Normalizes extracted PDF text with patterns compiled once.
+
+    Text is cleaned page by page, so temporary strings stay page-sized and
+    pages can be cleaned as soon as they are extracted.
+    Whitespace is collapsed with str.split/join, then the other rules are
+    applied in one pass. The output is identical to applying the rules to
+    the whole text one after another: whitespace collapse, "|" to "I", page
+    number removal, then spacing after periods.
+    """
+
+    def __init__(self, extra_fixups: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            extra_fixups: Additional OCR fixups, mapping regex patterns to
+                literal replacements, applied in one more pass after the
+                built-in rules (so they see single spaces between words)
+        """
+        self.fixup_replacements: Dict[str, str] = {}
+        self.fixup_pattern = None
+        if extra_fixups:
+            for pattern in extra_fixups:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    raise ValueError(f"Invalid OCR fixup pattern {pattern!r}: {e}")
+            self.fixup_replacements = {f"fixup{index}": replacement for index, replacement in enumerate(extra_fixups.values())}
+            self.fixup_pattern = re.compile("|".join(
+                f"(?P<fixup{index}>{pattern})" for index, pattern in enumerate(extra_fixups)
+            ))
+
+    @staticmethod
+    def _replace_rule(match: re.Match) -> str:
+        return RULE_REPLACEMENTS[match.group()[0]]
+
+    def _replace_fixup(self, match: re.Match) -> str:
+        # The fixup's own group closes last, so lastgroup names it even when
+        # the fixup pattern has groups of its own
+        return self.fixup_replacements[match.lastgroup]
+
+    def clean_page(self, page: str) -> str:
+        """
+        Clean a single page, for text that is cleaned as it is extracted.
+
+        Pages cleaned this way and combined with join() give the same text
+        as clean() of the pages joined by blank lines.
+
+        Args:
+            page: Raw text of one page, starting with its page marker
+
+        Returns:
+            Cleaned page, possibly with a leading or trailing space
+        """
+        page = RULES_PATTERN.sub(self._replace_rule, " ".join(page.split()))
+        if self.fixup_pattern is not None:
+            page = self.fixup_pattern.sub(self._replace_fixup, page)
+        return page
+
+    @staticmethod
+    def join(pages: Iterable[str]) -> str:
+        """Combine pages cleaned by clean_page into the cleaned text."""
+        return " ".join(page for page in pages if page).strip()
+
+    def clean(self, text: str) -> str:
+        """
+        Clean and normalize extracted text.
+
+        Args:
+            text: Raw extracted text
+
+        Returns:
+            Cleaned text
+        """
+        return self.join(self.clean_page(page) for page in _split_pages(text))
+
+
+def _split_pages(text: str) -> Iterator[str]:
+    """Split text on the page breaks, keeping each page's marker."""
+    for index, page in enumerate(text.split(PAGE_BREAK)):
+        # The blank line before the marker becomes the single space the
+        # cleaned pages are joined with
+        yield "--- Page " + page if index else page
+
+
+def create_text_cleaner() -> TextCleaner:
+    """Build the text cleaner configured in settings."""
+    return TextCleaner(parse_fixups(settings.OCR_FIXUPS))
@@ -0,0 +1,142 @@
+import math
+import re
+from typing import Callable, Dict, List
+
+from app.config import settings
+
+
+class HeuristicEncoding:
+    """
+    Dependency-free token counter approximating OpenAI's BPE encodings.
+
+    Counts runs of up to five letters, runs of up to three digits, and each
+    other non-space character as one token, which tracks cl100k/o200k counts
+    closely for English medical text.
+    """
+
+    name = "heuristic"
+    TOKEN_PATTERN = re.compile(r"[^\W\d_]{1,5}|\d{1,3}|[^\w\s]|_")
+
+    def count(self, text: str) -> int:
+        return len(self.TOKEN_PATTERN.findall(text))
+
+
+class TiktokenEncoding:
+    """Exact token counts using the optional tiktoken package."""
+
+    def __init__(self, encoding_name: str):
+        import tiktoken
+        self._encoding = tiktoken.get_encoding(encoding_name)
+        self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+# Encoding name -> factory; extend with register_encoding()
+_ENCODINGS: Dict[str, Callable[[], object]] = {
+    "heuristic": HeuristicEncoding,
+}
+
+
+def register_encoding(name: str, factory: Callable[[], object]) -> None:
+    """
+    Make an encoding available to get_encoding().
+
+    Args:
+        name: Name used in settings.TOKENIZER_ENCODING
+        factory: Callable returning an object with a count(text) method
+    """
+    _ENCODINGS[name] = factory
+
+
+def get_encoding(name: str = settings.TOKENIZER_ENCODING, model: str = settings.OPENAI_MODEL):
+    """
+    Look up a token encoding.
+
+    Args:
+        name: "auto" (tiktoken for the model if installed, else heuristic),
+            "tiktoken:<encoding>", or a registered encoding name
+        model: Model name used to pick the tiktoken encoding in auto mode
+
+    Returns:
+        An encoding with a count(text) method
+    """
+    if name == "auto":
+        try:
+            import tiktoken
+            return TiktokenEncoding(tiktoken.encoding_for_model(model).name)
+        except (ImportError, KeyError):
+            return HeuristicEncoding()
+    if name.startswith("tiktoken:"):
+        return TiktokenEncoding(name.split(":", 1)[1])
+    if name not in _ENCODINGS:
+        raise ValueError(f"Unknown tokenizer encoding: {name}")
+    return _ENCODINGS[name]()
+
+
+class TokenEstimator:
+    """Estimates prompt sizes and completion budgets before calling the API."""
+
+    # Chat formatting overhead per message and for the reply priming
+    TOKENS_PER_MESSAGE = 4
+    TOKENS_PER_REPLY = 3
+
+    def __init__(self, encoding=None):
+        self.encoding = encoding or get_encoding()
+
+    def count(self, text: str) -> int:
+        """Estimate the tokens in a piece of text."""
+        return self.encoding.count(text)
+
+    def count_messages(self, messages: List[Dict]) -> int:
+        """Estimate the prompt tokens of a chat request."""
+        return sum(
+            self.TOKENS_PER_MESSAGE + self.count(message["content"]) for message in messages
+        ) + self.TOKENS_PER_REPLY
+
+    def completion_budget(self, prompt_tokens: int, max_completion_tokens: int = settings.MAX_COMPLETION_TOKENS) -> int:
+        """
+        Choose max_tokens for a request so prompt and completion fit in the context window.
+
+        Args:
+            prompt_tokens: Estimated prompt size
+            max_completion_tokens: Upper limit for the completion
+
+        Returns:
+            Completion token budget (may be below the useful minimum)
+        """
+        return min(max_completion_tokens, settings.MODEL_CONTEXT_TOKENS - prompt_tokens)
+
+    def chars_for_tokens(self, text: str, tokens: int) -> int:
+        """
+        Convert a token budget into a character length using the text's own density.
+
+        Args:
+            text: Sample text (usually the whole document)
+            tokens: Token budget
+
+        Returns:
+            Approximate number of characters holding that many tokens
+        """
+        text_tokens = max(1, self.count(text))
+        return max(1, math.floor(tokens * len(text) / text_tokens))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Shorten text to at most max_tokens, cutting at a word boundary.
+
+        Args:
+            text: Text to shorten
+            max_tokens: Token limit
+
+        Returns:
+            The text, truncated if needed
+        """
+        while self.count(text) > max_tokens and text:
+            cut = self.chars_for_tokens(text, max_tokens)
+            # Step back a little each pass in case the density varies
+            cut = min(cut, len(text) - 1) * 95 // 100
+            boundary = text.rfind(" ", 0, cut)
+            text = text[:boundary if boundary > 0 else cut]
+        return text
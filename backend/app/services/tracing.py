@@ -0,0 +1,309 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+
+# Spans kept per trace; a 100 page document records about 250
+MAX_SPANS = 2000
+
+# (trace, id of the span new spans are children of) while a traced job runs
+_current: ContextVar[Optional[Tuple["Trace", str]]] = ContextVar("current_trace", default=None)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class Trace:
+    """
+    Timed spans of one job, from its upload to its result.
+
+    Traces are stored with the job as plain dictionaries (to_dict), so the
+    worker that processes a job can carry on the trace the web process
+    started at upload. Times are Unix epoch nanoseconds, as in OpenTelemetry.
+    """
+
+    def __init__(self, name: str = "job", **attributes):
+        """
+        Start a trace and its root span.
+
+        Args:
+            name: Name of the root span
+            **attributes: Attributes of the root span
+        """
+        self.trace_id = _new_id(16)
+        self.root_id = _new_id(8)
+        self.spans: List[Dict] = []
+        self.dropped_spans = 0
+        self.add({
+            "name": name,
+            "span_id": self.root_id,
+            "parent_id": None,
+            "start_ns": time.time_ns(),
+            "end_ns": None,
+            "attributes": attributes
+        })
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Trace":
+        """Carry on a trace stored with to_dict."""
+        trace = cls.__new__(cls)
+        trace.trace_id = data["trace_id"]
+        trace.root_id = data["root_id"]
+        trace.spans = list(data["spans"])
+        trace.dropped_spans = data.get("dropped_spans", 0)
+        return trace
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "root_id": self.root_id,
+            "spans": self.spans,
+            "dropped_spans": self.dropped_spans
+        }
+
+    def add(self, span: Dict) -> None:
+        """Add a finished span, dropping it if the trace is full."""
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped_spans += 1
+            return
+        self.spans.append(span)
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, parent_id: Optional[str] = None, **attributes) -> None:
+        """Add a span timed elsewhere, under the root span unless a parent is given."""
+        self.add({
+            "name": name,
+            "span_id": _new_id(8),
+            "parent_id": parent_id or self.root_id,
+            "start_ns": start_ns,
+            "end_ns": end_ns,
+            "attributes": attributes
+        })
+
+    def last_end_ns(self) -> int:
+        """When the most recent span ended."""
+        ends = [span["end_ns"] for span in self.spans if span["end_ns"] is not None]
+        return max(ends, default=self.spans[0]["start_ns"])
+
+    def finish(self) -> None:
+        """End the root span now."""
+        self.spans[0]["end_ns"] = time.time_ns()
+
+    def summary(self) -> Dict:
+        """
+        The trace in a readable form, for the status endpoint.
+
+        Returns:
+            Dictionary with the trace ID, total seconds and each span's start
+            (seconds after the root span started), duration in seconds,
+            parent and attributes
+        """
+        origin = self.spans[0]["start_ns"]
+        end = self.spans[0]["end_ns"] or self.last_end_ns()
+        return {
+            "trace_id": self.trace_id,
+            "total_seconds": round((end - origin) / 1e9, 6),
+            "dropped_spans": self.dropped_spans,
+            "spans": [
+                {
+                    "name": span["name"],
+                    "span_id": span["span_id"],
+                    "parent_id": span["parent_id"],
+                    "start": round((span["start_ns"] - origin) / 1e9, 6),
+                    "seconds": round(((span["end_ns"] or end) - span["start_ns"]) / 1e9, 6),
+                    **({"error": span["error"]} if span.get("error") else {}),
+                    "attributes": span["attributes"]
+                }
+                for span in sorted(self.spans, key=lambda span: span["start_ns"])
+            ]
+        }
+
+    def to_otlp(self, service_name: str) -> Dict:
+        """
+        The trace as an OTLP/JSON ExportTraceServiceRequest, the body an
+        OpenTelemetry collector accepts at /v1/traces.
+
+        Args:
+            service_name: service.name resource attribute
+        """
+        end = self.spans[0]["end_ns"] or self.last_end_ns()
+        spans = []
+        for span in self.spans:
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span["span_id"],
+                "name": span["name"],
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span["start_ns"]),
+                "endTimeUnixNano": str(span["end_ns"] or end),
+                "attributes": _otlp_attributes(span["attributes"]),
+                "status": {"code": 2, "message": span["error"]} if span.get("error") else {}
+            }
+            if span["parent_id"]:
+                otlp_span["parentSpanId"] = span["parent_id"]
+            spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}]
+            }]
+        }
+
+
+class Span:
+    """A span being timed by a with block; spans started inside it are its children."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start_ns", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent_id: str, attributes: Dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set((self.trace, self.span_id))
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end_ns = time.time_ns()
+        _current.reset(self._token)
+        span = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": end_ns,
+            "attributes": self.attributes
+        }
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            span["error"] = str(exc) or exc_type.__name__
+        self.trace.add(span)
+        return False
+
+
+class _NoSpan:
+    """Stands in for a span outside traced jobs, doing nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attributes):
+    """
+    Time a with block as a span of the current job's trace.
+
+    Outside a traced job this costs one context variable lookup.
+
+    Args:
+        name: Span name
+        **attributes: Span attributes; more can be set on the span in the block
+    """
+    current = _current.get()
+    if current is None:
+        return NO_SPAN
+    return Span(current[0], name, current[1], attributes)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """Add a span timed elsewhere (e.g. in an extraction process) to the current trace, if any."""
+    current = _current.get()
+    if current is not None:
+        current[0].add_span(name, start_ns, end_ns, current[1], **attributes)
+
+
+def is_tracing() -> bool:
+    """Whether the current job is traced."""
+    return _current.get() is not None
+
+
+@contextmanager
+def activate(trace: Optional[Trace]) -> Iterator[None]:
+    """Record the spans of the with block in a trace (under its root span); None records nothing."""
+    if trace is None:
+        yield
+        return
+    token = _current.set((trace, trace.root_id))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class OTLPExporter:
+    """
+    Sends finished traces to an OpenTelemetry collector over OTLP/HTTP with
+    JSON encoding, in the background.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        """
+        Args:
+            endpoint: Collector traces URL, e.g. http://localhost:4318/v1/traces
+            service_name: service.name of the exported spans
+            timeout: Seconds to wait for the collector
+        """
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.AsyncClient(timeout=timeout)
+        self._pending: Set[asyncio.Task] = set()
+
+    def export(self, trace: Trace) -> None:
+        """Send a trace without waiting for the collector."""
+        task = asyncio.create_task(self._send(trace.to_otlp(self.service_name)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, body: Dict) -> None:
+        try:
+            response = await self._client.post(self.endpoint, json=body)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Trace export to {self.endpoint} failed: {e}")
+
+    async def close(self) -> None:
+        """Wait for traces being sent, then close the connection pool."""
+        if self._pending:
+            await asyncio.gather(*self._pending)
+        await self._client.aclose()
+
+
+def create_trace_exporter(endpoint: str, service_name: str) -> Optional[OTLPExporter]:
+    """An exporter to the collector at the given endpoint, or None when there is none."""
+    return OTLPExporter(endpoint, service_name) if endpoint else None
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    """Attributes as OTLP KeyValues; int64 values are strings in OTLP/JSON."""
+    values = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        values.append({"key": key, "value": typed})
+    return values
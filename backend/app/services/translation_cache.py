@@ -0,0 +1,346 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.prompts import PROMPT_VERSION
+from app.services.metrics import CACHE_LOOKUPS
+
+
+def make_cache_key(content: str, doc_type: str, model: str, prompt_version: str = PROMPT_VERSION) -> str:
+    """
+    Build a content-addressed cache key for a translation.
+
+    Whitespace is normalized so the same document extracted with different
+    line breaks maps to the same key.
+
+    Args:
+        content: Extracted text content
+        doc_type: Type of document
+        model: Model used for the translation
+        prompt_version: Fingerprint of the prompt templates
+
+    Returns:
+        Hex digest identifying the translation
+    """
+    normalized = " ".join(content.split())
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, doc_type, normalized):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class MemoryCacheTier:
+    """In-process LRU tier bounded by entry count and total size."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_bytes = 0
+        # key -> (expires_at, payload, encoded size), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    async def set(self, key: str, payload: str) -> None:
+        # Budget in UTF-8 bytes; translations of non-English text are mostly multi-byte
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, payload, size)
+        self.size_bytes += size
+
+        # Evict least recently used entries until within both limits
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+
+class DiskCacheTier:
+    """
+    Directory-backed tier shared by workers on the same host.
+
+    Entries are files named by key. A file's modification time records when
+    it was written, which sets its expiry; its access time records its last
+    use, for evicting the least recently used. The tier keeps a running total of the directory's size and
+    only scans it to evict entries once the total goes over max_bytes. The
+    total counts this process' writes, so the directory can outgrow
+    max_bytes by what other processes wrote since the last scan. Note that
+    cached translations contain patient information.
+    """
+
+    name = "disk"
+
+    # Evict down to this fraction of max_bytes, so a full cache isn't
+    # rescanned on every write
+    EVICT_TO = 0.9
+
+    def __init__(self, directory: str, max_bytes: int, ttl: int, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.size_bytes = self._scan(max_bytes)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        now = self._clock()
+        try:
+            written_at = os.stat(path).st_mtime
+            if written_at + self.ttl <= now:
+                self._remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                payload = f.read()
+            # Mark as recently used without extending its expiry
+            os.utime(path, (now, written_at))
+            return payload
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, payload: str) -> None:
+        # Write then rename so readers never see a partial file
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        content = payload.encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        with self._lock:
+            replaced = self._size(path)
+            now = self._clock()
+            os.utime(tmp_path, (now, now))
+            os.replace(tmp_path, path)
+            self.size_bytes += len(content) - replaced
+            if self.size_bytes > self.max_bytes:
+                self.size_bytes = self._scan(int(self.max_bytes * self.EVICT_TO))
+
+    def _scan(self, limit: int) -> int:
+        """
+        Remove expired entries, then the least recently used until the
+        directory holds at most limit bytes.
+
+        Returns:
+            Bytes left in the directory
+        """
+        entries = []
+        now = self._clock()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime + self.ttl <= now:
+                    self._unlink(entry.path)
+                else:
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            self._unlink(path)
+            total -= size
+        return total
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            size = self._size(path)
+            self._unlink(path)
+            self.size_bytes = max(0, self.size_bytes - size)
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, payload: str) -> None:
+        await asyncio.to_thread(self._write, key, payload)
+
+
+class RedisCacheTier:
+    """Tier shared by all workers through Redis; size is bounded by Redis' maxmemory policy."""
+
+    name = "redis"
+
+    def __init__(self, redis, ttl: int, key_prefix: str = "translation:"):
+        """
+        Args:
+            redis: A redis.asyncio.Redis client created with decode_responses=True
+                (or a FakeRedis)
+            ttl: Seconds an entry is kept
+            key_prefix: Prefix for cache keys
+        """
+        self.redis = redis
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.redis.get(f"{self.key_prefix}{key}")
+
+    async def set(self, key: str, payload: str) -> None:
+        await self.redis.set(f"{self.key_prefix}{key}", payload, ex=self.ttl)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class TranslationCache:
+    """
+    Multi-tier cache of successful translation results.
+
+    Tiers are checked in order; a hit in a slower tier is copied into the
+    faster tiers in front of it.
+    """
+
+    def __init__(self, tiers: List):
+        self.tiers = tiers
+        self.hits: Dict[str, int] = {tier.name: 0 for tier in tiers}
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached translation result.
+
+        Args:
+            key: Key from make_cache_key
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        for index, tier in enumerate(self.tiers):
+            try:
+                payload = await tier.get(key)
+            except Exception as e:
+                # A broken tier should cost a translation, not fail the job
+                self.errors += 1
+                print(f"Translation cache {tier.name} lookup failed: {e}")
+                continue
+            if payload is None:
+                continue
+
+            self.hits[tier.name] += 1
+            CACHE_LOOKUPS.inc(result="hit", tier=tier.name)
+            for faster_tier in self.tiers[:index]:
+                await self._store(faster_tier, key, payload)
+            return json.loads(payload)
+
+        self.misses += 1
+        CACHE_LOOKUPS.inc(result="miss", tier="")
+        return None
+
+    async def set(self, key: str, result: Dict) -> None:
+        """
+        Store a translation result in every tier.
+
+        Args:
+            key: Key from make_cache_key
+            result: Successful translation result
+        """
+        payload = json.dumps(result)
+        for tier in self.tiers:
+            await self._store(tier, key, payload)
+        self.stores += 1
+
+    async def _store(self, tier, key: str, payload: str) -> None:
+        try:
+            await tier.set(key, payload)
+        except Exception as e:
+            self.errors += 1
+            print(f"Translation cache {tier.name} write failed: {e}")
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters."""
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            "tiers": [tier.name for tier in self.tiers],
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round(sum(self.hits.values()) / lookups, 4) if lookups else 0.0
+        }
+
+    async def close(self) -> None:
+        """Release any connections held by the tiers."""
+        for tier in self.tiers:
+            if hasattr(tier, "close"):
+                await tier.close()
+
+
+def create_translation_cache() -> Optional[TranslationCache]:
+    """
+    Create the cache described by settings.TRANSLATION_CACHE_TIERS.
+
+    Returns:
+        The cache, or None if caching is disabled
+    """
+    tiers = []
+    for name in [name.strip() for name in settings.TRANSLATION_CACHE_TIERS.split(",") if name.strip()]:
+        if name == "memory":
+            tiers.append(MemoryCacheTier(
+                settings.TRANSLATION_CACHE_MAX_ENTRIES,
+                settings.TRANSLATION_CACHE_MAX_BYTES,
+                settings.TRANSLATION_CACHE_TTL
+            ))
+        elif name == "disk":
+            tiers.append(DiskCacheTier(
+                settings.TRANSLATION_CACHE_DIR,
+                settings.TRANSLATION_CACHE_DISK_MAX_BYTES,
+                settings.TRANSLATION_CACHE_TTL
+            ))
+        elif name == "redis":
+            import redis.asyncio as redis
+            tiers.append(RedisCacheTier(
+                redis.from_url(settings.REDIS_URL, decode_responses=True),
+                settings.TRANSLATION_CACHE_TTL
+            ))
+        else:
+            raise ValueError(f"Unsupported translation cache tier: {name}")
+
+    return TranslationCache(tiers) if tiers else None
@@ -1,8 +1,18 @@
 from fastapi import UploadFile, HTTPException
-from typing import Optional
+from fastapi.responses import JSONResponse
+from typing import Dict, Optional, Union
+import aiofiles
 import os
 from app.config import settings
 
+# Every PDF starts with this header, within its first PDF_HEADER_WINDOW bytes
+# (readers accept a few bytes of junk before it)
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+# Room for a multipart request's boundaries and part headers besides the file
+MULTIPART_OVERHEAD = 64 * 1024
+
 class FileValidator:
     """Service for validating uploaded files."""
     
@@ -29,20 +39,101 @@ class FileValidator:
                 detail=f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
             )
         
-        # Check file size
-        file.file.seek(0, 2)  # Move to end of file
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
+        # Size and content are checked while the file is saved
+    
+    @staticmethod
+    async def save_upload(file: UploadFile, file_path: str, memory_threshold: int = 0) -> Union[bytes, str]:
+        """
+        Copy an uploaded file in fixed-size chunks, keeping small files in
+        memory and spilling larger ones to disk.
         
-        if file_size > settings.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
+        Starlette has already received the whole request body (spooling large
+        files to a temporary file) by the time this runs; RequestSizeLimit is
+        what bounds how much is received. Here the size limit and the PDF
+        header are checked as the file is copied, so an oversized or invalid
+        upload is not copied in full. A partial file is removed on failure.
+        
+        Args:
+            file: The uploaded file
+            file_path: Path the file is written to if it exceeds memory_threshold
+            memory_threshold: Largest size in bytes kept in memory (0 to always
+                write to disk)
+            
+        Returns:
+            The file content if it was kept in memory, otherwise file_path
+            
+        Raises:
+            HTTPException: If validation fails
+        """
+        file_size = 0
+        buffer = bytearray()
+        f = None
+        # The first PDF_HEADER_WINDOW bytes, until the header has been checked
+        head = bytearray()
+        
+        try:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                if head is not None:
+                    head += chunk[:PDF_HEADER_WINDOW - len(head)]
+                    if len(head) >= PDF_HEADER_WINDOW:
+                        FileValidator.validate_pdf_header(bytes(head))
+                        head = None
+                
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / 1024 / 1024}MB"
+                    )
+                
+                if f is None and file_size <= memory_threshold:
+                    buffer += chunk
+                    continue
+                
+                # Spill to disk once the file outgrows the memory threshold
+                if f is None:
+                    f = await aiofiles.open(file_path, 'wb')
+                    await f.write(buffer)
+                    buffer = bytearray()
+                await f.write(chunk)
+            
+            # Check if file is empty
+            if file_size == 0:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+            # Files shorter than the header window
+            if head is not None:
+                FileValidator.validate_pdf_header(bytes(head))
+        
+        except Exception:
+            if f is not None:
+                await f.close()
+                f = None
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+            raise
+        
+        finally:
+            if f is not None:
+                await f.close()
         
-        # Check if file is empty
-        if file_size == 0:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        return file_path if file_size > memory_threshold else bytes(buffer)
+    
+    @staticmethod
+    def validate_pdf_header(head: bytes) -> None:
+        """
+        Check that the PDF header is within the first PDF_HEADER_WINDOW bytes.
+        
+        Args:
+            head: The first bytes of the file (at least PDF_HEADER_WINDOW,
+                unless the file is shorter)
+            
+        Raises:
+            HTTPException: If the header is missing
+        """
+        if PDF_MAGIC not in head[:PDF_HEADER_WINDOW]:
+            raise HTTPException(status_code=400, detail="File content is not a valid PDF")
     
     @staticmethod
     def validate_content_type(content_type: Optional[str]) -> None:
@@ -89,3 +180,52 @@ class FileValidator:
             filename = 'document.pdf'
         
         return filename
+
+
+class RequestSizeLimit:
+    """
+    ASGI middleware limiting the size of request bodies on given paths.
+    
+    Requests declaring a larger Content-Length get a 413 before any of the
+    body is received. Bodies without one (chunked uploads) are counted as
+    they arrive and the request fails with a 413 once over the limit, so an
+    oversized upload is never received (or spooled to disk) in full.
+    """
+    
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            app: The ASGI application
+            limits: Request path -> largest body in bytes
+        """
+        self.app = app
+        self.limits = limits
+    
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        
+        detail = f"Request body exceeds the maximum of {limit / 1024 / 1024:.1f}MB"
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+        
+        received = 0
+        
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+        
+        await self.app(scope, receive_limited, send)
@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+import os
+import socket
+import uuid
+from typing import AsyncContextManager, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services.job_queue import JobQueue, QueuedJob
+from app.services.metrics import WORKER_JOBS_RUNNING
+
+# Called with a job's payload to run it
+JobHandler = Callable[[Dict], Awaitable[None]]
+# Called with (payload, error message) for a job that won't be run again
+AbandonHandler = Callable[[Dict, str], Awaitable[None]]
+
+
+class StageLimits:
+    """Limits how many jobs of one process are in each pipeline stage at once."""
+
+    def __init__(self, limits: Dict[str, int]):
+        """
+        Args:
+            limits: Stage name -> jobs allowed in the stage at once (0 for no limit)
+        """
+        self._slots = {stage: asyncio.Semaphore(limit) for stage, limit in limits.items() if limit > 0}
+
+    def slot(self, stage: str) -> AsyncContextManager:
+        """Wait for room in a stage; use as `async with limits.slot("extraction"):`."""
+        return self._slots.get(stage) or contextlib.nullcontext()
+
+
+class WorkerPool:
+    """
+    Runs jobs from a queue, a fixed number at a time.
+
+    Each of `concurrency` loops claims a job, runs it and acks it. The job's
+    visibility timeout is extended while it runs, so only jobs of crashed
+    workers are claimed again. Jobs claimed more than max_attempts times
+    (they keep crashing their worker) are abandoned instead. On stop, jobs
+    still running are cancelled and released for another worker.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: JobHandler,
+        on_abandoned: AbandonHandler,
+        concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+        name: Optional[str] = None
+    ):
+        """
+        Args:
+            queue: Queue to take jobs from
+            handler: Runs a job; exceptions it raises abandon the job
+            on_abandoned: Records a job that failed or crashed too often
+            concurrency: Jobs run at once
+            max_attempts: Times a job is claimed before it is abandoned
+            name: Worker name in the queue; unique per process by default
+        """
+        self.queue = queue
+        self.handler = handler
+        self.on_abandoned = on_abandoned
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.running = 0
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Start taking jobs."""
+        self._stopping = False
+        await self.queue.register_worker(self.name)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._keep_registered()))
+
+    async def stop(self) -> None:
+        """Stop taking jobs, releasing any that are still running."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.queue.unregister_worker(self.name)
+        except Exception as e:
+            print(f"Worker {self.name} could not unregister: {e}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                job = await self.queue.claim(self.name, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Worker {self.name} could not claim a job: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if job is None:
+                continue
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The job stays claimed and is retried once its timeout runs out
+                print(f"Worker {self.name} could not finish a job: {e}")
+
+    async def _process(self, job: QueuedJob) -> None:
+        """Run one job, keeping it claimed until it is done."""
+        if job.attempts > self.max_attempts:
+            await self.on_abandoned(
+                job.payload, f"Processing was interrupted {job.attempts - 1} times; giving up"
+            )
+            await self.queue.ack(job)
+            return
+
+        self.running += 1
+        WORKER_JOBS_RUNNING.inc()
+        heartbeat = asyncio.create_task(self._keep_claimed(job))
+        try:
+            await self.handler(job.payload)
+        except asyncio.CancelledError:
+            # Shutting down: let another worker take the job
+            await asyncio.shield(self.queue.release(job))
+            raise
+        except Exception as e:
+            print(f"Worker {self.name} failed a job: {e}")
+            await self.on_abandoned(job.payload, str(e))
+            await self.queue.ack(job)
+        else:
+            await self.queue.ack(job)
+        finally:
+            self.running -= 1
+            WORKER_JOBS_RUNNING.dec()
+            heartbeat.cancel()
+
+    async def _keep_claimed(self, job: QueuedJob) -> None:
+        """Extend a running job's visibility timeout until cancelled."""
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            try:
+                await self.queue.extend(job, self.name)
+            except Exception as e:
+                print(f"Worker {self.name} could not extend a job's timeout: {e}")
+
+    async def _keep_registered(self) -> None:
+        """Keep this worker counted as taking jobs until cancelled."""
+        while True:
+            await asyncio.sleep(5.0)
+            try:
+                await self.queue.register_worker(self.name)
+            except Exception as e:
+                print(f"Worker {self.name} could not register: {e}")
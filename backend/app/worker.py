@@ -0,0 +1,120 @@
+"""
+Worker process that takes uploaded documents from the job queue and
+processes them.
+
+Usage (from backend/):
+    JOB_QUEUE_BACKEND=redis JOB_STORE_BACKEND=redis python -m app.worker
+
+Start as many workers as needed, on any host that can reach Redis (and
+UPLOAD_DIR, for documents too large to keep in memory). Each runs
+JOB_WORKER_CONCURRENCY jobs at once. With JOB_WORKERS_IN_WEB=true the API
+server also runs a worker pool in each web process; this is the only option
+with the in-memory queue.
+"""
+import asyncio
+import os
+import signal
+from typing import Dict
+
+from app.config import settings
+from app.routers import batch, translate
+from app.routers.metrics import render_metrics
+from app.services.metrics import CONTENT_TYPE
+from app.services.worker_pool import WorkerPool
+
+
+async def run_job(payload: Dict) -> None:
+    """
+    Process one queued document.
+
+    A job delivered again after it finished (its worker crashed before
+    acking it) is skipped, as is one whose status has expired or was deleted.
+
+    Args:
+        payload: Job enqueued by translate.enqueue_document
+    """
+    job_id = payload["job_id"]
+    document = payload["document"]
+    batch_id = payload.get("batch_id")
+    if batch_id:
+        # Keep the batch from expiring while its documents are processed
+        await translate.job_store.touch(batch_id)
+    job = await translate.job_store.get(job_id)
+    if job is not None and job["status"] not in ("completed", "failed"):
+        await translate.process_document(job_id, document, payload["priority"], job.get("trace"), batch_id)
+    elif isinstance(document, str) and os.path.exists(document):
+        os.remove(document)
+    if batch_id:
+        await batch.complete_batch_if_finished(batch_id)
+
+
+async def abandon_job(payload: Dict, error: str) -> None:
+    """Fail a job that could not be processed."""
+    await translate.fail_job(payload["job_id"], error, "worker")
+    if payload.get("batch_id"):
+        await batch.complete_batch_if_finished(payload["batch_id"])
+
+
+def create_worker_pool() -> WorkerPool:
+    """Create a worker pool for this process's job queue."""
+    return WorkerPool(translate.job_queue, run_job, abandon_job)
+
+
+async def serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Answer any HTTP request with this worker's metrics, for Prometheus."""
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = (await render_metrics()).encode()
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve() -> None:
+    """Run a worker pool until SIGINT or SIGTERM, then release unfinished jobs."""
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        raise SystemExit("A separate worker needs a shared job queue: set JOB_QUEUE_BACKEND=redis")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    metrics_server = None
+    if settings.WORKER_METRICS_PORT:
+        metrics_server = await asyncio.start_server(serve_metrics, port=settings.WORKER_METRICS_PORT)
+        print(f"Serving metrics on port {settings.WORKER_METRICS_PORT}")
+
+    pool = create_worker_pool()
+    await pool.start()
+    # Finish deferred translations submitted before a restart
+    await translate.deferred_translator.resume()
+    print(f"Worker {pool.name} processing jobs ({pool.concurrency} at a time)...")
+    try:
+        await stop.wait()
+    finally:
+        print(f"Stopping worker {pool.name}...")
+        if metrics_server:
+            metrics_server.close()
+        await pool.stop()
+        await translate.deferred_translator.close()
+        await translate.ai_translator.close()
+        translate.pdf_processor.shutdown()
+        await translate.job_queue.close()
+        await translate.job_store.close()
+        if translate.trace_exporter:
+            await translate.trace_exporter.close()
+
+
+def main():
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the precompiled, page-by-page text cleaner with the original four-pass
+implementation of PDFProcessor._clean_text on multi-megabyte text.
+
+Reports time per call and peak memory allocated during a call, and checks
+that both produce identical output.
+
+Usage (from backend/):
+    python -m benchmarks.clean_text [--mb 1 4 16] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import time
+import tracemalloc
+
+from app.services.text_cleaner import TextCleaner
+from benchmarks.corpus import make_document_text
+
+
+def legacy_clean_text(text: str) -> str:
+    """The original cleaning passes, kept for comparison."""
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('|', 'I')
+    text = re.sub(r'Page \d+ of \d+', '', text)
+    text = re.sub(r'\.(?=[A-Z])', '. ', text)
+    return text.strip()
+
+
+def make_raw_text(megabytes: float, seed: int = 0) -> str:
+    """
+    Build extracted-looking text of roughly the given size, with the OCR
+    noise the cleaner handles: ragged whitespace, "|" for "I", page footers
+    and missing spaces after periods.
+    """
+    rng = random.Random(seed)
+    page_texts = make_document_text(50) + make_document_text(50, "prescription")
+    noise = ["\n", "  ", "\t", " \n ", "|", ".Next", "Page 3 of 9", "\n\n"]
+    pages = []
+    size = 0
+    page_num = 0
+    while size < megabytes * 1024 * 1024:
+        page_num += 1
+        words = page_texts[page_num % len(page_texts)].split(" ")
+        for _ in range(len(words) // 10):
+            index = rng.randrange(len(words))
+            words[index] += rng.choice(noise)
+        page = f"--- Page {page_num} ---\n" + " ".join(words)
+        pages.append(page)
+        size += len(page) + 2
+    return "\n\n".join(pages)
+
+
+def measure(clean, text: str, repeat: int):
+    """Return (seconds per call, peak MB allocated during one call)."""
+    clean(text)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        clean(text)
+    seconds = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    clean(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cleaner = TextCleaner()
+    print(f"{'MB':>5} {'legacy ms':>10} {'new ms':>10} {'speedup':>8} {'legacy peak MB':>15} {'new peak MB':>15}")
+    for megabytes in args.mb:
+        text = make_raw_text(megabytes)
+        if cleaner.clean(text) != legacy_clean_text(text):
+            raise SystemExit(f"Output differs from the legacy cleaner at {megabytes} MB")
+
+        legacy_time, legacy_peak = measure(legacy_clean_text, text, args.repeat)
+        new_time, new_peak = measure(cleaner.clean, text, args.repeat)
+        print(
+            f"{megabytes:>5g} {legacy_time * 1000:>10.1f} {new_time * 1000:>10.1f} "
+            f"{legacy_time / new_time:>7.2f}x {legacy_peak:>15.1f} {new_peak:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
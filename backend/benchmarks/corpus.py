@@ -0,0 +1,96 @@
+"""Generated documents shared by the benchmarks."""
+import fitz  # PyMuPDF
+
+LAB_LINES = [
+    "Hemoglobin 14.2 g/dL Reference range 13.5-18.0",
+    "Total WBC Count 8,200 cells/cmm Reference range 4,500-11,000",
+    "Platelet Count 250,000 /cmm Reference range 150,000-450,000",
+    "Blood Sugar (Fasting) 110 mg/dL Normal range 70-110",
+    "Total Cholesterol 180 mg/dL Desirable less than 200",
+    "Triglycerides 160 mg/dL Normal range less than 150",
+    "Creatinine 0.9 mg/dL Reference range 0.6-1.2",
+    "Urinalysis: Specimen clear, pH 6.0",
+]
+
+PRESCRIPTION_LINES = [
+    "Rx: Amoxicillin 500mg capsule",
+    "Sig: take one capsule by mouth three times daily",
+    "Dispense: 30 capsules Refills: 0",
+    "Rx: Lisinopril 10mg tablet",
+    "Sig: take one tablet daily in the morning",
+    "Dispense: 90 tablets Refills: 3",
+    "Prescriber: Dr. A. Smith  Pharmacy: Main Street Pharmacy",
+]
+
+
+def make_document_text(pages: int, doc_type: str = "lab_results", specimen: str = "") -> list:
+    """
+    Build the text of each page of a synthetic medical document.
+
+    Args:
+        pages: Number of pages
+        doc_type: 'lab_results' or 'prescription'
+        specimen: Optional specimen ID printed on each page, to make
+            otherwise identical documents distinct
+
+    Returns:
+        List of page texts
+    """
+    lines = LAB_LINES if doc_type == "lab_results" else PRESCRIPTION_LINES
+    title = "LABORATORY TEST RESULTS" if doc_type == "lab_results" else "PRESCRIPTION"
+    page_texts = []
+    for page_num in range(pages):
+        body = "\n".join(lines[(page_num + i) % len(lines)] for i in range(40))
+        header = f"{title}\nPatient Name: Jane Doe   Date: 01/15/2024"
+        if specimen:
+            header += f"   Specimen ID: {specimen}"
+        page_texts.append(f"{header}\n{body}\nPage {page_num + 1} of {pages}")
+    return page_texts
+
+
+def make_pdf(pages: int, doc_type: str = "lab_results", specimen: str = "") -> bytes:
+    """
+    Build a synthetic PDF.
+
+    Args:
+        pages: Number of pages
+        doc_type: 'lab_results' or 'prescription'
+        specimen: Optional specimen ID printed on each page
+
+    Returns:
+        The PDF content
+    """
+    pdf_document = fitz.open()
+    for text in make_document_text(pages, doc_type, specimen):
+        page = pdf_document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), text, fontsize=9)
+    content = pdf_document.tobytes()
+    pdf_document.close()
+    return content
+
+
+def make_corpus(sizes=(1, 10, 100), doc_types=("lab_results", "prescription"), copies: int = 1) -> list:
+    """
+    Build synthetic PDFs of each size and document type.
+
+    Copies differ in their specimen ID, so no two documents in the corpus
+    are served from the translation cache or share a translation.
+
+    Args:
+        sizes: Page counts
+        doc_types: Document types
+        copies: Documents of each size and type
+
+    Returns:
+        List of (name, pages, doc_type, PDF content), e.g. ("lab_results-10p-1.pdf", 10, ...),
+        cycling through the sizes and types
+    """
+    return [
+        (
+            f"{doc_type}-{pages}p-{copy}.pdf", pages, doc_type,
+            make_pdf(pages, doc_type, specimen=f"S{copy:05d}" if copies > 1 else "")
+        )
+        for copy in range(copies)
+        for pages in sizes
+        for doc_type in doc_types
+    ]
@@ -0,0 +1,366 @@
+"""
+Measure the whole service under load, against the local fake OpenAI
+server instead of the real API.
+
+Starts the fake server (benchmarks.fake_openai) with the given latency,
+token pace and share of 429s, and the API (uvicorn app.main:app) pointed
+at it with the translation cache off. Then it uploads a generated corpus
+of 1, 10 and 100 page lab reports and prescriptions, --concurrency at a
+time. Each job goes through POST /upload, polls GET /status until done,
+then GET /result.
+
+Reports p50/p95/p99 job latency (upload to result) per document and
+overall, jobs/sec, CPU seconds per job and peak RSS of the API process and
+its extraction processes (read from /proc, so Linux only). Settings in the
+environment (JOB_WORKER_CONCURRENCY, PDF_EXTRACTION_WORKERS, ...) are
+passed on to the API. --output saves the report as JSON for comparing
+runs.
+
+Usage (from backend/):
+    python -m benchmarks.end_to_end [--jobs 60] [--concurrency 8] [--sizes 1 10 100]
+        [--latency 0.3] [--tokens-per-second 400] [--rate-limit-rate 0.02] [--output report.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.corpus import make_corpus
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_process(args: List[str], env: Dict, log_path: str) -> subprocess.Popen:
+    """Start a Python module from backend/, logging its output to a file."""
+    with open(log_path, "wb") as log:
+        return subprocess.Popen(
+            [sys.executable, "-m"] + args, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen, log_path: str, timeout: float = 60.0) -> None:
+    """Poll a URL until it answers, failing if the process exits first."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    with open(log_path, errors="replace") as log:
+        raise SystemExit(f"{url} did not come up; log:\n{log.read()[-3000:]}")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+class ProcessTreeSampler:
+    """
+    Samples the CPU time and memory of a process and its descendants from
+    /proc.
+
+    CPU time is counted from start() for processes already running, and in
+    full for ones started later (e.g. extraction processes). Peak RSS is the
+    largest total over all samples.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        self.pid = pid
+        self.interval = interval
+        self.available = os.path.exists(f"/proc/{pid}/stat")
+        self.peak_rss = 0
+        self._ticks_per_second = os.sysconf("SC_CLK_TCK") if self.available else 1
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if self.available else 1
+        self._baseline: Dict[int, int] = {}
+        self._last: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _read_tree(self) -> Dict[int, Tuple[int, int]]:
+        """Return pid -> (CPU ticks, RSS bytes) for the process and its descendants."""
+        parents, usage = {}, {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # Fields after the parenthesized command name, starting with state
+                    fields = f.read().rsplit(")", 1)[1].split()
+                with open(f"/proc/{entry}/statm") as f:
+                    rss_pages = int(f.read().split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            pid = int(entry)
+            parents[pid] = int(fields[1])
+            usage[pid] = (int(fields[11]) + int(fields[12]), rss_pages * self._page_size)
+
+        tree = {self.pid}
+        grew = True
+        while grew:
+            children = {pid for pid, parent in parents.items() if parent in tree} - tree
+            tree |= children
+            grew = bool(children)
+        return {pid: usage[pid] for pid in tree if pid in usage}
+
+    def sample(self) -> None:
+        tree = self._read_tree()
+        for pid, (ticks, _) in tree.items():
+            self._last[pid] = ticks
+        self.peak_rss = max(self.peak_rss, sum(rss for _, rss in tree.values()))
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if not self.available:
+            return
+        self._baseline = {pid: ticks for pid, (ticks, _) in self._read_tree().items()}
+        self.peak_rss = 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Tuple[Optional[float], Optional[int]]:
+        """
+        Stop sampling.
+
+        Returns:
+            Tuple of (CPU seconds used since start, peak RSS in bytes), or
+            Nones without /proc
+        """
+        if not self._task:
+            return None, None
+        self._task.cancel()
+        self.sample()
+        ticks = sum(last - self._baseline.get(pid, 0) for pid, last in self._last.items())
+        return ticks / self._ticks_per_second, self.peak_rss
+
+
+async def run_job(client: httpx.AsyncClient, document: Tuple, poll_interval: float) -> Dict:
+    """
+    Upload a document and wait for its result.
+
+    Returns:
+        The job's outcome: status, latency in seconds, document details and
+        uploads turned away by the queue (429/503) before one was accepted
+    """
+    name, pages, doc_type, content = document
+    start = time.perf_counter()
+    rejected = 0
+    while True:
+        response = await client.post("/api/v1/translate/upload", files={"file": (name, content, "application/pdf")})
+        if response.status_code not in (429, 503):
+            break
+        rejected += 1
+        await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+    outcome = {"pages": pages, "doc_type": doc_type, "rejected": rejected}
+    if response.status_code != 200:
+        return {**outcome, "status": f"upload {response.status_code}", "latency": time.perf_counter() - start}
+
+    job_id = response.json()["job_id"]
+    while True:
+        status = (await client.get(f"/api/v1/translate/status/{job_id}")).json()
+        if status["status"] in ("completed", "failed"):
+            break
+        await asyncio.sleep(poll_interval)
+    if status["status"] == "completed":
+        result = await client.get(f"/api/v1/translate/result/{job_id}")
+        status["status"] = "completed" if result.status_code == 200 else f"result {result.status_code}"
+    return {**outcome, "status": status["status"], "latency": time.perf_counter() - start}
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    documents: List[Tuple],
+    jobs: int,
+    concurrency: int,
+    poll_interval: float
+) -> Tuple[List[Dict], float]:
+    """Run jobs through the corpus in order, concurrency at a time."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def limited(index: int) -> Dict:
+        async with slots:
+            return await run_job(client, documents[index % len(documents)], poll_interval)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(index) for index in range(jobs)))
+    return list(results), time.perf_counter() - start
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentile with linear interpolation between the closest ranks."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * fraction
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(results: List[Dict]) -> Dict:
+    latencies = [result["latency"] for result in results if result["status"] == "completed"]
+    summary = {
+        "jobs": len(results),
+        "completed": len(latencies),
+        "rejected_uploads": sum(result["rejected"] for result in results)
+    }
+    if latencies:
+        summary.update({f"p{int(q * 100)}": round(percentile(latencies, q), 4) for q in (0.5, 0.95, 0.99)})
+    return summary
+
+
+def build_report(
+    args,
+    results: List[Dict],
+    seconds: float,
+    cpu: Optional[float],
+    peak_rss: Optional[int],
+    fake_stats: Dict
+) -> Dict:
+    by_document = {}
+    for pages in args.sizes:
+        for doc_type in args.types:
+            group = [result for result in results if result["pages"] == pages and result["doc_type"] == doc_type]
+            if group:
+                by_document[f"{doc_type} {pages}p"] = summarize(group)
+    overall = summarize(results)
+    overall.update({
+        "seconds": round(seconds, 3),
+        "jobs_per_second": round(overall["completed"] / seconds, 3),
+        "cpu_seconds_per_job": round(cpu / len(results), 4) if cpu is not None else None,
+        "peak_rss_mb": round(peak_rss / 1024 / 1024, 1) if peak_rss is not None else None,
+        "failures": sorted({result["status"] for result in results} - {"completed"})
+    })
+    return {"config": vars(args), "overall": overall, "by_document": by_document, "fake_openai": fake_stats}
+
+
+def print_report(report: Dict) -> None:
+    print(f"{'document':<20} {'jobs':>5} {'ok':>5} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8}")
+    rows = list(report["by_document"].items()) + [("all", report["overall"])]
+    for name, summary in rows:
+        print(
+            f"{name:<20} {summary['jobs']:>5} {summary['completed']:>5} "
+            f"{summary.get('p50', float('nan')):>8.3f} {summary.get('p95', float('nan')):>8.3f} "
+            f"{summary.get('p99', float('nan')):>8.3f}"
+        )
+    overall = report["overall"]
+    cpu = f"{overall['cpu_seconds_per_job']:.3f} s" if overall["cpu_seconds_per_job"] is not None else "n/a"
+    rss = f"{overall['peak_rss_mb']:.1f} MB" if overall["peak_rss_mb"] is not None else "n/a"
+    print(
+        f"\n{overall['jobs_per_second']:.2f} jobs/sec over {overall['seconds']:.1f} s, "
+        f"CPU per job {cpu}, peak RSS {rss} (API and extraction processes)"
+    )
+    fake = report["fake_openai"]
+    print(
+        f"fake OpenAI: {fake.get('chat_completions', 0)} completions, {fake.get('rate_limited', 0)} answered 429; "
+        f"uploads turned away: {overall['rejected_uploads']}"
+    )
+    if overall["failures"]:
+        print(f"FAILED jobs: {', '.join(overall['failures'])}")
+
+
+async def run(args) -> Dict:
+    copies = max(1, math.ceil((args.jobs + args.warmup) / (len(args.sizes) * len(args.types))))
+    print(f"Generating {copies * len(args.sizes) * len(args.types)} documents...")
+    documents = make_corpus(args.sizes, args.types, copies)
+
+    log_dir = tempfile.mkdtemp(prefix="e2e-bench-")
+    fake_port, api_port = free_port(), free_port()
+    fake_log, api_log = os.path.join(log_dir, "fake_openai.log"), os.path.join(log_dir, "api.log")
+    fake = start_process([
+        "benchmarks.fake_openai", "--port", str(fake_port),
+        "--latency", str(args.latency), "--tokens-per-second", str(args.tokens_per_second),
+        "--rate-limit-rate", str(args.rate_limit_rate), "--retry-after", str(args.retry_after),
+        "--seed", str(args.seed)
+    ], dict(os.environ), fake_log)
+
+    env = dict(os.environ)
+    env.update(
+        OPENAI_API_KEY="fake",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{fake_port}/v1",
+        TRANSLATION_CACHE_TIERS=""
+    )
+    # Defaults that can be overridden from the environment
+    for name, value in (("OPENAI_MODEL", "fake-model"), ("RATE_LIMIT_PER_MINUTE", "0"), ("JOB_QUEUE_MAX_DEPTH", "10000")):
+        env.setdefault(name, value)
+    api = start_process([
+        "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(api_port),
+        "--log-level", "warning", "--no-access-log"
+    ], env, api_log)
+
+    try:
+        await wait_until_ready(f"http://127.0.0.1:{fake_port}/stats", fake, fake_log)
+        await wait_until_ready(f"http://127.0.0.1:{api_port}/api/v1/translate/health", api, api_log)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", timeout=120) as client:
+            if args.warmup:
+                # Starts the extraction processes and opens connections
+                print(f"Warming up with {args.warmup} jobs...")
+                await run_load(client, documents[-args.warmup:], args.warmup, args.concurrency, args.poll_interval)
+            sampler = ProcessTreeSampler(api.pid)
+            sampler.start()
+            print(f"Running {args.jobs} jobs, {args.concurrency} at a time...")
+            results, seconds = await run_load(client, documents, args.jobs, args.concurrency, args.poll_interval)
+            cpu, peak_rss = await sampler.stop()
+        async with httpx.AsyncClient() as client:
+            fake_stats = (await client.get(f"http://127.0.0.1:{fake_port}/stats")).json()
+    finally:
+        stop_process(api)
+        stop_process(fake)
+
+    report = build_report(args, results, seconds, cpu, peak_rss, fake_stats)
+    print_report(report)
+    print(f"Server logs: {log_dir}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=60, help="measured jobs")
+    parser.add_argument("--concurrency", type=int, default=8, help="jobs in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured jobs run first")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100], help="document page counts")
+    parser.add_argument(
+        "--types", nargs="+", default=["lab_results", "prescription"], choices=["lab_results", "prescription"]
+    )
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="seconds between status checks")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake API seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="fake API token pace (0 = unlimited)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of fake API requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of the 429s, in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed choosing the 429s")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["overall"]["failures"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
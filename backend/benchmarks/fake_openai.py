@@ -0,0 +1,309 @@
+"""
+Local stand-in for the OpenAI API, for testing and benchmarking without an
+API key or network access.
+
+Serves chat completions (streamed or not) with a canned translation in the
+section format the prompts ask for, or as JSON matching the schema when a
+json_schema response_format is given, model lookups (used to warm up
+connections), plus the Files and Batch endpoints used for deferred
+translations. Batches complete after --batch-delay seconds.
+
+Chat completions can be made to behave like the real API under load: each
+waits --latency seconds before its first token, then produces
+--tokens-per-second tokens (one word each), and a --rate-limit-rate share
+of them is answered with a 429 and a Retry-After of --retry-after seconds.
+GET /stats reports the requests served and rejected.
+
+Usage (from backend/):
+    python -m benchmarks.fake_openai [--port 8100] [--batch-delay 5]
+        [--latency 0.5] [--tokens-per-second 100] [--rate-limit-rate 0.05]
+
+Then point the backend at it:
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.ai_translator import SECTION_HEADERS
+
+
+def canned_translation(body: Dict) -> str:
+    """Build a translation with the section headers for the prompt's document type."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(schema_example(schema, schema.get("$defs", {})))
+    messages = body.get("messages", [])
+    system_prompt = messages[0]["content"].lower() if messages else ""
+    doc_type = "prescription" if "prescription" in system_prompt or "medication" in system_prompt else "lab_results"
+    return "\n\n".join(
+        f"## {header}\nThis is a placeholder explanation for this section."
+        for header in SECTION_HEADERS[doc_type]
+    )
+
+
+def schema_example(schema: Dict, definitions: Dict):
+    """Build a value matching a JSON schema, using the first value of each enum."""
+    if "$ref" in schema:
+        return schema_example(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("type") == "object":
+        return {
+            name: schema_example(field, definitions)
+            for name, field in schema.get("properties", {}).items()
+        }
+    if schema.get("type") == "array":
+        return [schema_example(schema.get("items", {}), definitions) for _ in range(3)]
+    return "This is a placeholder explanation for this field."
+
+
+def chat_completion(body: Dict) -> Dict:
+    """Build a non-streamed chat completion response."""
+    content = canned_translation(body)
+    prompt_tokens = sum(len(message.get("content", "").split()) for message in body.get("messages", []))
+    completion_tokens = len(content.split())
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+async def stream_chunks(body: Dict, tokens_per_second: float = 0.0) -> AsyncIterator[str]:
+    """
+    Yield a chat completion as server-sent chunks, one word at a time, and
+    a usage chunk if the request's stream_options ask for one.
+
+    Args:
+        body: The chat completion request
+        tokens_per_second: Pace of the words (0 for as fast as possible)
+    """
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    words = canned_translation(body).split(" ")
+    started = time.monotonic()
+    for index, word in enumerate(words):
+        if tokens_per_second > 0:
+            # Sleep only when ahead of the pace, so fast rates don't pay per word
+            ahead = started + index / tokens_per_second - time.monotonic()
+            if ahead > 0.005:
+                await asyncio.sleep(ahead)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "delta": {"content": word if index == len(words) - 1 else word + " "},
+                "finish_reason": None
+            }]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    if (body.get("stream_options") or {}).get("include_usage"):
+        # Like the API: a last chunk without choices, carrying the usage
+        usage = chat_completion(body)["usage"]
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [],
+            "usage": usage
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def create_app(
+    batch_delay: float = 5.0,
+    latency: float = 0.0,
+    tokens_per_second: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    retry_after: float = 1.0,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """
+    Create the fake API.
+
+    Args:
+        batch_delay: Seconds before a submitted batch reports completion
+        latency: Seconds before a chat completion's first token
+        tokens_per_second: Pace of chat completion tokens (0 for as fast as possible)
+        rate_limit_rate: Share of chat completions answered with a 429
+        retry_after: Retry-After of the 429s, in seconds
+        seed: Seed choosing the rejected requests, for reproducible runs
+    """
+    app = FastAPI(title="Fake OpenAI API")
+    files: Dict[str, Dict] = {}
+    batches: Dict[str, Dict] = {}
+    stats = {"chat_completions": 0, "rate_limited": 0, "completion_tokens": 0}
+    rejections = random.Random(seed)
+
+    def store_file(filename: str, content: bytes, purpose: str) -> Dict:
+        file_id = f"file-{uuid.uuid4().hex}"
+        files[file_id] = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+            "content": content
+        }
+        return files[file_id]
+
+    def public(file: Dict) -> Dict:
+        return {key: value for key, value in file.items() if key != "content"}
+
+    def run_batch(batch: Dict) -> None:
+        """Answer every request in the batch input file."""
+        lines = []
+        for line in files[batch["input_file_id"]]["content"].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": chat_completion(request["body"])
+                },
+                "error": None
+            }))
+        output = store_file("batch_output.jsonl", "\n".join(lines).encode("utf-8"), "batch_output")
+        batch.update(
+            status="completed",
+            output_file_id=output["id"],
+            completed_at=int(time.time()),
+            request_counts={"total": len(lines), "completed": len(lines), "failed": 0}
+        )
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        if rate_limit_rate > 0 and rejections.random() < rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(math.ceil(retry_after)), "retry-after-ms": str(int(retry_after * 1000))}
+            )
+        stats["chat_completions"] += 1
+        if latency > 0:
+            await asyncio.sleep(latency)
+        if body.get("stream"):
+            stats["completion_tokens"] += len(canned_translation(body).split(" "))
+            return StreamingResponse(stream_chunks(body, tokens_per_second), media_type="text/event-stream")
+        response = chat_completion(body)
+        stats["completion_tokens"] += response["usage"]["completion_tokens"]
+        if tokens_per_second > 0:
+            await asyncio.sleep(response["usage"]["completion_tokens"] / tokens_per_second)
+        return response
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.get("/v1/models/{model}")
+    async def get_model(model: str):
+        return {"id": model, "object": "model", "created": 0, "owned_by": "fake"}
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        return public(store_file(file.filename, await file.read(), purpose))
+
+    @app.get("/v1/files/{file_id}/content")
+    async def file_content(file_id: str):
+        if file_id not in files:
+            raise HTTPException(status_code=404, detail="No such file")
+        return Response(files[file_id]["content"], media_type="application/octet-stream")
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        if body.get("input_file_id") not in files:
+            raise HTTPException(status_code=400, detail="No such input file")
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window"),
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "completed_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}
+        }
+        return batches[batch_id]
+
+    @app.get("/v1/batches/{batch_id}")
+    async def get_batch(batch_id: str):
+        batch = batches.get(batch_id)
+        if batch is None:
+            raise HTTPException(status_code=404, detail="No such batch")
+        if batch["status"] != "completed":
+            if time.time() - batch["created_at"] >= batch_delay:
+                run_batch(batch)
+            else:
+                batch["status"] = "in_progress"
+        return batch
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--batch-delay", type=float, default=5.0, help="Seconds until a batch completes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before a completion's first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Completion token pace (0 = unlimited)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of completions answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of the 429s, in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="Seed choosing the rejected requests")
+    args = parser.parse_args()
+
+    app = create_app(
+        batch_delay=args.batch_delay,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
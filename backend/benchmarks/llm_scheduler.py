@@ -0,0 +1,221 @@
+"""
+Drive the LLM request scheduler against a scripted in-process mock of the
+chat completions API, and check how it behaves.
+
+Scenarios:
+    priority   one slot, bulk documents queued first, then interactive ones;
+               interactive requests must be sent before the queued bulk ones
+    rate-limit the server allows --server-limit requests per --window
+               seconds and answers 429 with Retry-After beyond that; compares
+               a scheduler with a request bucket just under the server's
+               limit (no 429s) and one without (all 429s retried)
+    errors     every request fails with a 503 the first time; all must
+               succeed on retry
+    coalesce   identical documents translated at the same time must share
+               one request
+
+Each scenario reports the requests the server saw, 429s, retries and the
+time taken, and the script exits with an error if a check fails.
+
+Usage (from backend/):
+    python -m benchmarks.llm_scheduler [--documents 20] [--latency 0.02] [--server-limit 20] [--window 1]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.services.ai_translator import SECTION_HEADERS, AITranslator
+from app.services.llm_scheduler import LLMScheduler, TokenBucket
+
+TRANSLATION = "\n\n".join(
+    f"## {header}\nThis is a placeholder explanation for this section."
+    for header in SECTION_HEADERS['lab_results']
+)
+
+
+class MockServer:
+    """
+    Chat completions endpoint with a fixed latency, an optional rate limit
+    (refilled continuously, like the API's) and optional scripted failures.
+    """
+
+    def __init__(self, latency: float, limit: int = 0, window: float = 60.0, fail_first_with: Optional[int] = None):
+        self.latency = latency
+        self.limit = TokenBucket(limit, window) if limit else None
+        self.fail_first_with = fail_first_with
+        self.order: List[str] = []
+        self.rejected = 0
+        self.failed = 0
+        self._seen = set()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        prompt = body["messages"][-1]["content"]
+
+        if self.limit:
+            wait = self.limit.delay(1)
+            if wait > 0:
+                self.rejected += 1
+                return httpx.Response(
+                    429,
+                    json={"error": {"message": "Rate limit reached", "type": "requests"}},
+                    headers={"retry-after-ms": str(int(wait * 1000) + 1)}
+                )
+            self.limit.take(1)
+        if self.fail_first_with and prompt not in self._seen:
+            self._seen.add(prompt)
+            self.failed += 1
+            return httpx.Response(self.fail_first_with, json={"error": {"message": "Try again"}})
+
+        self.order.append(prompt)
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": TRANSLATION},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+        })
+
+
+def make_translator(server: MockServer, scheduler: LLMScheduler) -> AITranslator:
+    """A translator sending its requests to the mock server, without a cache."""
+    translator = AITranslator()
+    translator.model = "mock"
+    translator.cache = None
+    translator.http_client = httpx.AsyncClient(transport=httpx.MockTransport(server.handle))
+    translator.client = AsyncOpenAI(
+        api_key="mock", base_url="http://mock/v1", http_client=translator.http_client, max_retries=0
+    )
+    translator.scheduler = scheduler
+    return translator
+
+
+async def translate_all(translator: AITranslator, documents: List[tuple]) -> List[Dict]:
+    """Translate (text, priority, start delay) documents concurrently."""
+    async def translate(text: str, priority: str, delay: float) -> Dict:
+        await asyncio.sleep(delay)
+        return await translator.translate_document(text, 'lab_results', priority=priority)
+
+    return await asyncio.gather(*(translate(*document) for document in documents))
+
+
+def report(name: str, server: MockServer, scheduler: LLMScheduler, results: List[Dict], seconds: float) -> None:
+    succeeded = sum(1 for result in results if result["success"])
+    print(
+        f"{name:<26} {len(results):>5} {succeeded:>5} {len(server.order):>8} {server.rejected:>5} "
+        f"{scheduler.stats['retries']:>7} {scheduler.stats['coalesced']:>9} {seconds:>8.2f}"
+    )
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+
+
+async def priority_scenario(args) -> None:
+    server = MockServer(args.latency)
+    scheduler = LLMScheduler(max_concurrent=1)
+    translator = make_translator(server, scheduler)
+    bulk = [(f"bulk document {index}", "bulk", 0) for index in range(args.documents)]
+    # Interactive documents arrive while the first bulk request is in flight
+    interactive = [
+        (f"interactive document {index}", "interactive", args.latency / 2) for index in range(args.documents)
+    ]
+    start = time.perf_counter()
+    results = await translate_all(translator, bulk + interactive)
+    report("priority", server, scheduler, results, time.perf_counter() - start)
+
+    check(all(result["success"] for result in results), "every document is translated")
+    check(
+        all("interactive document" in prompt for prompt in server.order[1:args.documents + 1]),
+        "interactive requests are sent before the queued bulk requests"
+    )
+
+
+async def rate_limit_scenario(args) -> None:
+    # Three windows' worth of documents, so most of them wait for the limit
+    documents = [(f"document {index}", "interactive", 0) for index in range(args.server_limit * 3)]
+    # Requests reach the server a little after the scheduler admits them, so
+    # a bucket exactly at the server's limit can still run ahead of it
+    bucket_limit = max(1, int(args.server_limit * 0.9))
+    for name, limit in (("rate limit, bucket", bucket_limit), ("rate limit, retries only", 0)):
+        server = MockServer(args.latency, limit=args.server_limit, window=args.window)
+        scheduler = LLMScheduler(
+            max_concurrent=8, request_limit=limit, window=args.window,
+            retry_base_delay=args.window / 10, max_retries=20, seed=0
+        )
+        translator = make_translator(server, scheduler)
+        start = time.perf_counter()
+        results = await translate_all(translator, documents)
+        report(name, server, scheduler, results, time.perf_counter() - start)
+        check(all(result["success"] for result in results), f"{name}: every document is translated")
+        if limit:
+            check(server.rejected == 0, f"{name}: no requests are rejected")
+        else:
+            check(scheduler.stats["rate_limited"] == server.rejected, f"{name}: every 429 is retried")
+
+
+async def error_scenario(args) -> None:
+    server = MockServer(args.latency, fail_first_with=503)
+    scheduler = LLMScheduler(max_concurrent=8, retry_base_delay=0.01, seed=0)
+    translator = make_translator(server, scheduler)
+    start = time.perf_counter()
+    results = await translate_all(
+        translator, [(f"document {index}", "interactive", 0) for index in range(args.documents)]
+    )
+    report("errors (503 once)", server, scheduler, results, time.perf_counter() - start)
+    check(all(result["success"] for result in results), "every document is translated after a retry")
+    check(scheduler.stats["retries"] == args.documents, "each document is retried once")
+
+
+async def coalesce_scenario(args) -> None:
+    server = MockServer(args.latency)
+    scheduler = LLMScheduler(max_concurrent=8)
+    translator = make_translator(server, scheduler)
+    start = time.perf_counter()
+    results = await translate_all(translator, [("the same document", "interactive", 0)] * args.documents)
+    report("coalesce", server, scheduler, results, time.perf_counter() - start)
+    check(len(server.order) == 1, "identical documents share one request")
+    check(
+        all(result["translation"] == results[0]["translation"] for result in results),
+        "every caller gets the translation"
+    )
+
+
+SCENARIOS = {
+    "priority": priority_scenario,
+    "rate-limit": rate_limit_scenario,
+    "errors": error_scenario,
+    "coalesce": coalesce_scenario,
+}
+
+
+async def run(args) -> None:
+    print(f"{'scenario':<26} {'docs':>5} {'ok':>5} {'requests':>8} {'429s':>5} {'retries':>7} {'coalesced':>9} {'seconds':>8}")
+    for name in args.scenarios:
+        await SCENARIOS[name](args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per mock response")
+    parser.add_argument("--server-limit", type=int, default=20, help="requests the mock server allows per window")
+    parser.add_argument("--window", type=float, default=1.0, help="rate limit window in seconds (60 for the API)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
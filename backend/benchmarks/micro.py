@@ -0,0 +1,292 @@
+"""
+Microbenchmarks of the CPU-bound hot paths of PDFProcessor and
+AITranslator, on fixtures of realistic sizes.
+
+Works like pytest-benchmark: each benchmark is calibrated to run enough
+iterations per round to time reliably, runs for at least --max-time
+seconds (and --min-rounds rounds), and reports min/median/mean/stddev per
+call. --save stores the results as a baseline; later runs are compared
+with it and exit with an error when a benchmark's median is more than
+--fail-threshold slower. Baselines depend on the machine, so save one
+before making a change and compare on the same machine after.
+
+--profile writes a profile of each selected benchmark, run on the same
+fixtures: cProfile stats (.prof, for snakeviz or flameprof) or, with
+pyinstrument installed, an HTML flame view.
+
+Usage (from backend/):
+    python -m benchmarks.micro --save                # record a baseline
+    python -m benchmarks.micro                       # compare with it
+    python -m benchmarks.micro -k clean_text --profile cprofile
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.services.pdf_processor import PDFProcessor
+from benchmarks.clean_text import make_raw_text
+from benchmarks.corpus import make_document_text, make_pdf
+from benchmarks.section_parser import make_translation
+from benchmarks.structured_output import make_translator
+from benchmarks.test_blocks import make_panel
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".benchmarks")
+
+
+def build_benchmarks() -> Dict[str, Callable[[], object]]:
+    """
+    Build the fixtures and the calls to time on them.
+
+    Returns:
+        Benchmark name -> function making one call
+    """
+    processor = PDFProcessor()
+    translator = make_translator("markdown")
+    benchmarks = {}
+
+    for pages in (1, 10, 100):
+        pdf = make_pdf(pages)
+        benchmarks[f"extract_text_from_pdf[{pages}p]"] = lambda pdf=pdf: processor.extract_text_from_pdf(pdf)
+
+    for label, megabytes in (("100KB", 0.1), ("1MB", 1.0)):
+        raw = make_raw_text(megabytes)
+        benchmarks[f"clean_text[{label}]"] = lambda raw=raw: processor._clean_text(raw)
+
+    documents = [
+        (f"{doc_type}-{pages}p", doc_type, processor._clean_text("\n\n".join(
+            f"--- Page {page_num} ---\n{page}"
+            for page_num, page in enumerate(make_document_text(pages, doc_type), start=1)
+        )))
+        for pages, doc_type in ((10, "lab_results"), (100, "prescription"))
+    ]
+    for label, doc_type, text in documents:
+        benchmarks[f"identify_document_type[{label}]"] = lambda text=text: processor.identify_document_type(text)
+    for label, doc_type, text in documents:
+        benchmarks[f"extract_structured_data[{label}]"] = (
+            lambda text=text, doc_type=doc_type: processor.extract_structured_data(text, doc_type)
+        )
+
+    for label, kilobytes in (("4KB", 4), ("32KB", 32)):
+        translation = make_translation(kilobytes, "lab_results")
+        benchmarks[f"parse_translation_sections[{label}]"] = (
+            lambda translation=translation: translator._parse_translation_sections(translation, "lab_results")
+        )
+
+    for tests in (10, 100):
+        panel = make_panel(tests)
+        benchmarks[f"extract_test_data_from_markdown[{tests} tests]"] = (
+            lambda panel=panel: translator._extract_test_data_from_markdown(panel)
+        )
+
+    return benchmarks
+
+
+def run_benchmark(function: Callable[[], object], max_time: float, min_rounds: int, round_time: float) -> Dict:
+    """
+    Time a function the way pytest-benchmark does.
+
+    Args:
+        function: Makes one call
+        max_time: Seconds to keep running rounds for
+        min_rounds: Rounds to run even if that takes longer
+        round_time: Seconds one round should at least take; fast calls are
+            repeated within a round so the timer's resolution doesn't matter
+
+    Returns:
+        Per-call statistics in seconds, with the rounds and iterations run
+    """
+    function()  # warm-up
+
+    # Calibrate: double the iterations until a round takes long enough
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        if time.perf_counter() - start >= round_time:
+            break
+        iterations *= 2
+
+    timings = []
+    deadline = time.perf_counter() + max_time
+    while len(timings) < min_rounds or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": len(timings),
+        "iterations": iterations
+    }
+
+
+def profile_benchmark(name: str, function: Callable[[], object], profiler: str, directory: str, seconds: float) -> str:
+    """
+    Profile repeated calls for about the given time.
+
+    Returns:
+        Path of the written profile
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = "".join(char if char.isalnum() or char in "-_" else "_" for char in name).strip("_")
+    deadline = time.perf_counter() + seconds
+
+    def calls() -> None:
+        function()
+        while time.perf_counter() < deadline:
+            function()
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed: pip install pyinstrument")
+        profile = Profiler(interval=0.0005)
+        profile.start()
+        calls()
+        profile.stop()
+        path = os.path.join(directory, f"{filename}.html")
+        with open(path, "w") as f:
+            f.write(profile.output_html())
+        return path
+
+    profile = cProfile.Profile()
+    profile.runcall(calls)
+    path = os.path.join(directory, f"{filename}.prof")
+    profile.dump_stats(path)
+    print(f"\n{name}")
+    pstats.Stats(profile).sort_stats("cumulative").print_stats(12)
+    return path
+
+
+def machine_info() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "saved_at": datetime.now().isoformat(timespec="seconds")
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def compare(results: Dict[str, Dict], baseline: Optional[Dict], stat: str, threshold: float) -> List[str]:
+    """
+    Print the results, against the baseline if there is one.
+
+    Returns:
+        Names of the benchmarks that regressed past the threshold
+    """
+    regressions = []
+    header = f"{'benchmark':<48} {'min':>11} {'median':>11} {'mean':>11} {'stddev':>11} {'rounds':>7}"
+    print(header + (f" {'vs baseline':>12}" if baseline else ""))
+    for name, result in results.items():
+        line = (
+            f"{name:<48} {format_time(result['min']):>11} {format_time(result['median']):>11} "
+            f"{format_time(result['mean']):>11} {format_time(result['stddev']):>11} {result['rounds']:>7}"
+        )
+        previous = (baseline or {}).get("benchmarks", {}).get(name)
+        if previous:
+            change = result[stat] / previous[stat] - 1
+            line += f" {change:>+11.1%}"
+            if change > threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        elif baseline:
+            line += f" {'new':>12}"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="select", help="only run benchmarks whose name contains this")
+    parser.add_argument("--max-time", type=float, default=1.0, help="seconds to run each benchmark for")
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--round-time", type=float, default=0.005, help="minimum seconds per round")
+    parser.add_argument(
+        "--baseline", default=os.path.join(BENCHMARK_DIR, "micro.json"), help="baseline file to compare with or save to"
+    )
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--compare-stat", choices=["min", "median", "mean"], default="median")
+    parser.add_argument(
+        "--fail-threshold", type=float, default=0.2, help="fail when this much slower than the baseline (0.2 = 20%%)"
+    )
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="write a profile of each benchmark")
+    parser.add_argument("--profile-dir", default=os.path.join(BENCHMARK_DIR, "profiles"))
+    parser.add_argument("--profile-time", type=float, default=2.0, help="seconds to profile each benchmark for")
+    args = parser.parse_args()
+
+    benchmarks = {
+        name: function for name, function in build_benchmarks().items()
+        if not args.select or args.select in name
+    }
+    if not benchmarks:
+        raise SystemExit(f"No benchmark matches {args.select!r}")
+
+    if args.profile:
+        for name, function in benchmarks.items():
+            path = profile_benchmark(name, function, args.profile, args.profile_dir, args.profile_time)
+            print(f"Profile written to {path}")
+        return
+
+    results = {
+        name: run_benchmark(function, args.max_time, args.min_rounds, args.round_time)
+        for name, function in benchmarks.items()
+    }
+
+    baseline = None
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing {args.compare_stat} with {args.baseline} ({baseline['machine'].get('commit') or 'no commit'})")
+    regressions = compare(results, baseline, args.compare_stat, args.fail_threshold)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        # Keep baselines of benchmarks not run this time
+        saved = {"benchmarks": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+        saved["machine"] = machine_info()
+        saved["benchmarks"].update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {args.fail_threshold:.0%} slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare PDF extraction throughput when reading uploads from memory versus
+writing them to a temporary file first.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_source [--pages 1 10 50] [--repeat 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.services.pdf_processor import PDFProcessor
+from benchmarks.corpus import make_pdf
+
+
+def run_disk(processor: PDFProcessor, content: bytes, directory: str) -> str:
+    """Write the upload to disk, extract from the file, then delete it."""
+    file_path = os.path.join(directory, "upload.pdf")
+    with open(file_path, "wb") as f:
+        f.write(content)
+    try:
+        return processor.extract_text_from_pdf(file_path)
+    finally:
+        os.remove(file_path)
+
+
+def run_memory(processor: PDFProcessor, content: bytes, directory: str) -> str:
+    """Extract straight from the uploaded bytes."""
+    return processor.extract_text_from_pdf(content)
+
+
+def measure(mode, processor: PDFProcessor, content: bytes, directory: str, repeat: int) -> float:
+    """Return documents per second for one mode."""
+    mode(processor, content, directory)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        mode(processor, content, directory)
+    return repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--dir", default=None, help="Directory for the disk mode (default: system temp)")
+    args = parser.parse_args()
+
+    processor = PDFProcessor()
+    print(f"{'pages':>6} {'size KB':>8} {'disk docs/s':>12} {'memory docs/s':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for pages in args.pages:
+            content = make_pdf(pages)
+            disk = measure(run_disk, processor, content, directory, args.repeat)
+            memory = measure(run_memory, processor, content, directory, args.repeat)
+            print(f"{pages:>6} {len(content) / 1024:>8.0f} {disk:>12.1f} {memory:>14.1f} {memory / disk:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Compare the compiled, single-pass section parser with the original
+line-by-line, header-by-header implementation of
+AITranslator._parse_translation_sections on large translations.
+
+Times parsing a whole translation at once and parsing it as it streams in
+a few characters at a time (the original re-checked every streamed line
+with the same header loop, then parsed the whole text again), and checks
+that both produce identical sections.
+
+Usage (from backend/):
+    python -m benchmarks.section_parser [--kb 16 256 2048] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from app.services.ai_translator import SECTION_HEADERS
+from app.services.section_parser import SectionMatcher, SectionParser
+
+
+def legacy_match_section_header(line: str, section_headers: List[str]) -> Optional[str]:
+    """The original header matching, kept for comparison."""
+    for header in section_headers:
+        if header.lower() in line.lower() and (line.startswith('**') or line.startswith('#') or line.startswith('##')):
+            if "good news" in header.lower():
+                return "good_news"
+            elif "keep an eye on" in header.lower():
+                return "keep_eye_on"
+            elif "should you be worried" in header.lower():
+                return "should_worry"
+            elif "daily life" in header.lower():
+                return "daily_life"
+            elif "next steps" in header.lower():
+                return "next_steps"
+            elif "doctor has prescribed" in header.lower():
+                return "prescribed_medications"
+            elif "what each medicine does" in header.lower():
+                return "medicine_purposes"
+            elif "how to take your medications" in header.lower():
+                return "medication_instructions"
+            elif "what to expect and side effects" in header.lower():
+                return "side_effects"
+            elif "important things to remember" in header.lower():
+                return "important_warnings"
+            elif "questions to ask your pharmacist" in header.lower():
+                return "pharmacist_questions"
+            else:
+                return header.lower().replace(' ', '_').replace(',', '').replace('?', '').replace('...', '')
+    return None
+
+
+def legacy_parse_sections(translation: str, doc_type: str) -> Dict:
+    """The original section parsing, kept for comparison."""
+    sections = {}
+    section_headers = SECTION_HEADERS.get(doc_type)
+    if section_headers is None:
+        return {"full_text": translation}
+    if doc_type == 'lab_results':
+        sections['conversational_format'] = True
+
+    current_section = None
+    current_content = []
+    for line in translation.split('\n'):
+        section_key = legacy_match_section_header(line, section_headers)
+        if section_key:
+            if current_section:
+                sections[current_section] = '\n'.join(current_content).strip()
+            current_section = section_key
+            current_content = []
+        elif current_section:
+            current_content.append(line)
+    if current_section:
+        sections[current_section] = '\n'.join(current_content).strip()
+    if not sections:
+        sections = {"full_text": translation}
+    return sections
+
+
+def legacy_parse_streamed(pieces: List[str], doc_type: str) -> Dict:
+    """The original streaming path: match each completed line, then parse everything again."""
+    section_headers = SECTION_HEADERS.get(doc_type, [])
+    partial_line = ""
+    for piece in pieces:
+        lines = (partial_line + piece).split('\n')
+        partial_line = lines.pop()
+        for line in lines:
+            legacy_match_section_header(line, section_headers)
+    legacy_match_section_header(partial_line, section_headers)
+    return legacy_parse_sections("".join(pieces), doc_type)
+
+
+def parse_sections(parser_for, translation: str) -> Dict:
+    parser = parser_for()
+    parser.feed(translation)
+    parser.finish()
+    return parser.sections()
+
+
+def parse_streamed(parser_for, pieces: List[str]) -> Dict:
+    parser = parser_for()
+    for piece in pieces:
+        parser.feed(piece)
+    parser.finish()
+    return parser.sections()
+
+
+def make_translation(kilobytes: float, doc_type: str, seed: int = 0) -> str:
+    """
+    Build a translation of roughly the given size in the format the prompts
+    ask for: every section header, each followed by paragraphs, bullet
+    lists and bold lines that are not headers.
+    """
+    rng = random.Random(seed)
+    headers = SECTION_HEADERS[doc_type]
+    body_lines = [
+        "Your results look steady compared with last time, which is reassuring.",
+        "- **Hemoglobin:** 14.2 g/dL (normal range 13.5-18.0) - normal",
+        "- Cholesterol is a little above the ideal level of 200 mg/dL.",
+        "**Why this matters:** it helps us understand how your body is doing.",
+        "",
+        "### Blood Sugar (Fasting)",
+        "**Your Value:** 110 mg/dL",
+    ]
+    lines = []
+    size = 0
+    while size < kilobytes * 1024:
+        for header in headers:
+            lines.append(rng.choice(["## ", "# ", "**"]) + header + rng.choice(["", "**", " 😊"]))
+            for _ in range(rng.randrange(5, 40)):
+                lines.append(rng.choice(body_lines))
+        size = sum(len(line) + 1 for line in lines)
+    return "\n".join(lines)
+
+
+def split_stream(text: str, seed: int = 0) -> List[str]:
+    """Cut text into streamed pieces of 1-8 characters, like model tokens."""
+    rng = random.Random(seed)
+    pieces = []
+    position = 0
+    while position < len(text):
+        step = rng.randrange(1, 9)
+        pieces.append(text[position:position + step])
+        position += step
+    return pieces
+
+
+def measure(function, repeat: int) -> float:
+    """Return seconds per call."""
+    function()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--kb", type=float, nargs="+", default=[16, 256, 2048])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'doc type':<13} {'KB':>6} {'mode':<7} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}")
+    for doc_type, headers in SECTION_HEADERS.items():
+        matcher = SectionMatcher(headers)
+
+        def parser_for():
+            return SectionParser(matcher, conversational_format=doc_type == 'lab_results')
+
+        for kilobytes in args.kb:
+            translation = make_translation(kilobytes, doc_type)
+            pieces = split_stream(translation)
+            expected = legacy_parse_sections(translation, doc_type)
+            if parse_sections(parser_for, translation) != expected or parse_streamed(parser_for, pieces) != expected:
+                raise SystemExit(f"Sections differ from the legacy parser for {doc_type} at {kilobytes} KB")
+
+            runs = [
+                ("whole", lambda: legacy_parse_sections(translation, doc_type),
+                 lambda: parse_sections(parser_for, translation)),
+                ("stream", lambda: legacy_parse_streamed(pieces, doc_type),
+                 lambda: parse_streamed(parser_for, pieces)),
+            ]
+            for mode, legacy, new in runs:
+                legacy_time = measure(legacy, args.repeat)
+                new_time = measure(new, args.repeat)
+                print(
+                    f"{doc_type:<13} {kilobytes:>6g} {mode:<7} {legacy_time * 1000:>10.2f} "
+                    f"{new_time * 1000:>10.2f} {legacy_time / new_time:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
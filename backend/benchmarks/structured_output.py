@@ -0,0 +1,98 @@
+"""
+Compare the cost of reading a lab results translation returned as markdown
+(split into sections, then test blocks read with regexes) with the same
+translation returned as JSON and validated against its schema in one pass.
+
+Also reports json.loads alone, to show how much of the JSON time is schema
+validation.
+
+Usage (from backend/):
+    python -m benchmarks.structured_output [--tests 10 100 1000] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+from app.services.ai_translator import SECTION_HEADERS, TEST_FIELDS, AITranslator
+from app.services.field_extractor import FieldExtractor
+from app.services.section_parser import SectionMatcher
+from app.services.structured_output import OUTPUT_FORMATS
+from benchmarks.test_blocks import make_panel
+
+SECTION_TEXT = (
+    "Most of your results look healthy, which is great news.\n"
+    "- Your blood count is right where it should be\n"
+    "- Your kidney function is normal"
+)
+
+
+def make_translations(tests: int):
+    """Build the same translation with the given number of tests as markdown and as JSON."""
+    translator = make_translator("markdown")
+    panel = make_panel(tests)
+    test_data = translator._extract_test_data_from_markdown(panel) or []
+    sections = "\n\n".join(f"## {header}\n{SECTION_TEXT}" for header in SECTION_HEADERS['lab_results'])
+    markdown = f"{sections}\n\n{panel}"
+
+    structured = {key: SECTION_TEXT for key in ("good_news", "keep_eye_on", "should_worry", "daily_life", "next_steps")}
+    structured["tests"] = [{**test, "category": "Other"} for test in test_data]
+    return markdown, json.dumps(structured, ensure_ascii=False)
+
+
+def make_translator(output_format: str) -> AITranslator:
+    """A translator with only the parsing state set up, skipping the API client."""
+    translator = AITranslator.__new__(AITranslator)
+    translator.model = "benchmark"
+    translator.output_format = output_format
+    translator.test_field_extractor = FieldExtractor(TEST_FIELDS.values())
+    translator.section_matchers = {
+        doc_type: SectionMatcher(headers) for doc_type, headers in SECTION_HEADERS.items()
+    }
+    return translator
+
+
+def measure(function, repeat: int) -> float:
+    """Return seconds per call."""
+    function()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tests", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    translators = {output_format: make_translator(output_format) for output_format in OUTPUT_FORMATS}
+
+    def parse_markdown(translation: str):
+        translator = translators["markdown"]
+        return (
+            translator._parse_translation_sections(translation, 'lab_results'),
+            translator._extract_test_data_from_markdown(translation)
+        )
+
+    def parse_json(translation: str):
+        return translators["json"]._build_result('lab_results', translation, {}, {})
+
+    print(f"{'tests':>6} {'chars md':>9} {'chars json':>10} {'markdown ms':>12} {'json ms':>8} {'loads ms':>9} {'speedup':>8}")
+    for tests in args.tests:
+        markdown, structured = make_translations(tests)
+        result = parse_json(structured)
+        if result["output_format"] != "json" or len(result["tests"] or []) != tests:
+            raise SystemExit(f"JSON translation with {tests} tests did not validate")
+
+        markdown_time = measure(lambda: parse_markdown(markdown), args.repeat)
+        json_time = measure(lambda: parse_json(structured), args.repeat)
+        loads_time = measure(lambda: json.loads(structured), args.repeat)
+        print(
+            f"{tests:>6} {len(markdown):>9} {len(structured):>10} {markdown_time * 1000:>12.2f} "
+            f"{json_time * 1000:>8.2f} {loads_time * 1000:>9.2f} {markdown_time / json_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
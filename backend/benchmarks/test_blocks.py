@@ -0,0 +1,159 @@
+"""
+Compare the one-pass test block reader with the original per-field regexes
+of AITranslator._extract_test_data_from_markdown on a lab panel translated
+into markdown test blocks.
+
+Times parsing the whole panel and checks that both produce identical test
+data.
+
+Usage (from backend/):
+    python -m benchmarks.test_blocks [--tests 10 100 1000] [--repeat 20]
+"""
+import argparse
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from app.services.ai_translator import TEST_FIELDS, AITranslator
+from app.services.field_extractor import FieldExtractor
+
+
+class LegacyTestBlockReader:
+    """The original test block parsing, kept for comparison."""
+
+    def __init__(self, categorize_test):
+        self._categorize_test = categorize_test
+
+    def extract(self, translation: str) -> Optional[list]:
+        test_data = []
+        for block in re.split(r'\n---\n', translation):
+            if not block.strip():
+                continue
+            test_name_match = re.search(r'###\s*(.+)', block)
+            if not test_name_match:
+                continue
+            test_name = test_name_match.group(1).strip()
+            test_data.append({
+                "test_name": test_name,
+                "category": self._categorize_test(test_name),
+                "purpose": self._extract_field(block, "Test Name & Purpose"),
+                "your_result": self._extract_field(block, "Your Result"),
+                "normal_range": self._extract_field(block, "Normal Range"),
+                "status": self._extract_status(block),
+                "status_emoji": self._extract_status_emoji(block),
+                "what_this_means": self._extract_field(block, "What This Means"),
+                "health_impact": self._extract_field(block, "Health Impact"),
+                "medical_significance": self._extract_field(block, "Medical Significance")
+            })
+        return test_data if test_data else None
+
+    def _extract_field(self, block: str, field_name: str) -> str:
+        pattern = rf'\*\*{re.escape(field_name)}\*\*:?\s*(.+?)(?=\n\s*-|\n\s*\*\*|\n\s*$|\Z)'
+        match = re.search(pattern, block, re.DOTALL | re.IGNORECASE)
+        if match:
+            return match.group(1).strip()
+        alt_pattern = rf'\*\*{re.escape(field_name)}\*\*\s*(.+?)(?=\n\s*-|\n\s*\*\*|\n\s*$|\Z)'
+        alt_match = re.search(alt_pattern, block, re.DOTALL | re.IGNORECASE)
+        if alt_match:
+            return alt_match.group(1).strip()
+        if field_name == "What This Means":
+            return "This test result provides information about your metabolic health."
+        elif field_name == "Health Impact":
+            return "This measurement helps assess your overall metabolic function."
+        elif field_name == "Medical Significance":
+            return "Doctors use this to evaluate your metabolic health status."
+        return ""
+
+    def _extract_status(self, block: str) -> str:
+        status_text = self._extract_field(block, "Status")
+        if "normal" in status_text.lower():
+            return "normal"
+        elif "high" in status_text.lower():
+            return "high"
+        elif "low" in status_text.lower():
+            return "low"
+        elif "borderline" in status_text.lower():
+            return "borderline"
+        elif "desirable" in status_text.lower():
+            return "desirable"
+        return "normal"
+
+    def _extract_status_emoji(self, block: str) -> str:
+        status_text = self._extract_field(block, "Status")
+        if "🟢" in status_text:
+            return "🟢"
+        elif "🔴" in status_text:
+            return "🔴"
+        elif "🟡" in status_text:
+            return "🟡"
+        return "🟢"
+
+
+TEST_NAMES = [
+    "Hemoglobin", "RBC Count", "Total WBC Count", "Platelet Count", "Blood Sugar (Fasting)",
+    "Total Cholesterol", "HDL Cholesterol", "LDL Cholesterol", "Triglycerides", "Creatinine",
+    "Urea", "Uric Acid", "Calcium", "MCV", "Neutrophils", "Lymphocytes", "TSH", "Vitamin D",
+]
+STATUSES = ["🟢 Normal", "🔴 High", "🔴 Low", "🟡 Borderline", "🟢 Desirable"]
+
+
+def make_panel(tests: int, seed: int = 0) -> str:
+    """
+    Build a translated lab panel with one markdown block per test, with the
+    variations the parser copes with: missing fields, labels without a
+    colon, multi-line values and differently cased labels.
+    """
+    rng = random.Random(seed)
+    blocks = ["## First, the good news about your results\nMost of your results are normal."]
+    for index in range(tests):
+        name = f"{rng.choice(TEST_NAMES)} #{index + 1}"
+        fields = [
+            f"- **Test Name & Purpose**: {name} measures something important in your blood",
+            f"- **Your Result**: {rng.randrange(1, 500)} mg/dL",
+            f"- **Normal Range**: {rng.randrange(1, 50)}-{rng.randrange(100, 500)} mg/dL",
+            f"- **Status**: {rng.choice(STATUSES)}",
+            "- **What This Means**: Your level is where we want it.\n  It has been stable since your last test.",
+            "- **Health Impact** Keeping it here supports your heart and kidneys.",
+            "- **medical significance**: Doctors track it over time.",
+        ]
+        # Some blocks leave out a field the parser falls back to a default for
+        if rng.random() < 0.2:
+            fields.pop(rng.randrange(4, len(fields)))
+        blocks.append(f"### {name}\n" + "\n".join(fields))
+    return "\n---\n".join(blocks) + "\n"
+
+
+def measure(function, repeat: int) -> float:
+    """Return seconds per call."""
+    function()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tests", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Only the parsing methods are used, so skip the API client setup
+    translator = AITranslator.__new__(AITranslator)
+    translator.test_field_extractor = FieldExtractor(TEST_FIELDS.values())
+    legacy = LegacyTestBlockReader(translator._categorize_test)
+
+    print(f"{'tests':>6} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}")
+    for tests in args.tests:
+        panel = make_panel(tests)
+        if translator._extract_test_data_from_markdown(panel) != legacy.extract(panel):
+            raise SystemExit(f"Test data differs from the legacy parser with {tests} tests")
+
+        legacy_time = measure(lambda: legacy.extract(panel), args.repeat)
+        new_time = measure(lambda: translator._extract_test_data_from_markdown(panel), args.repeat)
+        print(f"{tests:>6} {legacy_time * 1000:>10.2f} {new_time * 1000:>10.2f} {legacy_time / new_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+import pytest
+
+T = TypeVar("T")
+
+
+class FakeClock:
+    """A clock that only moves when told to, for expiry and backoff tests."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def run(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine to completion in a new event loop."""
+    return asyncio.run(awaitable)
@@ -0,0 +1,112 @@
+import httpx
+import openai
+import pytest
+
+from app.config import settings
+from app.services import ai_translator
+from app.services.ai_translator import AITranslator, _sum_usage
+from benchmarks.fake_openai import create_app
+from tests.conftest import run
+
+MESSAGES = [{"role": "system", "content": "Translate."}, {"role": "user", "content": "Glucose 92 mg/dL"}]
+
+
+@pytest.fixture
+def translator(monkeypatch) -> AITranslator:
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    translator = AITranslator()
+    translator.model = "m"
+    translator.client = openai.AsyncOpenAI(
+        api_key="test",
+        base_url="http://fake-openai/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app())),
+        max_retries=0
+    )
+    return translator
+
+
+def test_streamed_response_reports_the_usage_chunk(translator):
+    deltas = []
+    content, usage = run(translator._complete(MESSAGES, 200, on_delta=deltas.append))
+
+    assert content == "".join(deltas)
+    assert usage["completion_tokens"] == len(content.split())
+    assert usage["total_tokens"] == usage["prompt_tokens"] + usage["completion_tokens"]
+    assert "estimated" not in usage
+
+
+def test_streamed_usage_is_estimated_without_a_usage_chunk(translator, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_STREAM_USAGE", False)
+    content, usage = run(translator._complete(MESSAGES, 200, on_delta=lambda delta: None))
+
+    assert usage == {
+        "prompt_tokens": translator.token_estimator.count_messages(MESSAGES),
+        "completion_tokens": translator.token_estimator.count(content),
+        "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+        "estimated": True
+    }
+
+
+def test_summed_usage_is_estimated_if_any_part_is():
+    exact = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    estimated = {**exact, "estimated": True}
+
+    assert _sum_usage([exact, exact]) == {"prompt_tokens": 20, "completion_tokens": 10, "total_tokens": 30}
+    assert _sum_usage([exact, estimated])["estimated"] is True
+
+
+def test_early_chunks_are_sent_with_the_document_priority(translator, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSLATION_CHUNK_TOKENS", 50)
+    submit = translator.scheduler.submit
+    priorities = []
+
+    async def recording_submit(send, tokens=0, priority="interactive", max_retries=None):
+        priorities.append(priority)
+        return await submit(send, tokens, priority, max_retries)
+
+    monkeypatch.setattr(translator.scheduler, "submit", recording_submit)
+
+    async def scenario():
+        early_chunks = translator.early_chunk_translation("lab_results", 4, "bulk")
+        for page_num in range(1, 5):
+            early_chunks.add_page(f"Glucose {page_num} mg/dL within range. " * 20, page_num)
+        return await early_chunks.finish()
+
+    _, _, chunks = run(scenario())
+    assert chunks > 1
+    assert priorities == ["bulk"] * chunks
+
+
+@pytest.fixture
+def small_context(translator, monkeypatch) -> str:
+    """Leave room for about 600 tokens of notes in the final request; returns a document of several chunks."""
+    system_prompt, user_prompt_template, _ = translator._select_prompts("lab_results")
+    template_tokens = translator._final_prompt_tokens(system_prompt, user_prompt_template, "")
+    monkeypatch.setattr(settings, "MODEL_CONTEXT_TOKENS", template_tokens + settings.MIN_COMPLETION_TOKENS + 600)
+    monkeypatch.setattr(settings, "TRANSLATION_CHUNK_TOKENS", 500)
+    return "\n\n".join(f"Glucose {index} mg/dL (70-99) within the reference range. " * 40 for index in range(10))
+
+
+def test_chunk_notes_too_long_for_the_final_request_are_condensed(translator, small_context, monkeypatch):
+    submit = translator.scheduler.submit
+    requests = []
+
+    async def counting_submit(send, tokens=0, priority="interactive", max_retries=None):
+        requests.append(tokens)
+        return await submit(send, tokens, priority, max_retries)
+
+    monkeypatch.setattr(translator.scheduler, "submit", counting_submit)
+    result = run(translator.translate_document(small_context, "lab_results"))
+
+    assert result["success"], result.get("error")
+    # Every chunk, at least one request condensing their notes, then the translation
+    assert len(requests) > result["chunks"] + 1
+    assert result["token_estimate"]["max_tokens"] >= settings.MIN_COMPLETION_TOKENS
+
+
+def test_chunk_notes_that_cannot_be_condensed_enough_reject_the_document(translator, small_context, monkeypatch):
+    monkeypatch.setattr(ai_translator, "MAX_NOTES_CONDENSING_ROUNDS", 0)
+    result = run(translator.translate_document(small_context, "lab_results"))
+
+    assert not result["success"]
+    assert result["error"].startswith("Document is too long to translate")
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+from app.services.job_store import InMemoryJobStore
+from benchmarks.corpus import make_pdf
+from tests.conftest import run
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    # The routers create their translator on import
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    from app.routers import batch
+    return batch
+
+
+@pytest.fixture
+def job_store(batch, monkeypatch, tmp_path) -> InMemoryJobStore:
+    from app.routers import translate
+    store = InMemoryJobStore()
+    monkeypatch.setattr(translate, "job_store", store)
+    monkeypatch.setattr(batch, "job_store", store)
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+    async def capacity():
+        return 10
+
+    monkeypatch.setattr(batch, "check_queue_capacity", capacity)
+    return store
+
+
+def pdf(name: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(make_pdf(1)), filename=name, headers={"content-type": "application/pdf"})
+
+
+def test_failed_upload_deletes_the_batch_and_the_jobs_already_queued(batch, job_store, monkeypatch):
+    queued = []
+
+    async def enqueue(job_id, document, priority, batch_id=None):
+        if queued:
+            raise ConnectionError("queue unavailable")
+        queued.append((job_id, batch_id))
+
+    monkeypatch.setattr(batch, "enqueue_document", enqueue)
+
+    with pytest.raises(HTTPException) as error:
+        run(batch.upload_batch([pdf("a.pdf"), pdf("b.pdf")], priority="interactive", trace=False))
+
+    assert error.value.status_code == 500
+    [(job_id, batch_id)] = queued
+    assert run(job_store.get(job_id)) is None
+    assert run(job_store.get(batch_id)) is None
+    assert len(job_store._jobs) == 0
+
+
+def test_batch_without_jobs_reports_no_progress(batch, job_store):
+    run(job_store.create("b", {
+        "type": "batch", "status": "uploading", "created_at": "", "completed_at": None,
+        "jobs": [], "rejected": [], "rejected_total": 0
+    }))
+
+    status = run(batch.get_batch_status("b"))
+    assert (status["progress"], status["total"]) == (0, 0)
@@ -0,0 +1,208 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.config import settings
+from app.services.ai_translator import AITranslator
+from app.services.deferred_translator import MAX_RESULT_READ_ATTEMPTS, DeferredTranslator, RedisDeferredBatchStore
+from app.services.fake_redis import FakeRedis
+from app.services.job_store import RedisJobStore
+from benchmarks.fake_openai import create_app
+from tests.conftest import run
+
+TEXT = "Hemoglobin 13.2 g/dL (13.5-17.5) LOW\nGlucose 92 mg/dL (70-99)"
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+
+
+class Worker:
+    """A deferred translator as one worker process would run it, recording finished jobs."""
+
+    def __init__(self, redis: FakeRedis, openai_app, poll_interval: float = 60.0):
+        self.completed = []
+        self.failed = []
+        self.translator = AITranslator()
+        self.translator.model = "m"
+        self.translator.client = openai.AsyncOpenAI(
+            api_key="test",
+            base_url="http://fake-openai/v1",
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=openai_app)),
+            max_retries=0
+        )
+        self.job_store = RedisJobStore(redis)
+        self.deferred = DeferredTranslator(
+            self.translator, self.job_store, self.complete, self.fail, poll_interval=poll_interval
+        )
+
+    async def complete(self, job_id, result, text_preview):
+        self.completed.append((job_id, result["document_type"], text_preview))
+
+    async def fail(self, job_id, error):
+        self.failed.append((job_id, error))
+
+    async def submit(self, job_id: str) -> None:
+        await self.job_store.create(job_id, {"status": "processing"})
+        request = self.translator.build_deferred_request(TEXT, "lab_results")
+        await self.deferred.submit(job_id, "lab_results", request, TEXT[:20])
+
+
+async def wait_for_jobs(worker: Worker, count: int) -> None:
+    """Wait until the worker has completed or failed count jobs."""
+    for _ in range(500):
+        if len(worker.completed) + len(worker.failed) >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("jobs did not finish")
+
+
+def test_batches_are_recorded_in_the_shared_store():
+    async def scenario():
+        redis = FakeRedis()
+        worker = Worker(redis, create_app(batch_delay=3600))
+        await worker.submit("a")
+        await worker.submit("b")
+        await worker.deferred.flush()
+        job = await worker.job_store.get("a")
+        batches = await RedisDeferredBatchStore(redis).load()
+        stats = await Worker(redis, create_app()).deferred.stats()
+        await worker.deferred.close()
+        return job, batches, stats
+
+    job, batches, stats = run(scenario())
+    assert job["deferred_status"] == "validating"
+    [(batch_id, entries)] = batches.items()
+    assert job["deferred_batch_id"] == batch_id
+    assert sorted(entries) == ["a", "b"]
+    assert "body" not in entries["a"]["request"]
+    # Another worker sees the batch, but not the first worker's unsubmitted requests
+    assert stats == {"pending": 0, "submitted": 2, "batches": 1}
+
+
+def test_restarted_worker_finishes_batches_submitted_before_shutdown():
+    async def scenario():
+        redis = FakeRedis()
+        openai_app = create_app(batch_delay=0)
+        before = Worker(redis, openai_app)
+        await before.submit("a")
+        # Shutting down submits the waiting request instead of failing it
+        await before.deferred.close()
+
+        after = Worker(redis, openai_app, poll_interval=0.01)
+        await after.deferred.resume()
+        await wait_for_jobs(after, 1)
+        await after.deferred.close()
+        return before, after, await after.deferred.stats()
+
+    before, after, stats = run(scenario())
+    assert before.failed == [] and before.completed == []
+    assert after.failed == []
+    assert after.completed == [("a", "lab_results", TEXT[:20])]
+    assert stats == {"pending": 0, "submitted": 0, "batches": 0}
+
+
+def test_only_one_worker_records_a_finished_batch():
+    async def scenario():
+        redis = FakeRedis()
+        openai_app = create_app(batch_delay=0)
+        first, second = Worker(redis, openai_app), Worker(redis, openai_app)
+        await first.submit("a")
+        await first.deferred.flush()
+        await asyncio.gather(first.deferred.poll(), second.deferred.poll())
+        await first.deferred.close()
+        return first.completed + second.completed
+
+    assert [job_id for job_id, _, _ in run(scenario())] == ["a"]
+
+
+def test_batch_that_cannot_be_submitted_fails_its_jobs():
+    async def scenario():
+        worker = Worker(FakeRedis(), create_app())
+        worker.translator.client = worker.deferred.client = openai.AsyncOpenAI(
+            api_key="test",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500))),
+            max_retries=0
+        )
+        await worker.submit("a")
+        await worker.deferred.close()
+        return worker, await worker.deferred.stats()
+
+    worker, stats = run(scenario())
+    [(job_id, error)] = worker.failed
+    assert job_id == "a" and error.startswith("Deferred translation could not be submitted")
+    assert stats["batches"] == 0
+
+
+def test_running_worker_picks_up_a_batch_left_by_a_stopped_worker():
+    async def scenario():
+        redis = FakeRedis()
+        openai_app = create_app(batch_delay=0)
+        running = Worker(redis, openai_app, poll_interval=0.01)
+        await running.deferred.resume()
+        await asyncio.sleep(0.05)
+
+        stopped = Worker(redis, openai_app)
+        await stopped.submit("a")
+        await stopped.deferred.close()
+        await wait_for_jobs(running, 1)
+        await running.deferred.close()
+        return running
+
+    assert [job_id for job_id, _, _ in run(scenario()).completed] == ["a"]
+
+
+def failing_downloads(worker: Worker, failures: int) -> list:
+    """Make the worker's first failures result downloads raise; returns the list of download attempts."""
+    content = worker.deferred.client.files.content
+    attempts = []
+
+    async def flaky_content(file_id):
+        attempts.append(file_id)
+        if len(attempts) <= failures:
+            raise httpx.ConnectError("connection reset")
+        return await content(file_id)
+
+    worker.deferred.client.files.content = flaky_content
+    return attempts
+
+
+def test_batch_stays_in_the_store_until_its_results_are_read():
+    async def scenario():
+        redis = FakeRedis()
+        worker = Worker(redis, create_app(batch_delay=0))
+        failing_downloads(worker, 1)
+        await worker.submit("a")
+        await worker.deferred.flush()
+        active = await worker.deferred.poll()
+        kept = await RedisDeferredBatchStore(redis).load()
+        await worker.deferred.poll()
+        await worker.deferred.close()
+        return worker, active, kept, await worker.deferred.stats()
+
+    worker, active, kept, stats = run(scenario())
+    assert active == 1 and list(kept.values())[0].keys() == {"a"}
+    assert worker.failed == []
+    assert [job_id for job_id, _, _ in worker.completed] == ["a"]
+    assert stats["batches"] == 0
+
+
+def test_jobs_fail_when_batch_results_cannot_be_read():
+    async def scenario():
+        worker = Worker(FakeRedis(), create_app(batch_delay=0))
+        attempts = failing_downloads(worker, 100)
+        await worker.submit("a")
+        await worker.deferred.flush()
+        for _ in range(MAX_RESULT_READ_ATTEMPTS):
+            await worker.deferred.poll()
+        await worker.deferred.close()
+        return worker, attempts, await worker.deferred.stats()
+
+    worker, attempts, stats = run(scenario())
+    assert len(attempts) == MAX_RESULT_READ_ATTEMPTS
+    [(job_id, error)] = worker.failed
+    assert job_id == "a" and error.startswith("Deferred translation results could not be read")
+    assert stats["batches"] == 0
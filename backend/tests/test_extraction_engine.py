@@ -0,0 +1,59 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pytest
+
+from app.services import extraction_engine
+from app.services.extraction_engine import ExtractionEngine, SharedPDF
+from benchmarks.corpus import make_pdf
+from tests.conftest import run
+
+
+class RecordingExecutor(ProcessPoolExecutor):
+    """Remembers the arguments of every task sent to the workers."""
+
+    def __init__(self):
+        super().__init__(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+        self.sent = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.sent.append(args)
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def engine():
+    engine = ExtractionEngine(max_workers=2, queue_depth=2, pages_per_task=3)
+    engine._executor = RecordingExecutor()
+    yield engine
+    engine.shutdown()
+
+
+def test_in_memory_content_is_shared_with_the_workers_not_sent_per_task(engine, monkeypatch, tmp_path):
+    content = make_pdf(10)
+    path = tmp_path / "a.pdf"
+    path.write_bytes(content)
+    blocks = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            blocks.append(self.name)
+
+    monkeypatch.setattr(extraction_engine.shared_memory, "SharedMemory", RecordingSharedMemory)
+
+    from_memory = run(engine.extract_pages(content))
+    sent = engine._executor.sent
+    engine._executor.sent = []
+    from_disk = run(engine.extract_pages(str(path)))
+
+    assert from_memory == from_disk
+    assert [number for number, _ in from_memory] == list(range(1, 11))
+    # The page count and 4 page ranges, none carrying the document itself
+    assert len(sent) == 5
+    assert all(isinstance(args[0], SharedPDF) for args in sent)
+    assert [args[0] for args in engine._executor.sent] == [str(path)] * 5
+    assert len(blocks) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=blocks[0])
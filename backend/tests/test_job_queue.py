@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.services.fake_redis import FakeRedis
+from app.services.job_queue import InMemoryJobQueue, RedisJobQueue
+from tests.conftest import run
+
+
+@pytest.fixture
+def redis(clock) -> FakeRedis:
+    return FakeRedis(clock=clock)
+
+
+@pytest.fixture
+def queue(redis, clock) -> RedisJobQueue:
+    return RedisJobQueue(redis, visibility_timeout=10, clock=clock)
+
+
+def test_jobs_are_claimed_in_order_by_one_worker_each(queue):
+    async def scenario():
+        await queue.enqueue({"job_id": "a"})
+        await queue.enqueue({"job_id": "b"})
+        first = await queue.claim("w1", timeout=0.01)
+        second = await queue.claim("w2", timeout=0.01)
+        return first, second, await queue.claim("w3", timeout=0.01), await queue.stats()
+
+    first, second, none_left, stats = run(scenario())
+    assert (first.payload, first.attempts) == ({"job_id": "a"}, 1)
+    assert (second.payload, second.attempts) == ({"job_id": "b"}, 1)
+    assert none_left is None
+    assert stats == {"waiting": 0, "in_progress": 2, "workers": 0}
+
+
+def test_unacked_job_is_claimed_again_after_the_visibility_timeout(queue, clock):
+    async def scenario():
+        await queue.enqueue({"job_id": "a"})
+        await queue.claim("crashed", timeout=0.01)
+        clock.advance(5)
+        early = await queue.claim("w2", timeout=0.01)
+        clock.advance(6)
+        return early, await queue.claim("w2", timeout=0.01)
+
+    early, reclaimed = run(scenario())
+    assert early is None
+    assert reclaimed.payload == {"job_id": "a"}
+    assert reclaimed.attempts == 2
+
+
+def test_extend_keeps_a_running_job_claimed(queue, clock):
+    async def scenario():
+        await queue.enqueue({"job_id": "a"})
+        job = await queue.claim("w1", timeout=0.01)
+        clock.advance(8)
+        await queue.extend(job, "w1")
+        clock.advance(8)
+        kept = await queue.claim("w2", timeout=0.01)
+        clock.advance(3)
+        return kept, await queue.claim("w2", timeout=0.01)
+
+    kept, reclaimed = run(scenario())
+    assert kept is None
+    assert reclaimed.attempts == 2
+
+
+def test_acked_job_is_gone(queue, redis, clock):
+    async def scenario():
+        await queue.enqueue({"job_id": "a"})
+        await queue.ack(await queue.claim("w1", timeout=0.01))
+        clock.advance(20)
+        return await queue.claim("w2", timeout=0.01), await queue.stats(), await redis.xlen(queue.stream)
+
+    claimed, stats, length = run(scenario())
+    assert claimed is None
+    assert stats == {"waiting": 0, "in_progress": 0, "workers": 0}
+    assert length == 0
+
+
+def test_released_job_is_available_right_away_without_counting_an_attempt(queue):
+    async def scenario():
+        await queue.enqueue({"job_id": "a"})
+        await queue.release(await queue.claim("w1", timeout=0.01))
+        return await queue.claim("w2", timeout=0.01)
+
+    job = run(scenario())
+    assert (job.payload, job.attempts) == ({"job_id": "a"}, 1)
+
+
+def test_redis_queue_refuses_document_content(queue):
+    with pytest.raises(TypeError):
+        run(queue.enqueue({"job_id": "a", "document": b"%PDF-1.7"}))
+
+
+def test_stats_count_registered_workers(queue):
+    async def scenario():
+        await queue.register_worker("w1")
+        await queue.register_worker("w2")
+        await queue.unregister_worker("w1")
+        return await queue.stats()
+
+    assert run(scenario())["workers"] == 1
+
+
+def test_in_memory_queue_reclaims_expired_jobs_and_releases_without_an_attempt():
+    queue = InMemoryJobQueue(visibility_timeout=0.05)
+
+    async def scenario():
+        await queue.enqueue({"job_id": "a", "document": b"%PDF-1.7"})
+        await queue.claim("crashed", timeout=0.01)
+        early = await queue.claim("w2", timeout=0.01)
+        reclaimed = await queue.claim("w2", timeout=1.0)
+        await queue.release(reclaimed)
+        released = await queue.claim("w3", timeout=0.01)
+        await queue.ack(released)
+        return early, reclaimed, released, await queue.stats()
+
+    early, reclaimed, released, stats = run(scenario())
+    assert early is None
+    assert reclaimed.payload["document"] == b"%PDF-1.7"
+    assert reclaimed.attempts == 2
+    assert released.attempts == 2
+    assert stats == {"waiting": 0, "in_progress": 0, "workers": 0}
+
+
+def test_in_memory_claim_waits_for_a_job():
+    queue = InMemoryJobQueue(visibility_timeout=10)
+
+    async def scenario():
+        claim = asyncio.create_task(queue.claim("w1", timeout=1.0))
+        await asyncio.sleep(0.01)
+        await queue.enqueue({"job_id": "a"})
+        return await claim
+
+    assert run(scenario()).payload == {"job_id": "a"}
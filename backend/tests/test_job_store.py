@@ -0,0 +1,171 @@
+import pytest
+
+from app.services.fake_redis import FakeRedis
+from app.services.job_store import InMemoryJobStore, JobEventWriter, JobProgressWriter, RedisJobStore
+from tests.conftest import run
+
+
+@pytest.fixture
+def redis(clock) -> FakeRedis:
+    return FakeRedis(clock=clock)
+
+
+@pytest.fixture
+def store(redis) -> RedisJobStore:
+    return RedisJobStore(redis, ttl=60)
+
+
+JOB = {"status": "processing", "progress": 0, "result": None, "error": None}
+
+
+def test_create_and_get_round_trips_json_fields(store):
+    async def scenario():
+        await store.create("a", {**JOB, "result": {"sections": {"x": "y"}}})
+        return await store.get("a")
+
+    assert run(scenario()) == {**JOB, "result": {"sections": {"x": "y"}}}
+
+
+def test_get_missing_job_returns_none(store):
+    assert run(store.get("missing")) is None
+
+
+def test_update_sets_only_given_fields(store):
+    async def scenario():
+        await store.create("a", JOB)
+        updated = await store.update("a", progress=50, status="translating")
+        return updated, await store.get("a")
+
+    updated, job = run(scenario())
+    assert updated
+    assert job == {**JOB, "progress": 50, "status": "translating"}
+
+
+def test_job_expires_after_ttl_and_updates_refresh_it(store, clock):
+    async def scenario():
+        await store.create("a", JOB)
+        clock.advance(50)
+        await store.update("a", progress=10)
+        clock.advance(50)
+        refreshed = await store.get("a")
+        clock.advance(11)
+        return refreshed, await store.get("a"), await store.update("a", progress=20)
+
+    refreshed, expired, updated = run(scenario())
+    assert refreshed["progress"] == 10
+    assert expired is None
+    assert not updated
+
+
+def test_touch_refreshes_expiry_without_recreating_jobs(store, clock):
+    async def scenario():
+        await store.create("a", JOB)
+        clock.advance(50)
+        touched = await store.touch("a")
+        clock.advance(50)
+        kept = await store.get("a")
+        clock.advance(11)
+        return touched, kept, await store.get("a"), await store.touch("a"), await store.get("a")
+
+    touched, kept, expired, touched_again, recreated = run(scenario())
+    assert touched and kept == JOB
+    assert expired is None
+    assert not touched_again and recreated is None
+
+
+def test_update_after_delete_does_not_recreate_job(store, redis):
+    async def scenario():
+        await store.create("a", JOB)
+        deleted = await store.delete("a")
+        return deleted, await store.update("a", status="completed"), await redis.exists("job:a")
+
+    deleted, updated, exists = run(scenario())
+    assert deleted
+    assert not updated
+    assert not exists
+
+
+class DeletingRedis(FakeRedis):
+    """Deletes a key right after reporting that it exists, like a concurrent DELETE."""
+
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.delete_on_exists = None
+
+    async def exists(self, *keys):
+        found = await super().exists(*keys)
+        if self.delete_on_exists in keys:
+            self.delete_on_exists = None
+            await self.delete(*keys)
+        return found
+
+
+def test_update_racing_a_delete_does_not_recreate_job(clock):
+    redis = DeletingRedis(clock)
+    store = RedisJobStore(redis, ttl=60)
+
+    async def scenario():
+        await store.create("a", JOB)
+        redis.delete_on_exists = "job:a"
+        return await store.update("a", status="completed"), await redis.hgetall("job:a")
+
+    updated, fields = run(scenario())
+    assert not updated
+    assert fields == {}
+
+
+def test_events_are_appended_in_order_and_read_from_an_offset(store):
+    async def scenario():
+        await store.create("a", JOB)
+        await store.append_events("a", [{"event": "token", "data": {"text": "a"}}])
+        await store.append_events("a", [{"event": "completed", "data": {}}])
+        return await store.get_events("a"), await store.get_events("a", 1)
+
+    events, tail = run(scenario())
+    assert [event["event"] for event in events] == ["token", "completed"]
+    assert tail == [{"event": "completed", "data": {}}]
+
+
+def test_events_of_a_deleted_job_are_dropped(store, redis):
+    async def scenario():
+        await store.create("a", JOB)
+        await store.delete("a")
+        await store.append_events("a", [{"event": "token", "data": {"text": "a"}}])
+        return await redis.exists("job:a:events")
+
+    assert run(scenario()) == 0
+
+
+def test_in_memory_store_evicts_least_recently_used_jobs():
+    store = InMemoryJobStore(max_jobs=2, ttl=60)
+
+    async def scenario():
+        await store.create("a", JOB)
+        await store.create("b", JOB)
+        await store.get("a")
+        await store.create("c", JOB)
+        return [await store.get(job_id) is not None for job_id in ("a", "b", "c")]
+
+    assert run(scenario()) == [True, False, True]
+
+
+class FailingRedis(FakeRedis):
+    """Fails every transaction, like a Redis connection that dropped."""
+
+    def pipeline(self, *args, **kwargs):
+        raise ConnectionError("connection reset")
+
+
+def test_writers_drain_without_raising_failed_writes(clock):
+    redis = FailingRedis(clock)
+    store = RedisJobStore(redis, ttl=60)
+
+    async def scenario():
+        progress = JobProgressWriter(store, "a")
+        events = JobEventWriter(store, "a")
+        progress(50, "translating")
+        events.emit("token", {"text": "a"})
+        await progress.drain()
+        await events.drain()
+
+    run(scenario())
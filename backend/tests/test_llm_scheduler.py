@@ -0,0 +1,205 @@
+import asyncio
+import random
+from typing import Dict, Optional
+
+import httpx
+import openai
+import pytest
+
+from app.services.llm_scheduler import LLMScheduler, TokenBucket, retry_after
+from tests.conftest import run
+
+
+def api_error(status: int, headers: Optional[Dict[str, str]] = None) -> openai.APIStatusError:
+    """An error as the OpenAI client raises it for a response with this status."""
+    response = httpx.Response(
+        status, headers=headers or {}, request=httpx.Request("POST", "https://api.test/v1/chat/completions")
+    )
+    error_class = {429: openai.RateLimitError, 400: openai.BadRequestError}.get(status, openai.InternalServerError)
+    return error_class("error", response=response, body=None)
+
+
+def test_token_bucket_refills_continuously(clock):
+    bucket = TokenBucket(60, window=60, clock=clock)
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    clock.advance(0.5)
+    assert bucket.delay(1) == pytest.approx(0.5)
+    clock.advance(0.5)
+    assert bucket.delay(1) == 0
+
+
+def test_token_bucket_caps_oversized_requests_at_a_full_bucket(clock):
+    bucket = TokenBucket(10, window=60, clock=clock)
+    bucket.take(5)
+    assert bucket.delay(1000) == pytest.approx(30.0)
+
+
+def test_retry_after_reads_milliseconds_before_seconds():
+    assert retry_after(api_error(429, {"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    assert retry_after(api_error(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(api_error(429)) is None
+
+
+def test_backoff_is_full_jitter_over_a_doubling_cap(clock):
+    scheduler = LLMScheduler(1, retry_base_delay=1.0, retry_max_delay=5.0, clock=clock, seed=7)
+    expected = random.Random(7)
+    for attempt, cap in enumerate([1.0, 2.0, 4.0, 5.0]):
+        delay = scheduler.retry_delay(api_error(500), attempt)
+        assert delay == expected.uniform(0, cap)
+        assert 0 <= delay <= cap
+
+
+def test_backoff_is_reproducible_with_a_seed(clock):
+    delays = [
+        [LLMScheduler(1, seed=3, clock=clock).retry_delay(api_error(503), attempt) for attempt in range(4)]
+        for _ in range(2)
+    ]
+    assert delays[0] == delays[1]
+
+
+def test_non_retryable_errors_and_exhausted_retries_give_up(clock):
+    scheduler = LLMScheduler(1, max_retries=2, clock=clock, seed=1)
+    assert scheduler.retry_delay(api_error(400), 0) is None
+    assert scheduler.retry_delay(api_error(500), 2) is None
+    assert scheduler.retry_delay(api_error(500), 0, max_retries=0) is None
+
+
+def test_rate_limit_retry_after_pauses_every_request(clock):
+    scheduler = LLMScheduler(1, retry_base_delay=0.001, clock=clock, seed=1)
+    delay = scheduler.retry_delay(api_error(429, {"retry-after": "3"}), 0)
+    assert delay == 3.0
+    assert scheduler._admission_delay(0) == pytest.approx(3.0)
+    clock.advance(2)
+    assert scheduler._admission_delay(0) == pytest.approx(1.0)
+    assert scheduler.stats["rate_limited"] == 1
+
+
+def test_rate_limit_pause_applies_even_without_retries(clock):
+    scheduler = LLMScheduler(1, clock=clock, seed=1)
+    assert scheduler.retry_delay(api_error(429, {"retry-after": "4"}), 0, max_retries=0) is None
+    assert scheduler._admission_delay(0) == pytest.approx(4.0)
+
+
+def test_request_and_token_limits_delay_admission(clock):
+    scheduler = LLMScheduler(4, request_limit=2, token_limit=100, window=60, clock=clock)
+    scheduler.request_bucket.take(2)
+    assert scheduler._admission_delay(10) == pytest.approx(30.0)
+    clock.advance(30)
+    scheduler.token_bucket.take(100)
+    assert scheduler._admission_delay(50) == pytest.approx(30.0)
+
+
+def test_interactive_requests_go_ahead_of_bulk_ones():
+    async def scenario():
+        scheduler = LLMScheduler(1)
+        order = []
+        release = asyncio.Event()
+
+        async def hold():
+            await release.wait()
+
+        async def record(name):
+            order.append(name)
+
+        holder = asyncio.create_task(scheduler.submit(hold))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(scheduler.submit(lambda: record("bulk-1"), priority="bulk")),
+            asyncio.create_task(scheduler.submit(lambda: record("interactive-1"))),
+            asyncio.create_task(scheduler.submit(lambda: record("bulk-2"), priority="bulk")),
+            asyncio.create_task(scheduler.submit(lambda: record("interactive-2")))
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 4
+        release.set()
+        await asyncio.gather(holder, *waiting)
+        return order
+
+    assert run(scenario()) == ["interactive-1", "interactive-2", "bulk-1", "bulk-2"]
+
+
+def test_retryable_failures_are_retried_until_success():
+    async def scenario():
+        scheduler = LLMScheduler(2, max_retries=3, retry_base_delay=0, seed=1)
+        attempts = []
+
+        async def send():
+            attempts.append(len(attempts))
+            if len(attempts) < 3:
+                raise api_error(502)
+            return "ok"
+
+        return await scheduler.submit(send), attempts, scheduler.stats, scheduler.in_flight
+
+    result, attempts, stats, in_flight = run(scenario())
+    assert result == "ok"
+    assert attempts == [0, 1, 2]
+    assert stats["retries"] == 2
+    assert in_flight == 0
+
+
+def test_non_retryable_failure_is_raised_at_once():
+    async def scenario():
+        scheduler = LLMScheduler(1, max_retries=3, retry_base_delay=0)
+        calls = []
+
+        async def send():
+            calls.append(1)
+            raise api_error(400)
+
+        with pytest.raises(openai.BadRequestError):
+            await scheduler.submit(send)
+        return len(calls), scheduler.in_flight
+
+    assert run(scenario()) == (1, 0)
+
+
+def test_unknown_priority_is_rejected():
+    async def scenario():
+        await LLMScheduler(1).submit(lambda: asyncio.sleep(0), priority="urgent")
+
+    with pytest.raises(ValueError):
+        run(scenario())
+
+
+def test_coalesce_shares_work_between_concurrent_callers():
+    async def scenario():
+        scheduler = LLMScheduler(1)
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return "result"
+
+        results = await asyncio.gather(scheduler.coalesce("k", work), scheduler.coalesce("k", work))
+        return results, len(calls)
+
+    results, calls = run(scenario())
+    assert sorted(results, key=lambda result: result[1]) == [("result", False), ("result", True)]
+    assert calls == 1
+
+
+def test_warm_up_goes_through_the_scheduler(monkeypatch):
+    from app.config import settings
+    from app.services.ai_translator import AITranslator
+
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test")
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(200, json={"id": "m", "object": "model", "created": 0, "owned_by": "test"})
+
+    async def scenario():
+        translator = AITranslator()
+        translator.model = "m"
+        translator.client = openai.AsyncOpenAI(
+            api_key="test", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        await translator.warm_up()
+        return translator.scheduler.stats["requests"]
+
+    assert run(scenario()) == 1
+    assert paths == ["/v1/models/m"]
@@ -0,0 +1,86 @@
+import os
+import time
+
+from app.services.translation_cache import DiskCacheTier, MemoryCacheTier
+from tests.conftest import run
+
+
+def test_memory_tier_budgets_encoded_bytes():
+    tier = MemoryCacheTier(max_entries=10, max_bytes=100, ttl=60)
+
+    async def scenario():
+        await tier.set("a", "é" * 40)
+        await tier.set("b", "é" * 40)
+        return await tier.get("a"), await tier.get("b")
+
+    evicted, kept = run(scenario())
+    assert evicted is None
+    assert kept == "é" * 40
+    assert tier.size_bytes == 80
+
+
+def test_memory_tier_skips_a_payload_larger_than_the_budget_in_bytes():
+    tier = MemoryCacheTier(max_entries=10, max_bytes=100, ttl=60)
+    run(tier.set("a", "é" * 60))
+    assert run(tier.get("a")) is None
+    assert tier.size_bytes == 0
+
+
+def test_disk_tier_counts_existing_entries_and_tracks_writes(tmp_path):
+    (tmp_path / "old.json").write_bytes(b"x" * 30)
+    tier = DiskCacheTier(str(tmp_path), max_bytes=1000, ttl=60)
+    assert tier.size_bytes == 30
+
+    run(tier.set("a", "é" * 20))
+    run(tier.set("a", "é" * 10))
+    assert tier.size_bytes == 50
+    assert run(tier.get("a")) == "é" * 10
+
+
+def test_disk_tier_scans_only_when_over_the_limit(tmp_path, monkeypatch):
+    tier = DiskCacheTier(str(tmp_path), max_bytes=100, ttl=60)
+    scans = []
+    scan = tier._scan
+    monkeypatch.setattr(tier, "_scan", lambda limit: scans.append(limit) or scan(limit))
+
+    now = time.time()
+    for index, key in enumerate("abc"):
+        run(tier.set(key, "x" * 30))
+        os.utime(tmp_path / f"{key}.json", (now - 10 + index, now - 10 + index))
+    assert scans == []
+
+    # Over the limit: evicts least recently used entries down to 90 bytes
+    run(tier.set("d", "x" * 30))
+    assert scans == [90]
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json", "d.json"]
+    assert tier.size_bytes == 90
+
+
+def test_disk_tier_entry_expires_even_when_read(tmp_path, clock):
+    tier = DiskCacheTier(str(tmp_path), max_bytes=1000, ttl=60, clock=clock)
+
+    async def scenario():
+        await tier.set("a", "x")
+        reads = []
+        for _ in range(3):
+            clock.advance(25)
+            reads.append(await tier.get("a"))
+        return reads
+
+    assert run(scenario()) == ["x", "x", None]
+    assert tier.size_bytes == 0
+
+
+def test_disk_tier_evicts_the_least_recently_read_entry(tmp_path, clock):
+    tier = DiskCacheTier(str(tmp_path), max_bytes=100, ttl=60, clock=clock)
+
+    async def scenario():
+        for key in "abc":
+            await tier.set(key, "x" * 30)
+            clock.advance(1)
+        await tier.get("a")
+        clock.advance(1)
+        await tier.set("d", "x" * 30)
+
+    run(scenario())
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json", "d.json"]
@@ -0,0 +1,73 @@
+import io
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from app.services.validators import PDF_HEADER_WINDOW, FileValidator, RequestSizeLimit
+from tests.conftest import run
+
+
+def save(content: bytes):
+    upload = UploadFile(file=io.BytesIO(content), filename="a.pdf")
+    return run(FileValidator.save_upload(upload, "/nonexistent/a.pdf", memory_threshold=len(content)))
+
+
+def test_header_may_follow_a_few_bytes_of_junk():
+    content = b"\x00" * 100 + b"%PDF-1.7\n" + b"x" * 5000
+    assert save(content) == content
+
+
+def test_short_file_with_a_header_is_accepted():
+    assert save(b"%PDF-1.4\n") == b"%PDF-1.4\n"
+
+
+def test_header_beyond_the_window_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        save(b" " * PDF_HEADER_WINDOW + b"%PDF-1.7\n")
+    assert error.value.status_code == 400
+
+
+def limited_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(RequestSizeLimit, limits={"/upload": 1000})
+    return app
+
+
+def test_request_size_limit_refuses_a_declared_oversized_body():
+    client = TestClient(limited_app())
+
+    assert client.post("/upload", content=b"x" * 1000).json() == {"size": 1000}
+    assert client.post("/upload", content=b"x" * 1001).status_code == 413
+    assert client.post("/other", content=b"x" * 5000).json() == {"size": 5000}
+
+
+def test_request_size_limit_stops_receiving_a_body_without_content_length():
+    received = []
+    sent = []
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": b"x" * 300, "more_body": len(received) < 100}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("test", 1), "server": ("test", 80)
+    }
+    run(limited_app()(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert len(received) == 4